@@ -30,7 +30,59 @@ def create_app(config_name='default'):
     
     # Khởi tạo extensions
     db.init_app(app)
+
+    # Xác thực JWT (tùy chọn): public key được parse một lần tại đây
+    from flask_auth import init_auth
+    init_auth(app)
+
+    # Metrics Prometheus: latency, status, truy vấn database theo endpoint (/metrics)
+    from app.utils.metrics import init_metrics
+    init_metrics(app)
+
+    # Khi phát triển/test: đếm truy vấn mỗi request và cảnh báo mẫu N+1
+    from app.utils.query_inspector import init_query_inspector
+    init_query_inspector(app)
+
+    # Admin profile một request bằng X-Profile: 1 hoặc ?profile=1
+    from app.utils.profiler import init_profiler
+    init_profiler(app)
+
+    # Token bucket theo người dùng cho endpoint tốn kém (ML, LLM): 429 + Retry-After khi vượt ngân sách
+    from app.utils.rate_limit import init_rate_limiter
+    init_rate_limiter(app)
+
+    # Service dùng chung (ML, LLM...) được tạo lười ở lần dùng đầu, theo cấu hình của app
+    from app.services.container import init_services
+    init_services(app)
+
+    # JSON provider (orjson nếu có), ngày tháng được encode dạng ISO 8601
+    from app.utils.json_provider import init_json_provider
+    init_json_provider(app)
     
+    # Duy trì bảng tổng hợp khóa học khi Progress/Student thay đổi
+    from app.services.course_summary_service import register_course_summary_events
+    register_course_summary_events()
+    
+    # Duy trì thống kê cảnh báo theo sinh viên khi Warning thay đổi
+    from app.services.warning_stats_service import register_warning_stats_events
+    register_warning_stats_events()
+
+    # Cache dữ liệu tham chiếu, tự vô hiệu hóa khi Course/Chapter/CommonError thay đổi
+    from app.utils.cache import init_cache
+    from app.services.reference_data_service import register_reference_data_events
+    init_cache(app)
+    register_reference_data_events()
+
+    # Phiên bản dữ liệu cho ETag/Last-Modified của các endpoint polling
+    from app.services.data_version_service import register_data_version_events
+    from app.utils.response_cache import init_response_cache
+    register_data_version_events()
+    init_response_cache(app)
+
+    # Nén gzip/brotli các response JSON lớn
+    from app.utils.compression import init_compression
+    init_compression(app)
+
     # Cấu hình CORS
     CORS(app, resources={r"/api/*": {"origins": app.config['CORS_ORIGINS']}})
     
@@ -41,8 +93,17 @@ def create_app(config_name='default'):
     # Import models để SQLAlchemy nhận diện
     from app.models import (Student, Course, Progress, Warning, Assignment, 
                            Chapter, CommonError, BloomAssessment, Intervention, 
-                           CourseHistory, Teacher, Notification)
+                           CourseHistory, Teacher, Notification, CourseSummary,
+                           StudentWarningStats, NotificationArchive, WarningArchive,
+                           DataVersion)
     
+    # Sau reverse proxy: REMOTE_ADDR/scheme lấy từ X-Forwarded-* của PROXY_FIX_* proxy tin cậy.
+    # Bọc ngoài cùng để mọi middleware và request.remote_addr đều thấy IP của client
+    if app.config.get('PROXY_FIX_X_FOR') or app.config.get('PROXY_FIX_X_PROTO'):
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'],
+                                x_proto=app.config['PROXY_FIX_X_PROTO'])
+
     # Thêm endpoint ping để kiểm tra uptime
     @app.route('/ping', methods=['GET'])
     def ping_service():
@@ -13,6 +13,11 @@ from .chapter import Chapter
 from .common_error import CommonError
 from .teacher import Teacher
 from .notification import Notification
+from .course_summary import CourseSummary
+from .student_warning_stats import StudentWarningStats
+from .notification_archive import NotificationArchive
+from .warning_archive import WarningArchive
+from .data_version import DataVersion
 
 __all__ = [
     'Student',
@@ -26,5 +31,10 @@ __all__ = [
     'Chapter',
     'CommonError',
     'Teacher',
-    'Notification'
+    'Notification',
+    'CourseSummary',
+    'StudentWarningStats',
+    'NotificationArchive',
+    'WarningArchive',
+    'DataVersion'
 ]
\ No newline at end of file
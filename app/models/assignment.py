@@ -23,7 +23,7 @@ class Assignment(db.Model):
             'assignmentid': self.assignmentid,
             'courseid': self.courseid,
             'name': self.name,
-            'deadline': self.deadline.isoformat() if self.deadline else None,
+            'deadline': self.deadline,
             'submitted': self.submitted,
             'completionrate': self.completionrate,
             'status': self.status,
@@ -14,6 +14,10 @@ class BloomAssessment(db.Model):
     status = db.Column(db.Text, nullable=False)
     score = db.Column(db.Float, nullable=False)
     lastupdated = db.Column(db.Date, nullable=False)
+
+    # Relationships
+    student = db.relationship('Student', back_populates='bloom_assessments', lazy='raise')
+    course = db.relationship('Course', back_populates='bloom_assessments', lazy='raise')
     
     def to_dict(self):
         """Chuyển đổi object thành dictionary"""
@@ -24,5 +28,5 @@ class BloomAssessment(db.Model):
             'bloomlevel': self.bloomlevel,
             'status': self.status,
             'score': self.score,
-            'lastupdated': self.lastupdated.isoformat() if self.lastupdated else None
+            'lastupdated': self.lastupdated
         }
\ No newline at end of file
@@ -15,6 +15,17 @@ class Course(db.Model):
     status = db.Column(db.Text, nullable=False)
     difficulty = db.Column(db.Text, nullable=True)
     category = db.Column(db.Text, nullable=True)
+
+    # Relationships - lazy='raise', nạp bằng joinedload/selectinload (xem Student)
+    progress = db.relationship('Progress', back_populates='course', lazy='raise',
+                               order_by='Progress.progressid', passive_deletes=True)
+    chapters = db.relationship('Chapter', lazy='raise', order_by='Chapter.chapterid', passive_deletes=True)
+    assignments = db.relationship('Assignment', lazy='raise', order_by='Assignment.assignmentid',
+                                  passive_deletes=True)
+    common_errors = db.relationship('CommonError', lazy='raise', order_by='CommonError.errorid',
+                                    passive_deletes=True)
+    bloom_assessments = db.relationship('BloomAssessment', back_populates='course', lazy='raise',
+                                        order_by='BloomAssessment.assessmentid', passive_deletes=True)
     
     def to_dict(self):
         """Chuyển đổi object thành dictionary"""
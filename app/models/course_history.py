@@ -21,6 +21,6 @@ class CourseHistory(db.Model):
             'studentid': self.studentid,
             'courseid': self.courseid,
             'completedsemester': self.completedsemester,
-            'completeddate': self.completeddate.isoformat() if self.completeddate else None,
+            'completeddate': self.completeddate,
             'finalscore': self.finalscore
         }
\ No newline at end of file
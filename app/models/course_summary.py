@@ -0,0 +1,29 @@
+"""
+Course Summary model
+"""
+from datetime import datetime
+from app import db
+
+class CourseSummary(db.Model):
+    """Model cho bảng tổng hợp khóa học - được duy trì tự động khi Progress/Student thay đổi"""
+    __tablename__ = 'coursesummary'
+    
+    courseid = db.Column(db.Integer, db.ForeignKey('course.courseid'), primary_key=True)
+    totalstudents = db.Column(db.Integer, nullable=False, default=0)
+    gpasum = db.Column(db.Float, nullable=False, default=0.0)
+    completionsum = db.Column(db.Float, nullable=False, default=0.0)
+    completedcount = db.Column(db.Integer, nullable=False, default=0)
+    activecount = db.Column(db.Integer, nullable=False, default=0)
+    lastupdated = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def to_dict(self):
+        """Chuyển đổi object thành dictionary"""
+        return {
+            'courseid': self.courseid,
+            'totalstudents': self.totalstudents,
+            'gpasum': self.gpasum,
+            'completionsum': self.completionsum,
+            'completedcount': self.completedcount,
+            'activecount': self.activecount,
+            'lastupdated': self.lastupdated
+        }
@@ -0,0 +1,20 @@
+"""
+Data Version model
+"""
+from app import db
+
+class DataVersion(db.Model):
+    """Model cho bảng phiên bản dữ liệu - mỗi phạm vi (scope) tăng version khi dữ liệu thay đổi"""
+    __tablename__ = 'dataversion'
+    
+    scope = db.Column(db.Text, primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updatedat = db.Column(db.DateTime, nullable=False)
+    
+    def to_dict(self):
+        """Chuyển đổi object thành dictionary"""
+        return {
+            'scope': self.scope,
+            'version': self.version,
+            'updatedat': self.updatedat
+        }
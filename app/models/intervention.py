@@ -12,6 +12,9 @@ class Intervention(db.Model):
     recommendation = db.Column(db.Text, nullable=False)
     createddate = db.Column(db.Date, nullable=False)
     isapplied = db.Column(db.Boolean, nullable=False, default=False)
+
+    # Relationships
+    student = db.relationship('Student', back_populates='interventions', lazy='raise')
     
     def to_dict(self):
         """Chuyển đổi object thành dictionary"""
@@ -19,6 +22,6 @@ class Intervention(db.Model):
             'interventionid': self.interventionid,
             'studentid': self.studentid,
             'recommendation': self.recommendation,
-            'createddate': self.createddate.isoformat() if self.createddate else None,
+            'createddate': self.createddate,
             'isapplied': self.isapplied
         }
\ No newline at end of file
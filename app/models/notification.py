@@ -14,7 +14,7 @@ class Notification(db.Model):
     isread = db.Column(db.Boolean, nullable=False, default=False)
     
     # Relationships
-    student = db.relationship('Student', backref='notifications')
+    student = db.relationship('Student', back_populates='notifications', lazy='raise')
     
     def to_dict(self):
         """Chuyển đổi object thành dictionary"""
@@ -22,6 +22,6 @@ class Notification(db.Model):
             'notificationid': self.notificationid,
             'studentid': self.studentid,
             'message': self.message,
-            'createddate': self.createddate.isoformat() if self.createddate else None,
+            'createddate': self.createddate,
             'isread': self.isread
         }
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""
+Notification Archive model
+"""
+from app import db
+
+class NotificationArchive(db.Model):
+    """Model cho bảng lưu trữ thông báo đã đọc quá hạn giữ lại (giữ nguyên notificationid)"""
+    __tablename__ = 'notificationarchive'
+    
+    notificationid = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    studentid = db.Column(db.Text, db.ForeignKey('student.studentid'), index=True, nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    createddate = db.Column(db.Date, nullable=False)
+    isread = db.Column(db.Boolean, nullable=False, default=True)
+    archiveddate = db.Column(db.Date, nullable=False)
+    
+    def to_dict(self):
+        """Chuyển đổi object thành dictionary (cùng định dạng với Notification)"""
+        return {
+            'notificationid': self.notificationid,
+            'studentid': self.studentid,
+            'message': self.message,
+            'createddate': self.createddate,
+            'isread': self.isread
+        }
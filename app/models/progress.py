@@ -14,6 +14,10 @@ class Progress(db.Model):
     completedcredits = db.Column(db.Integer, nullable=False)
     completionrate = db.Column(db.Float, nullable=False)
     lastupdated = db.Column(db.Date, nullable=False)
+
+    # Relationships
+    student = db.relationship('Student', back_populates='progress', lazy='raise')
+    course = db.relationship('Course', back_populates='progress', lazy='raise')
     
     def to_dict(self):
         """Chuyển đổi object thành dictionary"""
@@ -24,5 +28,5 @@ class Progress(db.Model):
             'progressrate': self.progressrate,
             'completedcredits': self.completedcredits,
             'completionrate': self.completionrate,
-            'lastupdated': self.lastupdated.isoformat() if self.lastupdated else None
+            'lastupdated': self.lastupdated
         }
\ No newline at end of file
@@ -19,6 +19,19 @@ class Student(db.Model):
     totalgpa = db.Column(db.Float, nullable=False)
     currentsemester = db.Column(db.Text, nullable=False)
     class_ = db.Column(db.Text, nullable=False, name='class')
+
+    # Relationships - lazy='raise': service phải chọn joinedload/selectinload khi cần,
+    # truy cập quan hệ chưa được nạp sẽ báo lỗi thay vì âm thầm sinh thêm truy vấn (N+1)
+    progress = db.relationship('Progress', back_populates='student', lazy='raise',
+                               order_by='Progress.progressid', passive_deletes=True)
+    bloom_assessments = db.relationship('BloomAssessment', back_populates='student', lazy='raise',
+                                        order_by='BloomAssessment.assessmentid', passive_deletes=True)
+    warnings = db.relationship('Warning', back_populates='student', lazy='raise',
+                               order_by='Warning.warningid', passive_deletes=True)
+    interventions = db.relationship('Intervention', back_populates='student', lazy='raise',
+                                    order_by='Intervention.interventionid', passive_deletes=True)
+    notifications = db.relationship('Notification', back_populates='student', lazy='raise',
+                                    order_by='Notification.notificationid', passive_deletes=True)
     
     def to_dict(self):
         """Chuyển đổi object thành dictionary"""
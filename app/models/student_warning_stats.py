@@ -0,0 +1,26 @@
+"""
+Student Warning Stats model
+"""
+from app import db
+
+class StudentWarningStats(db.Model):
+    """Model cho bảng thống kê cảnh báo theo sinh viên - được duy trì tự động khi Warning thay đổi"""
+    __tablename__ = 'studentwarningstats'
+    
+    studentid = db.Column(db.Text, db.ForeignKey('student.studentid'), primary_key=True)
+    warningcount = db.Column(db.Integer, nullable=False, default=0)
+    unresolvedcount = db.Column(db.Integer, nullable=False, default=0)
+    prioritysum = db.Column(db.Integer, nullable=False, default=0)
+    severitysum = db.Column(db.Integer, nullable=False, default=0)
+    lastwarningdate = db.Column(db.Date)
+    
+    def to_dict(self):
+        """Chuyển đổi object thành dictionary"""
+        return {
+            'studentid': self.studentid,
+            'warningcount': self.warningcount,
+            'unresolvedcount': self.unresolvedcount,
+            'prioritysum': self.prioritysum,
+            'severitysum': self.severitysum,
+            'lastwarningdate': self.lastwarningdate
+        }
@@ -19,6 +19,9 @@ class Warning(db.Model):
     resolveddate = db.Column(db.Date)
     isnotified = db.Column(db.Boolean, nullable=False, default=False)
     notificationsentdate = db.Column(db.Date)
+
+    # Relationships
+    student = db.relationship('Student', back_populates='warnings', lazy='raise')
     
     def to_dict(self):
         """Chuyển đổi object thành dictionary"""
@@ -30,9 +33,9 @@ class Warning(db.Model):
             'message': self.message,
             'severity': self.severity,
             'priority': self.priority,
-            'createddate': self.createddate.isoformat() if self.createddate else None,
+            'createddate': self.createddate,
             'isresolved': self.isresolved,
-            'resolveddate': self.resolveddate.isoformat() if self.resolveddate else None,
+            'resolveddate': self.resolveddate,
             'isnotified': self.isnotified,
-            'notificationsentdate': self.notificationsentdate.isoformat() if self.notificationsentdate else None
+            'notificationsentdate': self.notificationsentdate
         }
\ No newline at end of file
@@ -0,0 +1,39 @@
+"""
+Warning Archive model
+"""
+from app import db
+
+class WarningArchive(db.Model):
+    """Model cho bảng lưu trữ cảnh báo đã giải quyết quá hạn giữ lại (giữ nguyên warningid)"""
+    __tablename__ = 'warningarchive'
+    
+    warningid = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    studentid = db.Column(db.Text, db.ForeignKey('student.studentid'), index=True)
+    class_ = db.Column(db.Text, nullable=False, name='class')
+    warningtype = db.Column(db.Text, nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    severity = db.Column(db.Text, nullable=False)
+    priority = db.Column(db.Text, nullable=False)
+    createddate = db.Column(db.Date, nullable=False)
+    isresolved = db.Column(db.Boolean, nullable=False, default=True)
+    resolveddate = db.Column(db.Date)
+    isnotified = db.Column(db.Boolean, nullable=False, default=False)
+    notificationsentdate = db.Column(db.Date)
+    archiveddate = db.Column(db.Date, nullable=False)
+    
+    def to_dict(self):
+        """Chuyển đổi object thành dictionary (cùng định dạng với Warning)"""
+        return {
+            'warningid': self.warningid,
+            'studentid': self.studentid,
+            'class': self.class_,
+            'warningtype': self.warningtype,
+            'message': self.message,
+            'severity': self.severity,
+            'priority': self.priority,
+            'createddate': self.createddate,
+            'isresolved': self.isresolved,
+            'resolveddate': self.resolveddate,
+            'isnotified': self.isnotified,
+            'notificationsentdate': self.notificationsentdate
+        }
@@ -2,7 +2,6 @@
 Analytics routes - Các endpoint cho phân tích và đánh giá
 """
 import logging
-from datetime import datetime
 from flask import Blueprint, jsonify
 try:
     from flask_auth import get_current_user
@@ -11,7 +10,9 @@ except ImportError:
     def get_current_user():
         return {'role': 'admin', 'studentId': None}
 from app.models import Student, Progress, BloomAssessment, Assignment, CommonError, Warning
-from app.services import MLService, LLMService, StudentService
+from app.services import StudentService
+from app.services.container import get_services
+from app.services.search_service import SearchService
 
 analytics_bp = Blueprint('analytics', __name__)
 logger = logging.getLogger(__name__)
@@ -19,7 +20,6 @@ logger = logging.getLogger(__name__)
 @analytics_bp.route('/evaluate-model', methods=['GET'])
 def evaluate_model():
     """Đánh giá hiệu suất mô hình Machine Learning"""
-    start_time = datetime.now()
     logger.info("Bắt đầu xử lý đánh giá mô hình")
     user = get_current_user()
     if not user:
@@ -27,10 +27,9 @@ def evaluate_model():
         return jsonify({'error': 'Unauthorized: Missing user data'}), 401
     
     try:
-        ml_service = MLService()
+        ml_service = get_services().ml_service
         metrics = ml_service.get_model_metrics()
         response = {'metrics': metrics}
-        logger.info(f"Hoàn thành xử lý đánh giá mô hình trong {datetime.now() - start_time}")
         return jsonify(response)
     except Exception as e:
         logger.error(f"Không thể đánh giá mô hình: {str(e)}")
@@ -39,7 +38,6 @@ def evaluate_model():
 @analytics_bp.route('/evaluate-llm/<string:studentid>', methods=['GET'])
 def evaluate_llm(studentid):
     """Đánh giá hiệu suất LLM với các kịch bản khác nhau"""
-    start_time = datetime.now()
     logger.info(f"Bắt đầu xử lý đánh giá LLM cho studentid: {studentid}")
     user = get_current_user()
     if not user:
@@ -94,16 +92,13 @@ def evaluate_llm(studentid):
         ]
 
         # Đánh giá LLM với các kịch bản
-        llm_service = LLMService()
+        llm_service = get_services().llm_service
         results = llm_service.evaluate_llm_scenarios(scenarios)
 
         # Thêm kịch bản thực tế của sinh viên
-        warnings = Warning.query.filter(
-            Warning.studentid == studentid,
-            Warning.message.ilike('%Lỗi%')
-        ).all()
+        warnings = SearchService.student_warnings_containing(studentid, 'Lỗi')
         error_messages = [w.message for w in warnings]
-        common_error_types = [e.type for e in student_data['errors']]
+        common_error_types = [e['type'] for e in student_data['errors']]
         
         actual_recommendation = llm_service.generate_intervention_recommendation({
             'gpa': student.totalgpa,
@@ -121,7 +116,6 @@ def evaluate_llm(studentid):
             'studentid': studentid,
             'evaluation_results': results
         }
-        logger.info(f"Hoàn thành xử lý đánh giá LLM trong {datetime.now() - start_time}")
         return jsonify(response)
     except Exception as e:
         logger.error(f"Không thể đánh giá LLM: {str(e)}")
@@ -2,7 +2,6 @@
 Course routes - Các endpoint liên quan đến khóa học
 """
 import logging
-from datetime import datetime
 from flask import Blueprint, jsonify
 try:
     from flask_auth import get_current_user
@@ -13,6 +12,7 @@ except ImportError:
 from app.models import (Course, Student, Progress, Assignment, Chapter, 
                        CommonError, BloomAssessment)
 from app.services import StudentService
+from app.services.course_service import CourseService
 from app.utils import classify_student
 
 course_bp = Blueprint('course', __name__)
@@ -21,7 +21,6 @@ logger = logging.getLogger(__name__)
 @course_bp.route('/assignment-status/<int:assignmentid>', methods=['GET'])
 def get_assignment_status(assignmentid):
     """Lấy trạng thái nộp bài của assignment"""
-    start_time = datetime.now()
     logger.info(f"Bắt đầu xử lý trạng thái bài tập cho assignmentid: {assignmentid}")
     user = get_current_user()
     if not user:
@@ -34,16 +33,13 @@ def get_assignment_status(assignmentid):
             logger.warning(f"Không tìm thấy bài tập {assignmentid}")
             return jsonify({'error': 'Không tìm thấy bài tập'}), 404
 
-        course_students = Student.query.select_from(Student).join(
-            Progress, Progress.studentid == Student.studentid
-        ).filter(Progress.courseid == assignment.courseid).all()
+        course_rows = StudentService.get_course_student_rows(assignment.courseid)
         
-        if not course_students:
+        if not course_rows:
             logger.warning(f"Không tìm thấy sinh viên cho khóa học {assignment.courseid}")
             return jsonify({'error': 'Không tìm thấy sinh viên cho khóa học này'}), 404
 
-        response = StudentService.get_assignment_submission_details(assignment, course_students)
-        logger.info(f"Hoàn thành xử lý trạng thái bài tập trong {datetime.now() - start_time}")
+        response = StudentService.get_assignment_submission_details(assignment, course_rows)
         return jsonify(response)
     except Exception as e:
         logger.error(f"Không thể lấy trạng thái bài tập: {str(e)}")
@@ -52,7 +48,6 @@ def get_assignment_status(assignmentid):
 @course_bp.route('/class-progress/<int:courseid>', methods=['GET'])
 def get_class_progress(courseid):
     """Lấy tiến độ của cả lớp học"""
-    start_time = datetime.now()
     logger.info(f"Bắt đầu xử lý tiến độ lớp học cho courseid: {courseid}")
     user = get_current_user()
     if not user:
@@ -65,30 +60,18 @@ def get_class_progress(courseid):
             logger.warning(f"Không tìm thấy khóa học {courseid}")
             return jsonify({'error': 'Không tìm thấy khóa học'}), 404
 
-        students = Student.query.select_from(Student).join(
-            Progress, Progress.studentid == Student.studentid
-        ).filter(Progress.courseid == courseid).all()
-        total_students = len(students)
+        aggregates = CourseService.get_class_aggregates(courseid)
+        total_students = aggregates['total_students']
         
         if total_students == 0:
             logger.warning(f"Không tìm thấy sinh viên cho khóa học {courseid}")
             return jsonify({'error': 'Không tìm thấy sinh viên cho khóa học này'}), 404
 
-        progress_data = Progress.query.filter_by(courseid=courseid).all()
-        total_completion = sum(p.completionrate for p in progress_data) / total_students if progress_data else 0
-        avg_gpa = sum(s.totalgpa for s in students) / total_students if students else 0
+        total_completion = aggregates['completion_sum'] / total_students
+        avg_gpa = aggregates['gpa_sum'] / total_students
+        activity_rate = (aggregates['completed_count'] / total_students) * 100
 
-        active_students = sum(1 for p in progress_data if p.completionrate == 100)
-        activity_rate = (active_students / total_students) * 100 if total_students > 0 else 0
-
-        students_list = [{
-            'studentid': s.studentid,
-            'name': s.name,
-            'totalgpa': s.totalgpa,
-            'class': s.class_,
-            'progress': next((p.progressrate for p in progress_data if p.studentid == s.studentid), 0),
-            'status': classify_student(s.totalgpa)
-        } for s in students]
+        students_list = CourseService.get_class_students(courseid)
 
         response = {
             'courseid': courseid,
@@ -100,7 +83,6 @@ def get_class_progress(courseid):
             'completion_rate': round(total_completion, 2),
             'students': students_list
         }
-        logger.info(f"Hoàn thành xử lý tiến độ lớp học trong {datetime.now() - start_time}")
         return jsonify(response)
     except Exception as e:
         logger.error(f"Không thể lấy tiến độ lớp học: {str(e)}")
@@ -109,7 +91,6 @@ def get_class_progress(courseid):
 @course_bp.route('/chapter-details/<string:studentid>/<int:courseid>', methods=['GET'])
 def get_chapter_details(studentid, courseid):
     """Lấy chi tiết chương học của sinh viên trong khóa học"""
-    start_time = datetime.now()
     logger.info(f"Bắt đầu xử lý chi tiết chương cho studentid: {studentid}, courseid: {courseid}")
     user = get_current_user()
     if not user:
@@ -141,7 +122,6 @@ def get_chapter_details(studentid, courseid):
             'courseid': courseid,
             'chapters': chapter_details
         }
-        logger.info(f"Hoàn thành xử lý chi tiết chương trong {datetime.now() - start_time}")
         return jsonify(response)
     except Exception as e:
         logger.error(f"Không thể lấy chi tiết chương: {str(e)}")
@@ -150,7 +130,6 @@ def get_chapter_details(studentid, courseid):
 @course_bp.route('/common-errors/<int:courseid>', methods=['GET'])
 def get_course_common_errors(courseid):
     """Lấy danh sách lỗi thường gặp trong khóa học"""
-    start_time = datetime.now()
     logger.info(f"Bắt đầu xử lý lỗi chung cho courseid: {courseid}")
     user = get_current_user()
     if not user:
@@ -171,7 +150,6 @@ def get_course_common_errors(courseid):
             'studentsaffected': e.studentsaffected,
             'relatedchapters': e.relatedchapters
         } for e in errors]
-        logger.info(f"Hoàn thành xử lý lỗi chung trong {datetime.now() - start_time}")
         return jsonify(response)
     except Exception as e:
         logger.error(f"Không thể lấy các lỗi chung cho khóa học: {str(e)}")
@@ -180,7 +158,6 @@ def get_course_common_errors(courseid):
 @course_bp.route('/activity-rate/<int:courseid>', methods=['GET'])
 def get_activity_rate(courseid):
     """Lấy tỷ lệ hoạt động của khóa học"""
-    start_time = datetime.now()
     logger.info(f"Bắt đầu xử lý tỷ lệ hoạt động cho courseid: {courseid}")
     user = get_current_user()
     if not user:
@@ -188,22 +165,16 @@ def get_activity_rate(courseid):
         return jsonify({'error': 'Unauthorized: Missing user data'}), 401
     
     try:
-        total_students = Student.query.select_from(Student).join(
-            Progress, Progress.studentid == Student.studentid
-        ).filter(Progress.courseid == courseid).distinct().count()
+        aggregates = CourseService.get_class_aggregates(courseid)
+        total_students = aggregates['total_students']
         
         if total_students == 0:
-            logger.info(f"Tỷ lệ hoạt động cho khóa học {courseid}: 0.0 trong {datetime.now() - start_time}")
             return jsonify({'activity_rate': 0.0}), 200
 
-        active_students = Progress.query.filter(
-            Progress.courseid == courseid,
-            Progress.completionrate >= 80
-        ).count()
+        active_students = aggregates['active_count']
 
         activity_rate = (active_students / total_students) * 100 if total_students > 0 else 0
         response = {'activity_rate': round(activity_rate, 2)}
-        logger.info(f"Hoàn thành xử lý tỷ lệ hoạt động trong {datetime.now() - start_time}")
         return jsonify(response)
     except Exception as e:
         logger.error(f"Không thể lấy tỷ lệ hoạt động: {str(e)}")
@@ -20,7 +20,6 @@ logger = logging.getLogger(__name__)
 @dashboard_bp.route('/students', methods=['GET'])
 def get_students():
     """Lấy danh sách tất cả sinh viên"""
-    start_time = datetime.now()
     logger.info("Bắt đầu xử lý danh sách sinh viên")
     user = get_current_user()
     if not user:
@@ -36,7 +35,6 @@ def get_students():
             'class': s.class_,
             'status': classify_student(s.totalgpa)
         } for s in students]
-        logger.info(f"Hoàn thành xử lý danh sách sinh viên trong {datetime.now() - start_time}")
         return jsonify(response)
     except Exception as e:
         logger.error(f"Không thể lấy danh sách sinh viên: {str(e)}")
@@ -45,7 +43,6 @@ def get_students():
 @dashboard_bp.route('/courses', methods=['GET'])
 def get_courses():
     """Lấy danh sách tất cả khóa học"""
-    start_time = datetime.now()
     logger.info("Bắt đầu xử lý danh sách khóa học")
     user = get_current_user()
     if not user:
@@ -63,7 +60,6 @@ def get_courses():
             'difficulty': c.difficulty,
             'category': c.category
         } for c in courses]
-        logger.info(f"Hoàn thành xử lý danh sách khóa học trong {datetime.now() - start_time}")
         return jsonify(response)
     except Exception as e:
         logger.error(f"Không thể lấy danh sách khóa học: {str(e)}")
@@ -72,7 +68,6 @@ def get_courses():
 @dashboard_bp.route('/progress/<string:studentid>', methods=['GET'])
 def get_progress(studentid):
     """Lấy tiến độ học tập của sinh viên cụ thể"""
-    start_time = datetime.now()
     logger.info(f"Bắt đầu xử lý tiến độ cho studentid: {studentid}")
     user = get_current_user()
     if not user:
@@ -109,10 +104,9 @@ def get_progress(studentid):
             'progressid': p.progressid,
             'progressrate': p.progressrate,
             'completionrate': p.completionrate,
-            'lastupdated': p.lastupdated.isoformat(),
+            'lastupdated': p.lastupdated,
             'courseid': p.courseid
         } for p in progress]
-        logger.info(f"Hoàn thành xử lý tiến độ trong {datetime.now() - start_time}")
         return jsonify(response)
     except Exception as e:
         logger.error(f"Không thể lấy tiến độ: {str(e)}")
@@ -121,7 +115,6 @@ def get_progress(studentid):
 @dashboard_bp.route('/progress', methods=['GET'])
 def get_all_progress():
     """Lấy toàn bộ tiến độ học tập"""
-    start_time = datetime.now()
     logger.info("Bắt đầu xử lý toàn bộ tiến độ")
     user = get_current_user()
     if not user:
@@ -136,9 +129,8 @@ def get_all_progress():
             'courseid': p.courseid,
             'progressrate': p.progressrate,
             'completionrate': p.completionrate,
-            'lastupdated': p.lastupdated.isoformat()
+            'lastupdated': p.lastupdated
         } for p in progress]
-        logger.info(f"Hoàn thành xử lý toàn bộ tiến độ trong {datetime.now() - start_time}")
         return jsonify(response)
     except Exception as e:
         logger.error(f"Không thể lấy toàn bộ tiến độ: {str(e)}")
@@ -147,7 +139,6 @@ def get_all_progress():
 @dashboard_bp.route('/students/excellent', methods=['GET'])
 def get_excellent_students():
     """Lấy danh sách sinh viên xuất sắc"""
-    start_time = datetime.now()
     logger.info("Bắt đầu xử lý danh sách sinh viên xuất sắc")
     user = get_current_user()
     if not user:
@@ -163,7 +154,6 @@ def get_excellent_students():
             'class': s.class_,
             'status': classify_student(s.totalgpa)
         } for s in excellent_students]
-        logger.info(f"Hoàn thành xử lý danh sách sinh viên xuất sắc trong {datetime.now() - start_time}")
         return jsonify(response)
     except Exception as e:
         logger.error(f"Không thể lấy danh sách sinh viên xuất sắc: {str(e)}")
@@ -172,7 +162,6 @@ def get_excellent_students():
 @dashboard_bp.route('/students/needs-support', methods=['GET'])
 def get_needs_support_students():
     """Lấy danh sách sinh viên cần hỗ trợ"""
-    start_time = datetime.now()
     logger.info("Bắt đầu xử lý danh sách sinh viên cần hỗ trợ")
     user = get_current_user()
     if not user:
@@ -188,7 +177,6 @@ def get_needs_support_students():
             'class': s.class_,
             'status': classify_student(s.totalgpa)
         } for s in needs_support_students]
-        logger.info(f"Hoàn thành xử lý danh sách sinh viên cần hỗ trợ trong {datetime.now() - start_time}")
         return jsonify(response)
     except Exception as e:
         logger.error(f"Không thể lấy danh sách sinh viên cần hỗ trợ: {str(e)}")
@@ -197,7 +185,6 @@ def get_needs_support_students():
 @dashboard_bp.route('/warnings', methods=['GET'])
 def get_warnings():
     """Lấy danh sách cảnh báo chưa giải quyết"""
-    start_time = datetime.now()
     logger.info("Bắt đầu xử lý danh sách cảnh báo")
     user = get_current_user()
     if not user:
@@ -216,7 +203,6 @@ def get_warnings():
             'priority': w.priority,
             'isnotified': w.isnotified
         } for w in warnings]
-        logger.info(f"Hoàn thành xử lý danh sách cảnh báo trong {datetime.now() - start_time}")
         return jsonify(response)
     except Exception as e:
         logger.error(f"Không thể lấy danh sách cảnh báo: {str(e)}")
@@ -225,7 +211,6 @@ def get_warnings():
 @dashboard_bp.route('/assignments', methods=['GET'])
 def get_assignments():
     """Lấy danh sách tất cả bài tập"""
-    start_time = datetime.now()
     logger.info("Bắt đầu xử lý danh sách bài tập")
     user = get_current_user()
     if not user:
@@ -238,12 +223,11 @@ def get_assignments():
             'assignmentid': a.assignmentid,
             'courseid': a.courseid,
             'name': a.name,
-            'deadline': a.deadline.isoformat(),
+            'deadline': a.deadline,
             'submitted': a.submitted,
             'completionrate': a.completionrate,
             'status': a.status
         } for a in assignments]
-        logger.info(f"Hoàn thành xử lý danh sách bài tập trong {datetime.now() - start_time}")
         return jsonify(response)
     except Exception as e:
         logger.error(f"Không thể lấy danh sách bài tập: {str(e)}")
@@ -252,7 +236,6 @@ def get_assignments():
 @dashboard_bp.route('/chapters', methods=['GET'])
 def get_chapters():
     """Lấy danh sách tất cả chương học"""
-    start_time = datetime.now()
     logger.info("Bắt đầu xử lý danh sách chương")
     user = get_current_user()
     if not user:
@@ -271,7 +254,6 @@ def get_chapters():
             'studentscompleted': c.studentscompleted,
             'estimatedtime': c.estimatedtime
         } for c in chapters]
-        logger.info(f"Hoàn thành xử lý danh sách chương trong {datetime.now() - start_time}")
         return jsonify(response)
     except Exception as e:
         logger.error(f"Không thể lấy danh sách chương: {str(e)}")
@@ -280,7 +262,6 @@ def get_chapters():
 @dashboard_bp.route('/common-errors', methods=['GET'])
 def get_common_errors():
     """Lấy danh sách lỗi thường gặp"""
-    start_time = datetime.now()
     logger.info("Bắt đầu xử lý danh sách lỗi thường gặp")
     user = get_current_user()
     if not user:
@@ -298,7 +279,6 @@ def get_common_errors():
             'studentsaffected': e.studentsaffected,
             'relatedchapters': e.relatedchapters
         } for e in errors]
-        logger.info(f"Hoàn thành xử lý danh sách lỗi thường gặp trong {datetime.now() - start_time}")
         return jsonify(response)
     except Exception as e:
         logger.error(f"Không thể lấy danh sách lỗi thường gặp: {str(e)}")
@@ -307,7 +287,6 @@ def get_common_errors():
 @dashboard_bp.route('/update-status', methods=['POST'])
 def update_status():
     """Cập nhật trạng thái cảnh báo"""
-    start_time = datetime.now()
     logger.info("Bắt đầu xử lý cập nhật trạng thái cảnh báo")
     user = get_current_user()
     if not user:
@@ -332,7 +311,6 @@ def update_status():
             return jsonify({'error': 'Trạng thái không hợp lệ'}), 400
 
         db.session.commit()
-        logger.info(f"Cập nhật trạng thái cảnh báo {warningid} thành công trong {datetime.now() - start_time}")
         return jsonify({'message': 'Cập nhật trạng thái thành công', 'warningid': warningid})
     except Exception as e:
         db.session.rollback()
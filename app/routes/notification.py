@@ -2,12 +2,12 @@
 Notification Routes - API endpoints cho thông báo
 """
 import logging
-from datetime import datetime
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from app import db
 from app.models import Student, Warning, Notification
 from app.services.notification_service import NotificationService
-from flask_auth import get_current_user
+from app.services.data_version_service import DataVersionService, notification_scope
+from flask_auth import ADMIN, STUDENT, get_current_user, require_role, require_student_access
 
 # Thiết lập logging
 logger = logging.getLogger(__name__)
@@ -16,38 +16,19 @@ logger = logging.getLogger(__name__)
 notification_bp = Blueprint('notification', __name__)
 
 @notification_bp.route('/api/dashboard/create-warning/<string:studentid>', methods=['POST'])
+@require_student_access(allow_other_roles=True)
 def create_warning(studentid):
     """Tạo thông báo cho sinh viên dựa trên dự đoán ML"""
-    start_time = datetime.now()
     logger.info(f"Bắt đầu tạo thông báo cho studentid: {studentid}")
-    
-    user = get_current_user()
-    if not user:
-        logger.error("Unauthorized: Missing user data")
-        return jsonify({'error': 'Unauthorized: Missing user data'}), 401
-    
-    role = user.get('role')
-    user_studentid = user.get('studentId') 
-    
     try:
         # Kiểm tra studentid hợp lệ
         if not studentid or not isinstance(studentid, str):
             logger.error("ID sinh viên không hợp lệ")
             return jsonify({'error': 'ID sinh viên không hợp lệ'}), 400
         
-        # Kiểm tra quyền truy cập
-        if role == 'user':
-            if not user_studentid:
-                logger.error("Unauthorized: Missing student ID")
-                return jsonify({'error': 'Unauthorized: Missing student ID'}), 401
-            if user_studentid != studentid:
-                logger.error("Unauthorized: Students can only create notifications for themselves")
-                return jsonify({'error': 'Unauthorized: Students can only create notifications for themselves'}), 403
-        
         # Sử dụng service để tạo thông báo dựa trên ML prediction
         result = NotificationService.create_ml_prediction_notification(studentid)
         
-        logger.info(f"Hoàn thành tạo thông báo trong {datetime.now() - start_time}")
         return jsonify(result), result.get('status_code', 200)
         
     except ValueError as e:
@@ -58,48 +39,27 @@ def create_warning(studentid):
         return jsonify({'error': f'Lỗi khi tạo thông báo: {str(e)}'}), 500
 
 @notification_bp.route('/api/dashboard/student-notifications/<string:studentid>', methods=['GET'])
+@require_student_access()
 def get_student_notifications(studentid):
     """Lấy danh sách thông báo của sinh viên"""
-    start_time = datetime.now()
     logger.info(f"Bắt đầu lấy thông báo cho studentid: {studentid}")
-    
-    user = get_current_user()
-    if not user:
-        logger.error("Unauthorized: Missing user data")
-        return jsonify({'error': 'Unauthorized: Missing user data'}), 401
-    
-    role = user.get('role')
-    user_studentid = user.get('studentId')
-    
     try:
         # Kiểm tra studentid hợp lệ
         if not studentid or not isinstance(studentid, str):
             logger.error("ID sinh viên không hợp lệ")
             return jsonify({'error': 'ID sinh viên không hợp lệ'}), 400
         
-        # Kiểm tra quyền truy cập
-        target_studentid = None
-        if role == 'user':
-            if not user_studentid:
-                logger.error("Unauthorized: Missing student ID")
-                return jsonify({'error': 'Unauthorized: Missing student ID'}), 401
-            if user_studentid != studentid:
-                logger.error("Unauthorized: Students can only access their own notifications")
-                return jsonify({'error': 'Unauthorized: Students can only access their own notifications'}), 403
-            target_studentid = user_studentid
-        elif role == 'admin':
-            target_studentid = studentid
-        else:
-            logger.error("Unauthorized: Invalid role")
-            return jsonify({'error': 'Unauthorized: Invalid role'}), 403
-        
-        # Sử dụng service để lấy thông báo
-        notifications = NotificationService.get_student_notifications(target_studentid)
+        # Sử dụng service để lấy thông báo (mặc định cửa sổ gần đây và mọi thông báo chưa đọc,
+        # ?history=1 để lấy tất cả)
+        notifications = NotificationService.get_student_notifications(
+            studentid,
+            hot_months=current_app.config.get('NOTIFICATION_HOT_MONTHS'),
+            include_history=request.args.get('history', '').lower() in ('1', 'true', 'yes')
+        )
         
         # Chuyển đổi thành response format
         response = [notification.to_dict() for notification in notifications]
         
-        logger.info(f"Hoàn thành lấy thông báo trong {datetime.now() - start_time}")
         return jsonify(response), 200
         
     except Exception as e:
@@ -107,18 +67,11 @@ def get_student_notifications(studentid):
         return jsonify({'error': f'Lỗi khi lấy thông báo: {str(e)}'}), 500
 
 @notification_bp.route('/api/dashboard/notifications/<int:notification_id>/mark-read', methods=['PUT'])
+@require_role(ADMIN, STUDENT)
 def mark_notification_read(notification_id):
     """Đánh dấu thông báo đã đọc"""
-    start_time = datetime.now()
     logger.info(f"Bắt đầu đánh dấu thông báo đã đọc: {notification_id}")
-    
     user = get_current_user()
-    if not user:
-        logger.error("Unauthorized: Missing user data")
-        return jsonify({'error': 'Unauthorized: Missing user data'}), 401
-    
-    role = user.get('role')
-    user_studentid = user.get('studentId')
     
     try:
         # Tìm thông báo
@@ -127,14 +80,10 @@ def mark_notification_read(notification_id):
             logger.error(f"Không tìm thấy thông báo với ID: {notification_id}")
             return jsonify({'error': 'Không tìm thấy thông báo'}), 404
         
-        # Kiểm tra quyền truy cập
-        if role == 'user':
-            if not user_studentid or user_studentid != notification.studentid:
-                logger.error("Unauthorized: Students can only modify their own notifications")
-                return jsonify({'error': 'Unauthorized: Students can only modify their own notifications'}), 403
-        elif role != 'admin':
-            logger.error("Unauthorized: Invalid role")
-            return jsonify({'error': 'Unauthorized: Invalid role'}), 403
+        # Kiểm tra quyền truy cập: sinh viên chỉ sửa thông báo của mình
+        if user.get('role') == STUDENT and user.get('studentId') != notification.studentid:
+            logger.error("Unauthorized: Students can only modify their own notifications")
+            return jsonify({'error': 'Unauthorized: Students can only modify their own notifications'}), 403
         
         # Sử dụng service để đánh dấu đã đọc
         NotificationService.mark_notification_read(notification_id)
@@ -144,7 +93,6 @@ def mark_notification_read(notification_id):
             'message': 'Đánh dấu thông báo đã đọc thành công'
         }
         
-        logger.info(f"Hoàn thành đánh dấu thông báo trong {datetime.now() - start_time}")
         return jsonify(response), 200
         
     except ValueError as e:
@@ -155,102 +103,55 @@ def mark_notification_read(notification_id):
         return jsonify({'error': f'Lỗi khi đánh dấu thông báo: {str(e)}'}), 500
 
 @notification_bp.route('/api/dashboard/notifications/unread-count/<string:studentid>', methods=['GET'])
+@require_student_access()
 def get_unread_notifications_count(studentid):
     """Lấy số lượng thông báo chưa đọc của sinh viên"""
-    start_time = datetime.now()
     logger.info(f"Bắt đầu đếm thông báo chưa đọc cho studentid: {studentid}")
-    
-    user = get_current_user()
-    if not user:
-        logger.error("Unauthorized: Missing user data")
-        return jsonify({'error': 'Unauthorized: Missing user data'}), 401
-    
-    role = user.get('role')
-    user_studentid = user.get('studentId')
-    
     try:
         # Kiểm tra studentid hợp lệ
         if not studentid or not isinstance(studentid, str):
             logger.error("ID sinh viên không hợp lệ")
             return jsonify({'error': 'ID sinh viên không hợp lệ'}), 400
         
-        # Kiểm tra quyền truy cập
-        target_studentid = None
-        if role == 'user':
-            if not user_studentid:
-                logger.error("Unauthorized: Missing student ID")
-                return jsonify({'error': 'Unauthorized: Missing student ID'}), 401
-            if user_studentid != studentid:
-                logger.error("Unauthorized: Students can only access their own data")
-                return jsonify({'error': 'Unauthorized: Students can only access their own data'}), 403
-            target_studentid = user_studentid
-        elif role == 'admin':
-            target_studentid = studentid
-        else:
-            logger.error("Unauthorized: Invalid role")
-            return jsonify({'error': 'Unauthorized: Invalid role'}), 403
+        validators = DataVersionService.validators(notification_scope(studentid))
+        if validators.is_fresh():
+            logger.info(f"Số thông báo chưa đọc của {studentid} không thay đổi (304)")
+            return validators.not_modified()
         
         # Sử dụng service để đếm thông báo chưa đọc
-        unread_count = NotificationService.get_unread_count(target_studentid)
+        unread_count = NotificationService.get_unread_count(studentid)
         
         response = {
             'studentid': studentid,
             'unread_count': unread_count
         }
         
-        logger.info(f"Hoàn thành đếm thông báo trong {datetime.now() - start_time}")
-        return jsonify(response), 200
+        return validators.apply(jsonify(response)), 200
         
     except Exception as e:
         logger.error(f"Lỗi khi đếm thông báo: {str(e)}")
         return jsonify({'error': f'Lỗi khi đếm thông báo: {str(e)}'}), 500
 
 @notification_bp.route('/api/dashboard/notifications/mark-all-read/<string:studentid>', methods=['PUT'])
+@require_student_access()
 def mark_all_notifications_read(studentid):
     """Đánh dấu tất cả thông báo của sinh viên đã đọc"""
-    start_time = datetime.now()
     logger.info(f"Bắt đầu đánh dấu tất cả thông báo đã đọc cho studentid: {studentid}")
-    
-    user = get_current_user()
-    if not user:
-        logger.error("Unauthorized: Missing user data")
-        return jsonify({'error': 'Unauthorized: Missing user data'}), 401
-    
-    role = user.get('role')
-    user_studentid = user.get('studentId')
-    
     try:
         # Kiểm tra studentid hợp lệ
         if not studentid or not isinstance(studentid, str):
             logger.error("ID sinh viên không hợp lệ")
             return jsonify({'error': 'ID sinh viên không hợp lệ'}), 400
         
-        # Kiểm tra quyền truy cập
-        target_studentid = None
-        if role == 'user':
-            if not user_studentid:
-                logger.error("Unauthorized: Missing student ID")
-                return jsonify({'error': 'Unauthorized: Missing student ID'}), 401
-            if user_studentid != studentid:
-                logger.error("Unauthorized: Students can only modify their own notifications")
-                return jsonify({'error': 'Unauthorized: Students can only modify their own notifications'}), 403
-            target_studentid = user_studentid
-        elif role == 'admin':
-            target_studentid = studentid
-        else:
-            logger.error("Unauthorized: Invalid role")
-            return jsonify({'error': 'Unauthorized: Invalid role'}), 403
-        
         # Sử dụng service để đánh dấu tất cả thông báo đã đọc
-        count = NotificationService.mark_all_notifications_read(target_studentid)
+        count = NotificationService.mark_all_notifications_read(studentid)
         
         response = {
-            'studentid': target_studentid,
+            'studentid': studentid,
             'marked_count': count,
             'message': f'Đánh dấu {count} thông báo đã đọc thành công'
         }
         
-        logger.info(f"Hoàn thành đánh dấu tất cả thông báo trong {datetime.now() - start_time}")
         return jsonify(response), 200
         
     except Exception as e:
@@ -258,46 +159,20 @@ def mark_all_notifications_read(studentid):
         return jsonify({'error': f'Lỗi khi đánh dấu tất cả thông báo: {str(e)}'}), 500
 
 @notification_bp.route('/api/dashboard/notifications/stats/<string:studentid>', methods=['GET'])
+@require_student_access()
 def get_notification_stats(studentid):
     """Lấy thống kê thông báo của sinh viên"""
-    start_time = datetime.now()
     logger.info(f"Bắt đầu lấy thống kê thông báo cho studentid: {studentid}")
-    
-    user = get_current_user()
-    if not user:
-        logger.error("Unauthorized: Missing user data")
-        return jsonify({'error': 'Unauthorized: Missing user data'}), 401
-    
-    role = user.get('role')
-    user_studentid = user.get('studentId')
-    
     try:
         # Kiểm tra studentid hợp lệ
         if not studentid or not isinstance(studentid, str):
             logger.error("ID sinh viên không hợp lệ")
             return jsonify({'error': 'ID sinh viên không hợp lệ'}), 400
         
-        # Kiểm tra quyền truy cập
-        target_studentid = None
-        if role == 'user':
-            if not user_studentid:
-                logger.error("Unauthorized: Missing student ID")
-                return jsonify({'error': 'Unauthorized: Missing student ID'}), 401
-            if user_studentid != studentid:
-                logger.error("Unauthorized: Students can only access their own data")
-                return jsonify({'error': 'Unauthorized: Students can only access their own data'}), 403
-            target_studentid = user_studentid
-        elif role == 'admin':
-            target_studentid = studentid
-        else:
-            logger.error("Unauthorized: Invalid role")
-            return jsonify({'error': 'Unauthorized: Invalid role'}), 403
-        
         # Sử dụng service để lấy thống kê
-        stats = NotificationService.get_notification_stats(target_studentid)
-        stats['studentid'] = target_studentid
+        stats = NotificationService.get_notification_stats(studentid)
+        stats['studentid'] = studentid
         
-        logger.info(f"Hoàn thành lấy thống kê thông báo trong {datetime.now() - start_time}")
         return jsonify(stats), 200
         
     except Exception as e:
@@ -305,21 +180,10 @@ def get_notification_stats(studentid):
         return jsonify({'error': f'Lỗi khi lấy thống kê thông báo: {str(e)}'}), 500
 
 @notification_bp.route('/api/dashboard/notifications/<int:notification_id>', methods=['DELETE'])
+@require_role(ADMIN)
 def delete_notification(notification_id):
     """Xóa thông báo (chỉ admin)"""
-    start_time = datetime.now()
     logger.info(f"Bắt đầu xóa thông báo: {notification_id}")
-    
-    user = get_current_user()
-    if not user:
-        logger.error("Unauthorized: Missing user data")
-        return jsonify({'error': 'Unauthorized: Missing user data'}), 401
-    
-    role = user.get('role')
-    if role != 'admin':
-        logger.error("Unauthorized: Only admin can delete notifications")
-        return jsonify({'error': 'Unauthorized: Only admin can delete notifications'}), 403
-    
     try:
         # Sử dụng service để xóa thông báo
         NotificationService.delete_notification(notification_id)
@@ -329,7 +193,6 @@ def delete_notification(notification_id):
             'message': 'Xóa thông báo thành công'
         }
         
-        logger.info(f"Hoàn thành xóa thông báo trong {datetime.now() - start_time}")
         return jsonify(response), 200
         
     except ValueError as e:
@@ -340,21 +203,10 @@ def delete_notification(notification_id):
         return jsonify({'error': f'Lỗi khi xóa thông báo: {str(e)}'}), 500
 
 @notification_bp.route('/api/dashboard/create-manual-warning/<string:studentid>', methods=['POST'])
+@require_role(ADMIN)
 def create_manual_warning(studentid):
     """Tạo cảnh báo và thông báo thủ công cho sinh viên"""
-    start_time = datetime.now()
     logger.info(f"Bắt đầu tạo cảnh báo thủ công cho studentid: {studentid}")
-    
-    user = get_current_user()
-    if not user:
-        logger.error("Unauthorized: Missing user data")
-        return jsonify({'error': 'Unauthorized: Missing user data'}), 401
-    
-    role = user.get('role')
-    if role != 'admin':
-        logger.error("Unauthorized: Only admin can create manual warnings")
-        return jsonify({'error': 'Unauthorized: Only admin can create manual warnings'}), 403
-    
     try:
         # Kiểm tra studentid hợp lệ
         if not studentid or not isinstance(studentid, str):
@@ -392,7 +244,6 @@ def create_manual_warning(studentid):
             'message': 'Tạo cảnh báo và thông báo thủ công thành công'
         }
         
-        logger.info(f"Hoàn thành tạo cảnh báo thủ công trong {datetime.now() - start_time}")
         return jsonify(response), 201
         
     except ValueError as e:
@@ -13,7 +13,9 @@ except ImportError:
 from app import db
 from app.models import (Student, Progress, BloomAssessment, Warning, Assignment, 
                        Chapter, Intervention, CommonError, Course, CourseHistory)
-from app.services import MLService, LLMService, StudentService
+from app.services import StudentService
+from app.services.container import get_services
+from app.services.report_service import StudentReportService
 from app.utils import classify_student
 
 student_bp = Blueprint('student', __name__)
@@ -22,7 +24,6 @@ logger = logging.getLogger(__name__)
 @student_bp.route('/report/<string:studentid>', methods=['GET'])
 def get_student_report(studentid):
     """Lấy báo cáo chi tiết của sinh viên"""
-    start_time = datetime.now()
     logger.info(f"Bắt đầu xử lý báo cáo sinh viên cho studentid: {studentid}")
     user = get_current_user()
     if not user:
@@ -34,83 +35,17 @@ def get_student_report(studentid):
             logger.error("ID sinh viên không hợp lệ")
             return jsonify({'error': 'ID sinh viên không hợp lệ'}), 400
         
-        student = Student.query.get(studentid)
-        if not student:
+        try:
+            sections = StudentReportService.parse_sections(request.args.get('sections'))
+        except ValueError as e:
+            logger.error(str(e))
+            return jsonify({'error': str(e)}), 400
+
+        response = StudentReportService.build_report(studentid, sections)
+        if response is None:
             logger.warning(f"Không tìm thấy sinh viên {studentid}")
             return jsonify({'error': 'Không tìm thấy sinh viên'}), 404
 
-        progress = Progress.query.filter_by(studentid=studentid).all()
-        warnings = Warning.query.filter_by(studentid=studentid, isresolved=False).all()
-        bloom_assessments = BloomAssessment.query.filter_by(studentid=studentid).all()
-        course_id = progress[0].courseid if progress else None
-        assignments = Assignment.query.filter_by(courseid=course_id).all() if course_id else []
-        chapters = Chapter.query.filter_by(courseid=course_id).all() if course_id else []
-        interventions = Intervention.query.filter_by(studentid=studentid).all()
-
-        suggestions_from_warnings = [{
-            'id': w.warningid,
-            'title': 'Đề xuất cải thiện',
-            'content': w.message,
-            'type': 'info'
-        } for w in warnings if w.warningtype == 'THÔNG TIN']
-
-        suggestions_from_interventions = [{
-            'id': i.interventionid,
-            'title': 'Đề xuất can thiệp',
-            'content': i.recommendation,
-            'type': 'info'
-        } for i in interventions]
-
-        all_suggestions = suggestions_from_warnings + suggestions_from_interventions
-
-        response = {
-            'student': {
-                'studentid': student.studentid,
-                'name': student.name,
-                'totalgpa': student.totalgpa,
-                'class': student.class_,
-                'status': classify_student(student.totalgpa)
-            },
-            'progress': [{
-                'progressid': p.progressid,
-                'progressrate': p.progressrate,
-                'completionrate': p.completionrate,
-                'lastupdated': p.lastupdated.isoformat(),
-                'courseid': p.courseid
-            } for p in progress],
-            'bloom_assessments': [{
-                'assessmentid': b.assessmentid,
-                'bloomlevel': b.bloomlevel,
-                'status': b.status,
-                'score': b.score,
-                'lastupdated': b.lastupdated.isoformat()
-            } for b in bloom_assessments],
-            'warnings': [{
-                'warningid': w.warningid,
-                'class': w.class_,
-                'warningtype': w.warningtype,
-                'message': w.message,
-                'severity': w.severity,
-                'priority': w.priority
-            } for w in warnings],
-            'assignments': [{
-                'assignmentid': a.assignmentid,
-                'name': a.name,
-                'deadline': a.deadline.isoformat(),
-                'submitted': a.submitted,
-                'completionrate': a.completionrate,
-                'status': a.status
-            } for a in assignments],
-            'chapters': [{
-                'chapterid': c.chapterid,
-                'name': c.name,
-                'completionrate': c.completionrate,
-                'averagescore': c.averagescore,
-                'estimatedtime': c.estimatedtime
-            } for c in chapters],
-            'suggestions': all_suggestions
-        }
-        logger.info(f"Hoàn thành xử lý báo cáo sinh viên trong {datetime.now() - start_time}")
         return jsonify(response)
     except Exception as e:
         logger.error(f"Không thể lấy báo cáo sinh viên: {str(e)}")
@@ -119,7 +54,6 @@ def get_student_report(studentid):
 @student_bp.route('/predict-intervention/<string:studentid>', methods=['GET'])
 def predict_intervention(studentid):
     """Dự đoán can thiệp cho sinh viên"""
-    start_time = datetime.now()
     logger.info(f"Bắt đầu xử lý dự đoán can thiệp cho studentid: {studentid}")
     user = get_current_user()
     if not user:
@@ -154,10 +88,10 @@ def predict_intervention(studentid):
         # Lấy danh sách lỗi
         warnings = Warning.query.filter_by(studentid=studentid).all()
         error_messages = [w.message for w in warnings]
-        common_error_types = [e.type for e in student_data['errors']]
+        common_error_types = [e['type'] for e in student_data['errors']]
 
         # Tạo đề xuất can thiệp bằng LLM
-        llm_service = LLMService()
+        llm_service = get_services().llm_service
         recommendation = llm_service.generate_intervention_recommendation(
             student_data, error_messages, common_error_types
         )
@@ -182,7 +116,6 @@ def predict_intervention(studentid):
             'suggestions': parsed_suggestions,
             'interventionid': new_intervention.interventionid
         }
-        logger.info(f"Hoàn thành xử lý dự đoán can thiệp trong {datetime.now() - start_time}")
         return jsonify(response)
     except Exception as e:
         logger.error(f"Không thể dự đoán can thiệp: {str(e)}")
@@ -191,7 +124,6 @@ def predict_intervention(studentid):
 @student_bp.route('/errors/<string:studentid>', methods=['GET'])
 def get_student_errors(studentid):
     """Lấy danh sách lỗi của sinh viên"""
-    start_time = datetime.now()
     logger.info(f"Bắt đầu xử lý danh sách lỗi cho studentid: {studentid}")
     user = get_current_user()
     if not user:
@@ -232,7 +164,7 @@ def get_student_errors(studentid):
             'personal_errors': [{
                 'warningid': w.warningid,
                 'message': w.message,
-                'createddate': w.createddate.isoformat() if w.createddate else None,
+                'createddate': w.createddate,
                 'severity': getattr(w, 'severity', 'medium')
             } for w in warnings],
             'common_errors': [{
@@ -244,7 +176,6 @@ def get_student_errors(studentid):
             'total_personal_errors': len(warnings),
             'total_common_errors': len(common_errors)
         }
-        logger.info(f"Hoàn thành xử lý danh sách lỗi trong {datetime.now() - start_time}")
         return jsonify(response)
     except Exception as e:
         logger.error(f"Không thể lấy danh sách lỗi: {str(e)}")
@@ -253,7 +184,6 @@ def get_student_errors(studentid):
 @student_bp.route('/create-warning/<string:studentid>', methods=['POST'])
 def create_warning(studentid):
     """Tạo cảnh báo cho sinh viên"""
-    start_time = datetime.now()
     logger.info(f"Bắt đầu xử lý tạo cảnh báo cho studentid: {studentid}")
     user = get_current_user()
     if not user:
@@ -272,7 +202,7 @@ def create_warning(studentid):
             return jsonify({'error': 'Không tìm thấy dữ liệu sinh viên'}), 404
 
         # Dự đoán nguy cơ
-        ml_service = MLService()
+        ml_service = get_services().ml_service
         risk_prediction = ml_service.predict_risk(
             student_data['gpa'],
             student_data['progressrate'],
@@ -287,10 +217,8 @@ def create_warning(studentid):
         )
 
         if warning_result:
-            logger.info(f"Cảnh báo đã được tạo cho sinh viên {studentid} trong {datetime.now() - start_time}")
             return jsonify(warning_result), 201
 
-        logger.info(f"Không tạo cảnh báo, sinh viên {studentid} an toàn trong {datetime.now() - start_time}")
         return jsonify({'message': 'Không tạo cảnh báo, sinh viên an toàn'}), 200
     except Exception as e:
         db.session.rollback()
@@ -300,7 +228,6 @@ def create_warning(studentid):
 @student_bp.route('/learning-path/<string:studentid>', methods=['GET'])
 def get_learning_path(studentid):
     """Lấy lộ trình học tập cho sinh viên"""
-    start_time = datetime.now()
     logger.info(f"Bắt đầu xử lý lộ trình học tập cho studentid: {studentid}")
     user = get_current_user()
     if not user:
@@ -364,7 +291,7 @@ def get_learning_path(studentid):
         recommended_courses = []
         
         if student_data:
-            ml_service = MLService()
+            ml_service = get_services().ml_service
             risk_prediction = ml_service.predict_risk(
                 student_data['gpa'],
                 student_data['progressrate'],
@@ -412,7 +339,6 @@ def get_learning_path(studentid):
             'recommended_courses': recommended_courses_data,
             'all_courses': all_courses_data
         }
-        logger.info(f"Hoàn thành xử lý lộ trình học tập trong {datetime.now() - start_time}")
         return jsonify(response)
     except Exception as e:
         logger.error(f"Không thể lấy lộ trình học tập: {str(e)}")
@@ -5,5 +5,19 @@ from .ml_service import MLService
 from .llm_service import LLMService
 from .student_service import StudentService
 from .warning_service import WarningService
+from .read_model_service import ReadModelService
+from .course_service import CourseService
+from .course_summary_service import CourseSummaryService
+from .warning_stats_service import WarningStatsService
+from .risk_sweep_service import RiskSweepService
+from .retention_service import RetentionService
+from .search_service import SearchService
+from .reference_data_service import ReferenceDataService
+from .data_version_service import DataVersionService
+from .container import ServiceContainer, get_services
 
-__all__ = ['MLService', 'LLMService', 'StudentService', 'WarningService']
\ No newline at end of file
+__all__ = ['MLService', 'LLMService', 'StudentService', 'WarningService', 'ReadModelService',
+           'CourseService', 'CourseSummaryService',
+           'WarningStatsService', 'RiskSweepService',
+           'RetentionService', 'SearchService', 'ReferenceDataService',
+           'DataVersionService', 'ServiceContainer', 'get_services']
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+Service Container - Khởi tạo lười các service nặng (mô hình ML, client OpenAI) theo cấu hình của app
+"""
+import logging
+import threading
+from datetime import datetime
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+class ServiceContainer:
+    """
+    Nơi giữ các service dùng chung giữa các blueprint của một app
+
+    Mỗi service chỉ được tạo ở lần dùng đầu tiên (một lần cho mỗi process), với
+    cấu hình lấy từ app.config. Process không dùng ML/LLM không phải nạp mô hình
+    hay tạo client OpenAI.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._instances = {}
+        self._lock = threading.RLock()
+
+    def _get(self, name, factory):
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    start_time = datetime.now()
+                    instance = factory()
+                    self._instances[name] = instance
+                    logger.info(f"Khởi tạo {type(instance).__name__} trong {datetime.now() - start_time}")
+        return instance
+
+    def override(self, name, instance):
+        """
+        Dùng instance cho sẵn thay cho service của container (test, benchmark với LLM giả lập)
+
+        Args:
+            name (str): 'ml', 'llm', 'warning' hoặc 'intervention'
+            instance: Service thay thế
+        """
+        with self._lock:
+            self._instances[name] = instance
+
+    @property
+    def ml_service(self):
+        """MLService với mô hình tại MODEL_PATH"""
+        from app.services.ml_service import MLService
+        return self._get('ml', lambda: MLService(model_path=self.config.get('MODEL_PATH')))
+
+    @property
+    def llm_service(self):
+        """LLMService với OPENAI_API_KEY"""
+        from app.services.llm_service import LLMService
+        return self._get('llm', lambda: LLMService(api_key=self.config.get('OPENAI_API_KEY')))
+
+    @property
+    def warning_service(self):
+        """WarningService dùng chung MLService của container"""
+        from app.services.warning_service import WarningService
+        return self._get('warning', lambda: WarningService(ml_service=self.ml_service))
+
+    @property
+    def intervention_service(self):
+        """InterventionService dùng chung LLMService của container"""
+        from app.services.intervention_service import InterventionService
+        return self._get('intervention', lambda: InterventionService(llm_service=self.llm_service))
+
+def init_services(app):
+    """Gắn service container vào app (gọi một lần trong create_app)"""
+    app.extensions['services'] = ServiceContainer(app.config)
+    return app.extensions['services']
+
+def get_services():
+    """Service container của app hiện tại"""
+    return current_app.extensions['services']
@@ -0,0 +1,98 @@
+"""
+Course Service - Thống kê tiến độ lớp học tính bằng SQL
+"""
+from sqlalchemy import select, func, distinct
+from app import db
+from app.models import Student, Progress
+from app.utils import classify_student
+
+class CourseService:
+    """Service xử lý thống kê theo khóa học"""
+
+    @staticmethod
+    def class_aggregates_statement(courseid):
+        """
+        Câu lệnh tính các chỉ số tổng hợp của khóa học trong một round trip
+
+        Args:
+            courseid (int): ID khóa học
+
+        Returns:
+            Select: Một dòng gồm total_students, gpa_sum, completion_sum,
+                    completed_count (completionrate == 100), active_count (completionrate >= 80)
+        """
+        course_studentids = select(Progress.studentid).where(Progress.courseid == courseid)
+
+        total_students = select(func.count(distinct(Progress.studentid))).join(
+            Student, Student.studentid == Progress.studentid
+        ).where(Progress.courseid == courseid).scalar_subquery()
+        gpa_sum = select(func.coalesce(func.sum(Student.totalgpa), 0.0)).where(
+            Student.studentid.in_(course_studentids)
+        ).scalar_subquery()
+        completion_sum = select(func.coalesce(func.sum(Progress.completionrate), 0.0)).where(
+            Progress.courseid == courseid
+        ).scalar_subquery()
+        completed_count = select(func.count()).select_from(Progress).where(
+            Progress.courseid == courseid, Progress.completionrate == 100
+        ).scalar_subquery()
+        active_count = select(func.count()).select_from(Progress).where(
+            Progress.courseid == courseid, Progress.completionrate >= 80
+        ).scalar_subquery()
+
+        return select(
+            total_students.label('total_students'),
+            gpa_sum.label('gpa_sum'),
+            completion_sum.label('completion_sum'),
+            completed_count.label('completed_count'),
+            active_count.label('active_count')
+        )
+
+    @staticmethod
+    def get_class_aggregates(courseid):
+        """
+        Tính các chỉ số tổng hợp của khóa học từ dữ liệu gốc
+
+        Args:
+            courseid (int): ID khóa học
+
+        Returns:
+            dict: Kết quả của class_aggregates_statement()
+        """
+        row = db.session.execute(CourseService.class_aggregates_statement(courseid)).one()
+        return dict(row._mapping)
+
+    @staticmethod
+    def get_class_students(courseid):
+        """
+        Lấy danh sách sinh viên của khóa học kèm tiến độ qua JOIN
+
+        Mỗi sinh viên lấy bản ghi tiến độ đầu tiên trong khóa học.
+
+        Args:
+            courseid (int): ID khóa học
+
+        Returns:
+            list: Danh sách dict sinh viên
+        """
+        rows = db.session.execute(
+            select(Student.studentid, Student.name, Student.totalgpa, Student.class_, Progress.progressrate)
+            .join(Progress, Progress.studentid == Student.studentid)
+            .where(Progress.courseid == courseid)
+            .order_by(Progress.progressid)
+        )
+
+        seen = set()
+        students = []
+        for studentid, name, totalgpa, class_, progressrate in rows:
+            if studentid in seen:
+                continue
+            seen.add(studentid)
+            students.append({
+                'studentid': studentid,
+                'name': name,
+                'totalgpa': totalgpa,
+                'class': class_,
+                'progress': progressrate,
+                'status': classify_student(totalgpa)
+            })
+        return students
@@ -0,0 +1,260 @@
+"""
+Course Summary Service - Duy trì bảng coursesummary cho dashboard khóa học
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import event, inspect, select, update, func
+from sqlalchemy.orm import Session
+from app import db
+from app.models import Student, Course, Progress, CourseSummary
+from app.services.course_service import CourseService
+from app.services.data_version_service import DataVersionService, course_scope
+from app.utils.upsert import upsert
+
+logger = logging.getLogger(__name__)
+
+summary_table = CourseSummary.__table__
+
+# Các cột cộng dồn được (lastupdated xử lý riêng)
+COUNTER_COLUMNS = ('totalstudents', 'gpasum', 'completionsum', 'completedcount', 'activecount')
+
+# Các thuộc tính của Progress ảnh hưởng đến bảng tổng hợp
+TRACKED_ATTRIBUTES = ('studentid', 'courseid', 'completionrate')
+
+class CourseSummaryService:
+    """
+    Service đọc và duy trì bảng tổng hợp khóa học
+
+    Thêm, sửa, xóa Progress (hoặc sửa GPA của Student) qua ORM được áp dụng dưới dạng
+    cộng dồn (col = col + delta) trong cùng transaction, nên chi phí mỗi lần flush không
+    phụ thuộc sĩ số lớp và dashboard chỉ cần đọc một dòng theo khóa chính. Dòng tổng hợp
+    được tạo khi thêm khóa học. Những thay đổi đi vòng qua ORM (bulk update, SQL thủ công,
+    cascade của database) và sai số cộng dồn được đồng bộ lại bằng refresh_all().
+    """
+
+    @staticmethod
+    def refresh_course(courseid, connection=None):
+        """
+        Tính lại dòng tổng hợp của một khóa học từ dữ liệu gốc (upsert)
+
+        Args:
+            courseid (int): ID khóa học
+            connection: Connection đang dùng (mặc định là connection của db.session)
+
+        Returns:
+            dict: Các giá trị vừa ghi
+        """
+        connection = connection if connection is not None else db.session.connection()
+        values = dict(_compute(courseid, connection), lastupdated=datetime.utcnow())
+        upsert(connection, summary_table, dict(values, courseid=courseid), ['courseid'])
+        return dict(values, courseid=courseid)
+
+    @staticmethod
+    def apply_deltas(deltas, connection=None):
+        """
+        Cộng dồn thay đổi vào bảng tổng hợp
+
+        Khóa học chưa có dòng tổng hợp được tính lại đầy đủ (dữ liệu gốc lúc này đã chứa
+        các thay đổi vừa flush). Các dòng được cập nhật theo thứ tự courseid để các
+        transaction đồng thời không khóa chéo nhau.
+
+        Args:
+            deltas (dict): courseid -> dict các cột COUNTER_COLUMNS
+            connection: Connection đang dùng (mặc định là connection của db.session)
+        """
+        connection = connection if connection is not None else db.session.connection()
+        now = datetime.utcnow()
+        for courseid in sorted(deltas):
+            delta = deltas[courseid]
+            if not any(delta[column] for column in COUNTER_COLUMNS):
+                continue
+            values = {column: summary_table.c[column] + delta[column] for column in COUNTER_COLUMNS}
+            result = connection.execute(
+                update(summary_table).where(summary_table.c.courseid == courseid).values(lastupdated=now, **values)
+            )
+            if result.rowcount == 0:
+                CourseSummaryService.refresh_course(courseid, connection)
+
+    @staticmethod
+    def refresh_all():
+        """
+        Tính lại toàn bộ bảng tổng hợp (job định kỳ để xử lý sai lệch)
+
+        Returns:
+            int: Số khóa học đã tính lại
+        """
+        courseids = db.session.execute(select(Course.courseid).order_by(Course.courseid)).scalars().all()
+        for courseid in courseids:
+            CourseSummaryService.refresh_course(courseid)
+        # Thay đổi đi vòng qua ORM không tăng phiên bản, client polling cần tải lại
+        DataVersionService.bump(course_scope(courseid) for courseid in courseids)
+        db.session.commit()
+        logger.info(f"Đã tính lại bảng tổng hợp cho {len(courseids)} khóa học")
+        return len(courseids)
+
+    @staticmethod
+    def get_summary(courseid):
+        """
+        Lấy dòng tổng hợp của khóa học
+
+        Nếu chưa có dòng tổng hợp (khóa học có trước bảng tổng hợp, chưa chạy refresh_all)
+        thì tính trực tiếp từ dữ liệu gốc (không ghi).
+
+        Args:
+            courseid (int): ID khóa học
+
+        Returns:
+            dict: Dòng tổng hợp (các cột của coursesummary), hoặc None nếu không có khóa học
+        """
+        row = db.session.execute(
+            select(summary_table).where(summary_table.c.courseid == courseid)
+        ).first()
+        if row is not None:
+            return dict(row._mapping)
+        if db.session.get(Course, courseid) is None:
+            return None
+        return dict(_compute(courseid, db.session.connection()), courseid=courseid, lastupdated=None)
+
+    @staticmethod
+    def get_course_dashboard(courseid):
+        """
+        Lấy thông tin khóa học kèm dòng tổng hợp bằng một truy vấn theo khóa chính
+
+        Args:
+            courseid (int): ID khóa học
+
+        Returns:
+            dict: coursename, semester và các cột tổng hợp, hoặc None nếu không có khóa học
+        """
+        row = db.session.execute(
+            select(Course.coursename, Course.semester, summary_table)
+            .select_from(Course)
+            .outerjoin(summary_table, summary_table.c.courseid == Course.courseid)
+            .where(Course.courseid == courseid)
+        ).first()
+        if row is None:
+            return None
+
+        dashboard = dict(row._mapping)
+        if dashboard['courseid'] is None:
+            # Chưa có dòng tổng hợp: tính trực tiếp (không ghi), refresh_all() sẽ tạo dòng
+            dashboard.update(_compute(courseid, db.session.connection()), courseid=courseid)
+        return dashboard
+
+def _compute(courseid, connection):
+    """Các cột COUNTER_COLUMNS của khóa học tính từ dữ liệu gốc"""
+    aggregates = connection.execute(CourseService.class_aggregates_statement(courseid)).one()
+    return {
+        'totalstudents': aggregates.total_students,
+        'gpasum': aggregates.gpa_sum,
+        'completionsum': aggregates.completion_sum,
+        'completedcount': aggregates.completed_count,
+        'activecount': aggregates.active_count
+    }
+
+def _changed(obj, *attributes):
+    """Kiểm tra object có thay đổi ở một trong các thuộc tính hay không"""
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in attributes)
+
+def _previous_value(obj, name):
+    """Giá trị của thuộc tính trước lần flush hiện tại"""
+    history = inspect(obj).attrs[name].history
+    if not history.has_changes():
+        return getattr(obj, name)
+    return history.deleted[0] if history.deleted else None
+
+def _add_progress(deltas, rows, studentid, courseid, completionrate, sign):
+    """Cộng (sign = 1) hoặc trừ (sign = -1) phần đóng góp của một dòng Progress"""
+    if courseid is None:
+        return
+    rows[(studentid, courseid)] += sign
+    delta = deltas[courseid]
+    delta['completionsum'] += sign * completionrate
+    delta['completedcount'] += sign * int(completionrate == 100)
+    delta['activecount'] += sign * int(completionrate >= 80)
+
+def _collect_deltas(session):
+    """
+    Tính thay đổi của bảng tổng hợp do lần flush hiện tại
+
+    completionsum, completedcount, activecount cộng trừ trực tiếp theo từng dòng Progress.
+    totalstudents và gpasum tính trên sinh viên (khác nhau) của khóa học: chỉ các cặp
+    (sinh viên, khóa học) vừa thay đổi được kiểm tra, so sánh trước và sau lần flush.
+    """
+    deltas = defaultdict(lambda: dict.fromkeys(COUNTER_COLUMNS, 0))
+    rows = defaultdict(int)     # (studentid, courseid) -> số dòng Progress thêm ròng
+    previous_gpas = {}          # studentid -> GPA trước lần flush (None nếu sinh viên mới)
+
+    for obj in session.new:
+        if isinstance(obj, Progress):
+            _add_progress(deltas, rows, obj.studentid, obj.courseid, obj.completionrate, 1)
+        elif isinstance(obj, Student):
+            previous_gpas[obj.studentid] = None
+    for obj in session.deleted:
+        if isinstance(obj, Progress):
+            _add_progress(deltas, rows, obj.studentid, obj.courseid, obj.completionrate, -1)
+        elif isinstance(obj, Student):
+            previous_gpas[obj.studentid] = obj.totalgpa
+    for obj in session.dirty:
+        if isinstance(obj, Progress) and _changed(obj, *TRACKED_ATTRIBUTES):
+            previous = [_previous_value(obj, name) for name in TRACKED_ATTRIBUTES]
+            _add_progress(deltas, rows, *previous, -1)
+            _add_progress(deltas, rows, obj.studentid, obj.courseid, obj.completionrate, 1)
+        elif isinstance(obj, Student) and _changed(obj, 'totalgpa'):
+            previous_gpas[obj.studentid] = _previous_value(obj, 'totalgpa')
+
+    rows = {pair: count for pair, count in rows.items() if count}
+    studentids = {studentid for studentid, _ in rows} | set(previous_gpas)
+    studentids.discard(None)
+    if not studentids:
+        return deltas
+
+    # Trạng thái sau flush: số dòng Progress theo cặp và GPA của các sinh viên liên quan
+    connection = session.connection()
+    counts = {(studentid, courseid): count for studentid, courseid, count in connection.execute(
+        select(Progress.studentid, Progress.courseid, func.count())
+        .where(Progress.studentid.in_(studentids), Progress.courseid.is_not(None))
+        .group_by(Progress.studentid, Progress.courseid)
+    )}
+    gpas = dict(connection.execute(
+        select(Student.studentid, Student.totalgpa).where(Student.studentid.in_(studentids))
+    ).all())
+
+    pairs = set(rows) | {pair for pair in counts if pair[0] in previous_gpas}
+    for studentid, courseid in pairs:
+        after = counts.get((studentid, courseid), 0)
+        before = after - rows.get((studentid, courseid), 0)
+        gpa_after = gpas.get(studentid)
+        gpa_before = previous_gpas[studentid] if studentid in previous_gpas else gpa_after
+        was_member = before > 0 and gpa_before is not None
+        is_member = after > 0 and gpa_after is not None
+        delta = deltas[courseid]
+        delta['totalstudents'] += int(is_member) - int(was_member)
+        delta['gpasum'] += (gpa_after if is_member else 0.0) - (gpa_before if was_member else 0.0)
+    return deltas
+
+def _refresh_after_flush(session, flush_context):
+    """Cập nhật coursesummary theo các thay đổi vừa flush, trong cùng transaction"""
+    new_courseids = {obj.courseid for obj in session.new if isinstance(obj, Course)}
+    deltas = {courseid: delta for courseid, delta in _collect_deltas(session).items()
+              if courseid not in new_courseids}
+    if not deltas and not new_courseids:
+        return
+    connection = session.connection()
+    CourseSummaryService.apply_deltas(deltas, connection)
+    # Khóa học mới: tạo dòng tổng hợp ngay để request đọc không phải ghi
+    for courseid in sorted(new_courseids):
+        CourseSummaryService.refresh_course(courseid, connection)
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    """Không làm gì, chỉ để bật active_history cho các thuộc tính được theo dõi"""
+
+def register_course_summary_events():
+    """Đăng ký các event duy trì coursesummary (gọi một lần trong create_app)"""
+    if not event.contains(Session, 'after_flush', _refresh_after_flush):
+        # Cần giá trị cũ kể cả khi thuộc tính đã bị expire, để trừ phần đóng góp trước khi sửa
+        for attribute in (Progress.studentid, Progress.courseid, Progress.completionrate, Student.totalgpa):
+            event.listen(attribute, 'set', _keep_previous_value, active_history=True)
+        event.listen(Session, 'after_flush', _refresh_after_flush)
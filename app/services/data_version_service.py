@@ -0,0 +1,200 @@
+"""
+Data Version Service - Duy trì phiên bản dữ liệu cho ETag/Last-Modified của các endpoint polling
+"""
+import logging
+import zlib
+from datetime import datetime
+from flask import has_request_context, request
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from app import db
+from app.models import (DataVersion, Warning, Notification, Progress, Student, Course, BloomAssessment,
+                        CourseHistory, Intervention, Chapter, Assignment, CommonError)
+from app.utils.conditional import Validators
+from app.utils.upsert import upsert
+
+logger = logging.getLogger(__name__)
+
+version_table = DataVersion.__table__
+
+# Danh sách cảnh báo (/warnings) chia thành nhiều phạm vi theo sinh viên, để các transaction
+# ghi cảnh báo của những sinh viên khác nhau (kể cả các khối quét nguy cơ) không cùng chờ khóa một dòng
+WARNING_SCOPE_SHARDS = 16
+
+def warning_scope(studentid):
+    """Phạm vi chứa cảnh báo của một sinh viên (một trong WARNINGS_SCOPES)"""
+    return f'warning:{zlib.crc32(str(studentid).encode("utf-8")) % WARNING_SCOPE_SHARDS}'
+
+# Mọi phạm vi cảnh báo, danh sách /warnings phụ thuộc tất cả
+WARNINGS_SCOPES = tuple(f'warning:{shard}' for shard in range(WARNING_SCOPE_SHARDS))
+
+def notification_scope(studentid):
+    """Phạm vi thông báo của một sinh viên (/notifications/unread-count/<studentid>)"""
+    return f'notification:{studentid}'
+
+def course_scope(courseid):
+    """Phạm vi tiến độ lớp học của một khóa học (/class-progress/<courseid>)"""
+    return f'course:{courseid}'
+
+def student_scope(studentid):
+    """Phạm vi dữ liệu riêng của một sinh viên (báo cáo, lộ trình học tập)"""
+    return f'student:{studentid}'
+
+# Phạm vi danh mục khóa học, chương, bài tập và lỗi thường gặp (dùng chung cho mọi sinh viên)
+CATALOG_SCOPE = 'catalog'
+
+# Phiên bản CATALOG_SCOPE đã đọc trong request hiện tại (request.environ)
+CATALOG_VERSION_KEY = 'app.catalog_version'
+
+# Các model có cột studentid thuộc phạm vi student_scope()
+STUDENT_MODELS = (Student, Progress, BloomAssessment, Warning, CourseHistory, Intervention)
+
+# Các model thuộc CATALOG_SCOPE
+CATALOG_MODELS = (Course, Chapter, Assignment, CommonError)
+
+# Khóa trong session.info chứa các phạm vi đã thay đổi, chờ tăng phiên bản khi commit
+PENDING_SCOPES_KEY = 'data_version_scopes'
+
+class DataVersionService:
+    """
+    Service đọc và tăng phiên bản dữ liệu theo phạm vi
+
+    Phạm vi thay đổi qua ORM được gom khi flush và tăng phiên bản ngay trước khi commit,
+    trong cùng transaction: khóa dòng phiên bản chỉ giữ trong lúc commit thay vì suốt
+    transaction. Các thao tác đi vòng qua flush (bulk insert/update) phải gọi bump()
+    trực tiếp, ngay trước commit.
+    """
+
+    @staticmethod
+    def bump(scopes, connection=None):
+        """
+        Tăng phiên bản các phạm vi
+
+        Args:
+            scopes (iterable): Danh sách phạm vi
+            connection: Connection đang dùng (mặc định là connection của db.session)
+        """
+        scopes = sorted(set(scopes))
+        if not scopes:
+            return
+        connection = connection if connection is not None else db.session.connection()
+        now = datetime.utcnow()
+        # Thứ tự cố định để các transaction đồng thời không khóa chéo nhau; upsert vì các phạm vi
+        # theo sinh viên/khóa học được tạo lần đầu khi dữ liệu thay đổi
+        for scope in scopes:
+            upsert(connection, version_table, {'scope': scope, 'version': 1, 'updatedat': now}, ['scope'],
+                   update={'version': version_table.c.version + 1, 'updatedat': now})
+
+    @staticmethod
+    def get_versions(*scopes):
+        """
+        Lấy phiên bản các phạm vi bằng một truy vấn theo khóa chính
+
+        Returns:
+            dict: scope -> (version, updatedat); phạm vi chưa có dòng là (0, None)
+        """
+        rows = db.session.execute(
+            select(version_table.c.scope, version_table.c.version, version_table.c.updatedat)
+            .where(version_table.c.scope.in_(scopes))
+        )
+        versions = dict.fromkeys(scopes, (0, None))
+        versions.update((scope, (version, updatedat)) for scope, version, updatedat in rows)
+        if CATALOG_SCOPE in versions and has_request_context():
+            request.environ[CATALOG_VERSION_KEY] = versions[CATALOG_SCOPE][0]
+        return versions
+
+    @staticmethod
+    def catalog_version():
+        """
+        Phiên bản CATALOG_SCOPE, đọc từ database một lần mỗi request
+
+        Returns:
+            int: Phiên bản (0 nếu chưa có dòng)
+        """
+        if has_request_context() and CATALOG_VERSION_KEY in request.environ:
+            return request.environ[CATALOG_VERSION_KEY]
+        return DataVersionService.get_versions(CATALOG_SCOPE)[CATALOG_SCOPE][0]
+
+    @staticmethod
+    def validators(*scopes):
+        """
+        ETag/Last-Modified cho request hiện tại
+
+        Args:
+            scopes (str): Các phạm vi dữ liệu mà response phụ thuộc
+
+        Returns:
+            Validators: Dùng is_fresh()/not_modified() trước khi truy vấn, apply() cho response
+        """
+        return Validators(DataVersionService.get_versions(*scopes))
+
+def _previous_value(state, name):
+    """Giá trị của thuộc tính trước lần thay đổi hiện tại (None nếu không đổi)"""
+    history = state.attrs[name].history
+    return history.deleted[0] if history.deleted else None
+
+def _values(obj, name, dirty):
+    """Giá trị hiện tại và giá trị cũ (nếu vừa đổi) của một thuộc tính"""
+    values = {getattr(obj, name)}
+    if dirty:
+        values.add(_previous_value(inspect(obj), name))
+    values.discard(None)
+    return values
+
+def _collect_scopes(session):
+    """Gom các phạm vi bị ảnh hưởng bởi lần flush hiện tại"""
+    scopes = set()
+    changed_students = set()
+    changes = [(obj, False) for obj in (*session.new, *session.deleted)]
+    changes += [(obj, True) for obj in session.dirty if session.is_modified(obj)]
+    for obj, dirty in changes:
+        if isinstance(obj, STUDENT_MODELS):
+            scopes.update(student_scope(studentid) for studentid in _values(obj, 'studentid', dirty))
+        if isinstance(obj, CATALOG_MODELS):
+            scopes.add(CATALOG_SCOPE)
+
+        if isinstance(obj, Warning):
+            scopes.update(warning_scope(studentid) for studentid in _values(obj, 'studentid', dirty))
+        elif isinstance(obj, Notification):
+            scopes.update(notification_scope(studentid) for studentid in _values(obj, 'studentid', dirty))
+        elif isinstance(obj, Progress):
+            scopes.update(course_scope(courseid) for courseid in _values(obj, 'courseid', dirty))
+        elif isinstance(obj, Course):
+            scopes.add(course_scope(obj.courseid))
+        elif isinstance(obj, Student) and (dirty or obj in session.deleted):
+            changed_students.add(obj.studentid)
+    return scopes, changed_students
+
+def _collect_after_flush(session, flush_context):
+    """Gom các phạm vi vừa thay đổi vào session.info, chờ đến lúc commit"""
+    scopes, changed_students = _collect_scopes(session)
+    if changed_students:
+        # Tên/GPA/lớp của sinh viên xuất hiện trong tiến độ của mọi khóa học sinh viên đang học
+        courseids = session.connection().execute(
+            select(Progress.courseid).where(Progress.studentid.in_(changed_students)).distinct()
+        ).scalars()
+        scopes.update(course_scope(courseid) for courseid in courseids)
+    if scopes:
+        session.info.setdefault(PENDING_SCOPES_KEY, set()).update(scopes)
+
+def _bump_before_commit(session):
+    """Tăng phiên bản các phạm vi đã gom, là câu lệnh cuối cùng của transaction"""
+    # before_commit chạy trước lần flush cuối của commit, nên flush trước để gom đủ phạm vi
+    session.flush()
+    scopes = session.info.pop(PENDING_SCOPES_KEY, None)
+    if scopes:
+        DataVersionService.bump(scopes, session.connection())
+        if CATALOG_SCOPE in scopes and has_request_context():
+            request.environ.pop(CATALOG_VERSION_KEY, None)
+
+def _discard_pending(session, transaction):
+    """Bỏ các phạm vi đã gom khi transaction ngoài cùng kết thúc (rollback)"""
+    if transaction.parent is None:
+        session.info.pop(PENDING_SCOPES_KEY, None)
+
+def register_data_version_events():
+    """Đăng ký event tăng phiên bản dữ liệu (gọi một lần trong create_app)"""
+    if not event.contains(Session, 'after_flush', _collect_after_flush):
+        event.listen(Session, 'after_flush', _collect_after_flush)
+        event.listen(Session, 'before_commit', _bump_before_commit)
+        event.listen(Session, 'after_transaction_end', _discard_pending)
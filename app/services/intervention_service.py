@@ -12,8 +12,12 @@ logger = logging.getLogger(__name__)
 class InterventionService:
     """Service xử lý can thiệp và đề xuất"""
     
-    def __init__(self):
-        self.llm_service = LLMService()
+    def __init__(self, llm_service=None):
+        """
+        Args:
+            llm_service (LLMService): Service LLM dùng chung (mặc định tạo mới, xem ServiceContainer)
+        """
+        self.llm_service = llm_service or LLMService()
     
     def predict_intervention(self, studentid, student, progress, bloom, assignments, errors, warnings):
         """
@@ -25,19 +29,18 @@ class InterventionService:
             progress (Progress): Tiến độ học tập
             bloom (BloomAssessment): Đánh giá Bloom
             assignments (list): Danh sách bài tập
-            errors (list): Danh sách lỗi phổ biến
+            errors (list): Danh sách lỗi phổ biến (dict, xem ReferenceDataService)
             warnings (list): Danh sách cảnh báo
             
         Returns:
             dict: Kết quả dự đoán can thiệp
         """
-        start_time = datetime.now()
         logger.info(f"Bắt đầu xử lý dự đoán can thiệp cho studentid: {studentid}")
         
         try:
             # Chuẩn bị dữ liệu
             error_messages = [w.message for w in warnings]
-            common_error_types = [e.type for e in errors]
+            common_error_types = [e['type'] for e in errors]
             
             # Đếm số bài nộp
             num_submissions = sum(1 for a in assignments if a.studentssubmitted and student.name in a.studentssubmitted.split(', '))
@@ -77,7 +80,6 @@ class InterventionService:
                 'interventionid': new_intervention.interventionid
             }
             
-            logger.info(f"Hoàn thành xử lý dự đoán can thiệp trong {datetime.now() - start_time}")
             return response
             
         except Exception as e:
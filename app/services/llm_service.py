@@ -4,8 +4,8 @@ LLM Service - Tích hợp OpenAI với logic giống hệt file app.py gốc
 import logging
 import re
 import os
-from openai import OpenAI
 from dotenv import load_dotenv
+from app.utils.metrics import LLM_ERRORS, LLM_REQUEST_TIME, timed
 
 # Load biến môi trường
 load_dotenv()
@@ -15,8 +15,18 @@ logger = logging.getLogger(__name__)
 class LLMService:
     """Service tích hợp OpenAI LLM"""
     
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(self, api_key=None, client=None):
+        """
+        Args:
+            api_key (str): OpenAI API key (thường là OPENAI_API_KEY trong config, mặc định đọc biến môi trường)
+            client: Client có cùng giao diện chat.completions.create với OpenAI (test, benchmark);
+                    mặc định tạo client OpenAI
+        """
+        if client is None:
+            # openai import chậm, chỉ import khi thực sự tạo client
+            from openai import OpenAI
+            client = OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+        self.client = client
     
     def generate_intervention_recommendation(self, student_data, error_messages, common_error_types):
         """
@@ -98,15 +108,17 @@ class LLMService:
         """
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "Bạn là một trợ lý AI hỗ trợ giáo dục, chuyên cung cấp phân tích lỗi và đề xuất cải thiện chi tiết và dễ hiểu bằng tiếng Việt."},
-                    {"role": "user", "content": prompt}
-                ]
-            )
+            with timed(LLM_REQUEST_TIME, operation='intervention_recommendation'):
+                response = self.client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[
+                        {"role": "system", "content": "Bạn là một trợ lý AI hỗ trợ giáo dục, chuyên cung cấp phân tích lỗi và đề xuất cải thiện chi tiết và dễ hiểu bằng tiếng Việt."},
+                        {"role": "user", "content": prompt}
+                    ]
+                )
             return response.choices[0].message.content
         except Exception as e:
+            LLM_ERRORS.inc(operation='intervention_recommendation')
             logger.error(f"Lỗi khi gọi OpenAI API: {str(e)}")
             return "Không thể tạo đề xuất can thiệp do lỗi hệ thống."
     
@@ -2,35 +2,37 @@
 Machine Learning Service - Giống hệt logic trong file app.py gốc
 """
 import numpy as np
-import pandas as pd
 import pickle
 import os
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+from app.utils import encode_priority, encode_severity, encode_bloomlevel
+from app.utils.metrics import ML_INFERENCE_TIME, timed
+
+# Mô hình mặc định khi không truyền model_path (giống file gốc)
+DEFAULT_MODEL_PATH = 'rf_model.pkl'
 
 class MLService:
     """Service xử lý Machine Learning"""
     
-    def __init__(self):
+    def __init__(self, model_path=None):
+        """
+        Args:
+            model_path (str): File mô hình (thường là MODEL_PATH trong config)
+        """
         self.model = None
-        self.model_path = 'rf_model.pkl'  # Giống file gốc
+        self.model_path = model_path or DEFAULT_MODEL_PATH
         self.load_or_train_model()
     
     def encode_priority(self, priority):
         """Mã hóa priority"""
-        mapping = {'LOW': 0, 'MEDIUM': 1, 'HIGH': 2}
-        return mapping.get(priority, 1)
+        return encode_priority(priority)
 
     def encode_severity(self, severity):
         """Mã hóa severity"""
-        mapping = {'LOW': 0, 'MEDIUM': 1, 'HIGH': 2}
-        return mapping.get(severity, 1)
+        return encode_severity(severity)
 
     def encode_bloomlevel(self, bloomlevel):
         """Mã hóa bloom level"""
-        mapping = {'Nhớ': 0, 'Hiểu': 1, 'Áp dụng': 2, 'Phân tích': 3, 'Đánh giá': 4, 'Sáng tạo': 5}
-        return mapping.get(bloomlevel, 0)
+        return encode_bloomlevel(bloomlevel)
     
     def load_training_data(self):
         """
@@ -76,6 +78,8 @@ class MLService:
             'bloomlevel': bloomlevel_encoded,
             'risk': risk
         }
+        # pandas/sklearn chỉ cần khi huấn luyện, import tại chỗ để không làm chậm khởi động
+        import pandas as pd
         df = pd.DataFrame(data)
         X = df[['gpa', 'progressrate', 'bloomscore', 'count_errors', 'priority', 'severity', 'bloomlevel']]
         y = df['risk']
@@ -88,6 +92,10 @@ class MLService:
         Returns:
             tuple: (model, metrics) - Mô hình đã huấn luyện và metrics
         """
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.model_selection import train_test_split, cross_val_score
+        from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+
         X, y = self.load_training_data()
         model = RandomForestClassifier(n_estimators=100, random_state=42)
         scores = cross_val_score(model, X, y, cv=5, scoring='f1')
@@ -133,7 +141,26 @@ class MLService:
             self.load_or_train_model()
         
         input_data = np.array([[gpa, progressrate, bloomscore, count_errors, priority, severity, bloomlevel]])
-        return self.model.predict(input_data)[0]
+        with timed(ML_INFERENCE_TIME, operation='predict_risk'):
+            return self.model.predict(input_data)[0]
+    
+    def predict_risk_batch(self, features):
+        """
+        Dự đoán nguy cơ học vụ cho nhiều sinh viên trong một lần gọi mô hình
+        
+        Args:
+            features (list): Danh sách bộ 7 đặc trưng theo thứ tự của predict_risk
+            
+        Returns:
+            numpy.ndarray: Mảng 0/1 theo thứ tự đầu vào
+        """
+        if not self.model:
+            self.load_or_train_model()
+        
+        if len(features) == 0:
+            return np.array([], dtype=int)
+        with timed(ML_INFERENCE_TIME, operation='predict_risk_batch'):
+            return self.model.predict(np.asarray(features, dtype=float))
     
     def get_model_metrics(self):
         """
@@ -3,19 +3,21 @@ Notification Service - Xử lý logic nghiệp vụ cho thông báo
 """
 import logging
 import numpy as np
-import pickle
-import os
 from datetime import datetime
 from typing import List, Dict, Optional
+from sqlalchemy import or_
 from app import db
-from app.models import (Notification, Student, Warning, Progress, 
+from app.models import (Notification, NotificationArchive, Student, Warning, Progress, 
                        BloomAssessment, Assignment, CommonError)
+from app.services.reference_data_service import ReferenceDataService
+from app.services.student_service import StudentService, PROFILE_LOAD
+from app.services.container import get_services
+from app.services.data_version_service import DataVersionService, notification_scope
+from app.utils import month_start
+from app.utils.metrics import ML_INFERENCE_TIME, timed
 
 logger = logging.getLogger(__name__)
 
-# Đường dẫn lưu mô hình
-MODEL_PATH = 'rf_model.pkl'
-
 class NotificationService:
     """Service xử lý các thao tác liên quan đến thông báo"""
     
@@ -140,17 +142,25 @@ class NotificationService:
     
     @staticmethod
     def get_student_notifications(studentid: str, limit: Optional[int] = None, 
-                                only_unread: bool = False) -> List[Notification]:
+                                only_unread: bool = False, hot_months: Optional[int] = None,
+                                include_history: bool = False) -> List[Notification]:
         """
         Lấy danh sách thông báo của sinh viên
         
+        Với hot_months chỉ lấy các thông báo trong cửa sổ gần đây (partition nóng) cùng mọi
+        thông báo chưa đọc, để danh sách khớp với get_unread_count(); include_history lấy
+        toàn bộ, kể cả thông báo đã chuyển sang bảng archive.
+        
         Args:
             studentid: ID sinh viên
             limit: Giới hạn số lượng thông báo (tùy chọn)
             only_unread: Chỉ lấy thông báo chưa đọc
+            hot_months: Số tháng gần nhất được lấy, thông báo chưa đọc cũ hơn vẫn được lấy
+                        (None = không giới hạn)
+            include_history: Lấy toàn bộ lịch sử, bỏ qua hot_months
             
         Returns:
-            List[Notification]: Danh sách thông báo
+            List[Notification]: Danh sách thông báo (có thể gồm NotificationArchive khi include_history)
         """
         try:
             query = Notification.query.filter_by(studentid=studentid)
@@ -158,12 +168,30 @@ class NotificationService:
             if only_unread:
                 query = query.filter_by(isread=False)
             
+            if hot_months and not include_history:
+                query = query.filter(or_(Notification.createddate >= month_start(months_back=hot_months),
+                                         Notification.isread == False))
+            
             query = query.order_by(Notification.createddate.desc())
             
             if limit:
                 query = query.limit(limit)
             
-            return query.all()
+            notifications = query.all()
+            
+            # Thông báo lưu trữ luôn là thông báo đã đọc
+            if include_history and not only_unread:
+                archived = NotificationArchive.query.filter_by(studentid=studentid).order_by(
+                    NotificationArchive.createddate.desc()
+                )
+                if limit:
+                    archived = archived.limit(limit)
+                notifications = sorted(notifications + archived.all(),
+                                       key=lambda n: n.createddate, reverse=True)
+                if limit:
+                    notifications = notifications[:limit]
+            
+            return notifications
             
         except Exception as e:
             logger.error(f"Lỗi khi lấy thông báo: {str(e)}")
@@ -214,6 +242,9 @@ class NotificationService:
                 studentid=studentid, 
                 isread=False
             ).update({'isread': True})
+            # Bulk update không đi qua flush nên phải tăng phiên bản trực tiếp
+            if count:
+                DataVersionService.bump([notification_scope(studentid)])
             
             db.session.commit()
             
@@ -314,8 +345,8 @@ class NotificationService:
             Dict: Kết quả tạo thông báo
         """
         try:
-            # Kiểm tra sinh viên tồn tại
-            student = Student.query.get(studentid)
+            # Kiểm tra sinh viên tồn tại (tiến độ và Bloom được nạp cùng truy vấn)
+            student = StudentService.get_student(studentid, *PROFILE_LOAD)
             if not student:
                 logger.warning(f"Không tìm thấy sinh viên {studentid}")
                 return {
@@ -324,7 +355,7 @@ class NotificationService:
                 }
             
             # Kiểm tra tiến độ
-            progress = Progress.query.filter_by(studentid=studentid).first()
+            progress = student.progress[0] if student.progress else None
             if not progress:
                 logger.warning(f"Không tìm thấy dữ liệu tiến độ cho sinh viên {studentid}")
                 return {
@@ -333,7 +364,7 @@ class NotificationService:
                 }
             
             # Kiểm tra đánh giá Bloom
-            bloom = BloomAssessment.query.filter_by(studentid=studentid).first()
+            bloom = student.bloom_assessments[0] if student.bloom_assessments else None
             if not bloom:
                 logger.warning(f"Không tìm thấy đánh giá Bloom cho sinh viên {studentid}")
                 return {
@@ -350,23 +381,16 @@ class NotificationService:
             num_submissions = count_submissions()
             
             # Tính số lỗi
-            common_errors = CommonError.query.filter_by(courseid=progress.courseid).all()
-            num_errors = sum(ce.occurrences for ce in common_errors)
-            
-            # Tải mô hình Random Forest
-            if not os.path.exists(MODEL_PATH):
-                logger.error(f"Không tìm thấy file mô hình: {MODEL_PATH}")
-                return {
-                    'error': 'Không tìm thấy mô hình ML',
-                    'status_code': 500
-                }
+            common_errors = ReferenceDataService.get_common_errors(progress.courseid)
+            num_errors = sum(ce['occurrences'] for ce in common_errors)
             
-            with open(MODEL_PATH, 'rb') as f:
-                rf_model = pickle.load(f)
+            # Mô hình Random Forest dùng chung (nạp từ MODEL_PATH một lần cho mỗi process)
+            rf_model = get_services().ml_service.model
             
             # Dự đoán rủi ro
             input_data = np.array([[student.totalgpa, progress.progressrate, bloom.score, num_submissions, num_errors]])
-            risk_prediction = rf_model.predict(input_data)[0]
+            with timed(ML_INFERENCE_TIME, operation='notification'):
+                risk_prediction = rf_model.predict(input_data)[0]
             
             # Kiểm tra điều kiện tạo thông báo
             if risk_prediction == 1 or student.totalgpa < 2.0:
@@ -0,0 +1,96 @@
+"""
+Read Model Service - Truy vấn chỉ đọc bằng SQLAlchemy Core cho các endpoint dashboard
+"""
+from sqlalchemy import select
+from app import db
+from app.models import Student, Course
+from app.utils import classify_student
+
+student_table = Student.__table__
+course_table = Course.__table__
+
+class ReadModelService:
+    """
+    Service đọc dữ liệu cho dashboard không qua ORM
+
+    Chỉ select các cột cần thiết và chuyển trực tiếp từ tuple sang dict,
+    không tạo mapped instance, không đăng ký vào identity map của session.
+    """
+
+    @staticmethod
+    def student_summary_statement(min_gpa=None, below_gpa=None):
+        """
+        Câu lệnh select các cột tóm tắt sinh viên
+
+        Args:
+            min_gpa (float): Chỉ lấy sinh viên có GPA >= min_gpa (tùy chọn)
+            below_gpa (float): Chỉ lấy sinh viên có GPA < below_gpa (tùy chọn)
+
+        Returns:
+            Select: Câu lệnh Core (studentid, name, totalgpa, class)
+        """
+        statement = select(
+            student_table.c.studentid,
+            student_table.c.name,
+            student_table.c.totalgpa,
+            student_table.c['class']
+        )
+        if min_gpa is not None:
+            statement = statement.where(student_table.c.totalgpa >= min_gpa)
+        if below_gpa is not None:
+            statement = statement.where(student_table.c.totalgpa < below_gpa)
+        return statement
+
+    @staticmethod
+    def serialize_student_summary(row):
+        """Chuyển row (studentid, name, totalgpa, class) thành dict"""
+        studentid, name, totalgpa, class_ = row
+        return {
+            'studentid': studentid,
+            'name': name,
+            'totalgpa': totalgpa,
+            'class': class_,
+            'status': classify_student(totalgpa)
+        }
+
+    @staticmethod
+    def get_student_summaries(min_gpa=None, below_gpa=None):
+        """
+        Lấy danh sách tóm tắt sinh viên
+
+        Args:
+            min_gpa (float): Chỉ lấy sinh viên có GPA >= min_gpa (tùy chọn)
+            below_gpa (float): Chỉ lấy sinh viên có GPA < below_gpa (tùy chọn)
+
+        Returns:
+            list: Danh sách dict sinh viên
+        """
+        rows = db.session.execute(ReadModelService.student_summary_statement(min_gpa, below_gpa))
+        return [ReadModelService.serialize_student_summary(row) for row in rows]
+
+    @staticmethod
+    def get_courses():
+        """
+        Lấy danh sách khóa học (sắp theo courseid)
+
+        Returns:
+            list: Danh sách dict khóa học
+        """
+        rows = db.session.execute(select(
+            course_table.c.courseid,
+            course_table.c.coursename,
+            course_table.c.credits,
+            course_table.c.semester,
+            course_table.c.status,
+            course_table.c.difficulty,
+            course_table.c.category
+        ).order_by(course_table.c.courseid))
+        return [{
+            'courseid': courseid,
+            'coursename': coursename,
+            'credits': credits,
+            'semester': semester,
+            'status': status,
+            'difficulty': difficulty,
+            'category': category
+        } for courseid, coursename, credits, semester, status, difficulty, category in rows]
@@ -0,0 +1,143 @@
+"""
+Reference Data Service - Đọc khóa học, chương và lỗi thường gặp qua cache
+"""
+import logging
+from flask import has_app_context
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from app import db
+from app.models import Course, Chapter, CommonError
+from app.services.data_version_service import DataVersionService
+from app.services.read_model_service import ReadModelService
+from app.utils.cache import get_cache
+
+logger = logging.getLogger(__name__)
+
+chapter_table = Chapter.__table__
+commonerror_table = CommonError.__table__
+
+# Model -> namespace cache bị vô hiệu hóa khi model đó thay đổi
+REFERENCE_NAMESPACES = {
+    Course: 'course',
+    Chapter: 'chapter',
+    CommonError: 'commonerror'
+}
+
+# Khóa trong session.info chứa các namespace chờ vô hiệu hóa khi commit
+PENDING_KEY = 'reference_cache_pending'
+
+class ReferenceDataService:
+    """
+    Service đọc dữ liệu tham chiếu ít thay đổi
+
+    Kết quả là list dict (giống to_dict() của model) được dùng chung giữa các
+    request, không được sửa. Khóa cache chứa phiên bản CATALOG_SCOPE trong database
+    (một truy vấn theo khóa chính mỗi request), nên thay đổi qua ORM được mọi worker
+    thấy ngay sau commit kể cả với backend memory, và nội dung luôn khớp phiên bản mà
+    ETag/response cache dùng. Thay đổi đi vòng qua ORM (SQL trực tiếp) có hiệu lực sau
+    CACHE_DEFAULT_TTL, sau khi gọi invalidate() (worker hiện tại) hoặc DataVersionService.bump().
+    """
+
+    @staticmethod
+    def get_courses():
+        """
+        Lấy danh sách khóa học (sắp theo courseid)
+
+        Returns:
+            list: Danh sách dict khóa học
+        """
+        return _get_or_load('course', 'all', ReadModelService.get_courses)
+
+    @staticmethod
+    def get_course(courseid):
+        """
+        Lấy một khóa học
+
+        Args:
+            courseid (int): ID khóa học
+
+        Returns:
+            dict: Khóa học hoặc None nếu không tồn tại
+        """
+        return next((course for course in ReferenceDataService.get_courses()
+                     if course['courseid'] == courseid), None)
+
+    @staticmethod
+    def get_chapters(courseid=None):
+        """
+        Lấy danh sách chương (sắp theo chapterid)
+
+        Args:
+            courseid (int): Chỉ lấy chương của khóa học này (tùy chọn)
+
+        Returns:
+            list: Danh sách dict chương
+        """
+        def load():
+            statement = select(chapter_table).order_by(chapter_table.c.chapterid)
+            if courseid is not None:
+                statement = statement.where(chapter_table.c.courseid == courseid)
+            return [dict(row._mapping) for row in db.session.execute(statement)]
+
+        key = 'all' if courseid is None else f'course:{courseid}'
+        return _get_or_load('chapter', key, load)
+
+    @staticmethod
+    def get_common_errors(courseid=None):
+        """
+        Lấy danh sách lỗi thường gặp (sắp theo errorid)
+
+        Args:
+            courseid (int): Chỉ lấy lỗi của khóa học này (tùy chọn)
+
+        Returns:
+            list: Danh sách dict lỗi thường gặp
+        """
+        def load():
+            statement = select(commonerror_table).order_by(commonerror_table.c.errorid)
+            if courseid is not None:
+                statement = statement.where(commonerror_table.c.courseid == courseid)
+            return [dict(row._mapping) for row in db.session.execute(statement)]
+
+        key = 'all' if courseid is None else f'course:{courseid}'
+        return _get_or_load('commonerror', key, load)
+
+    @staticmethod
+    def invalidate(*namespaces):
+        """
+        Vô hiệu hóa cache dữ liệu tham chiếu (mặc định tất cả namespace)
+
+        Args:
+            namespaces (str): 'course', 'chapter', 'commonerror'
+        """
+        get_cache().invalidate(*(namespaces or REFERENCE_NAMESPACES.values()))
+
+def _get_or_load(namespace, key, loader):
+    """Đọc cache theo phiên bản danh mục hiện tại trong database"""
+    return get_cache().get_or_load(namespace, f'catalog{DataVersionService.catalog_version()}:{key}', loader)
+
+def _collect_after_flush(session, flush_context):
+    """Ghi nhận namespace của các dữ liệu tham chiếu vừa flush, chờ commit"""
+    namespaces = {REFERENCE_NAMESPACES[type(obj)]
+                  for obj in (*session.new, *session.dirty, *session.deleted)
+                  if type(obj) in REFERENCE_NAMESPACES}
+    if namespaces:
+        session.info.setdefault(PENDING_KEY, set()).update(namespaces)
+
+def _invalidate_after_commit(session):
+    """Vô hiệu hóa cache sau khi commit, để lần đọc kế tiếp thấy dữ liệu mới"""
+    namespaces = session.info.pop(PENDING_KEY, None)
+    if namespaces and has_app_context():
+        get_cache().invalidate(*namespaces)
+        logger.info(f"Đã vô hiệu hóa cache: {', '.join(sorted(namespaces))}")
+
+def _discard_after_rollback(session):
+    """Rollback thì dữ liệu không đổi, bỏ các namespace đang chờ"""
+    session.info.pop(PENDING_KEY, None)
+
+def register_reference_data_events():
+    """Đăng ký các event vô hiệu hóa cache dữ liệu tham chiếu (gọi một lần trong create_app)"""
+    if not event.contains(Session, 'after_flush', _collect_after_flush):
+        event.listen(Session, 'after_flush', _collect_after_flush)
+        event.listen(Session, 'after_commit', _invalidate_after_commit)
+        event.listen(Session, 'after_rollback', _discard_after_rollback)
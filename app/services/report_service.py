@@ -0,0 +1,212 @@
+"""
+Report Service - Dựng báo cáo sinh viên trong một round trip
+"""
+from sqlalchemy import select, union_all, literal, cast, null, Integer, Float, Date, Text
+from app import db
+from app.models import (Student, Progress, Warning, BloomAssessment, Assignment,
+                       Chapter, Intervention)
+from app.utils import classify_student
+
+# Các phần của báo cáo mà client có thể chọn qua ?sections=
+REPORT_SECTIONS = ('progress', 'bloom_assessments', 'warnings', 'assignments', 'chapters', 'suggestions')
+
+# Các cột chung của UNION ALL: mỗi phần ánh xạ trường của mình vào các slot cùng kiểu
+SLOT_TYPES = {
+    'key': Integer,
+    'i1': Integer,
+    'f1': Float,
+    'f2': Float,
+    'd1': Date,
+    't1': Text,
+    't2': Text,
+    't3': Text,
+    't4': Text,
+    't5': Text
+}
+
+# Thứ tự các nhánh trong UNION ALL
+PART_STUDENT, PART_PROGRESS, PART_BLOOM, PART_WARNING, PART_ASSIGNMENT, PART_CHAPTER, PART_INTERVENTION = range(7)
+
+class StudentReportService:
+    """Service dựng báo cáo chi tiết của sinh viên"""
+
+    @staticmethod
+    def parse_sections(raw_sections):
+        """
+        Phân tích tham số sections
+
+        Args:
+            raw_sections (str): Danh sách phần cách nhau bởi dấu phẩy, None = tất cả
+
+        Returns:
+            tuple: Các phần được chọn
+
+        Raises:
+            ValueError: Nếu có phần không hợp lệ
+        """
+        if not raw_sections:
+            return REPORT_SECTIONS
+        sections = tuple(s.strip() for s in raw_sections.split(',') if s.strip())
+        invalid = [s for s in sections if s not in REPORT_SECTIONS]
+        if invalid:
+            raise ValueError(f"Phần báo cáo không hợp lệ: {', '.join(invalid)}")
+        return sections
+
+    @staticmethod
+    def _part(ordinal, from_model, where, **slots):
+        """Tạo một nhánh của UNION ALL, slot không dùng được điền NULL có kiểu"""
+        columns = [literal(ordinal, Integer).label('part')]
+        for name, type_ in SLOT_TYPES.items():
+            expression = slots.get(name)
+            columns.append((cast(null(), type_) if expression is None else expression).label(name))
+        return select(*columns).select_from(from_model).where(*where)
+
+    @staticmethod
+    def _build_statement(studentid, sections):
+        """Dựng câu lệnh UNION ALL cho các phần cần lấy"""
+        part = StudentReportService._part
+        first_course = select(Progress.courseid).where(
+            Progress.studentid == studentid
+        ).order_by(Progress.progressid).limit(1).scalar_subquery()
+
+        parts = [part(
+            PART_STUDENT, Student, [Student.studentid == studentid],
+            t1=Student.studentid, t2=Student.name, t3=Student.class_, f1=Student.totalgpa
+        )]
+        if 'progress' in sections:
+            parts.append(part(
+                PART_PROGRESS, Progress, [Progress.studentid == studentid],
+                key=Progress.progressid, f1=Progress.progressrate, f2=Progress.completionrate,
+                d1=Progress.lastupdated, i1=Progress.courseid
+            ))
+        if 'bloom_assessments' in sections:
+            parts.append(part(
+                PART_BLOOM, BloomAssessment, [BloomAssessment.studentid == studentid],
+                key=BloomAssessment.assessmentid, t1=BloomAssessment.bloomlevel,
+                t2=BloomAssessment.status, f1=BloomAssessment.score, d1=BloomAssessment.lastupdated
+            ))
+        if 'warnings' in sections or 'suggestions' in sections:
+            parts.append(part(
+                PART_WARNING, Warning, [Warning.studentid == studentid, Warning.isresolved == False],
+                key=Warning.warningid, t1=Warning.class_, t2=Warning.warningtype, t3=Warning.message,
+                t4=Warning.severity, t5=Warning.priority
+            ))
+        if 'assignments' in sections:
+            parts.append(part(
+                PART_ASSIGNMENT, Assignment, [Assignment.courseid == first_course],
+                key=Assignment.assignmentid, t1=Assignment.name, d1=Assignment.deadline,
+                t2=Assignment.submitted, f1=Assignment.completionrate, t3=Assignment.status
+            ))
+        if 'chapters' in sections:
+            parts.append(part(
+                PART_CHAPTER, Chapter, [Chapter.courseid == first_course],
+                key=Chapter.chapterid, t1=Chapter.name, f1=Chapter.completionrate,
+                f2=Chapter.averagescore, i1=Chapter.estimatedtime
+            ))
+        if 'suggestions' in sections:
+            parts.append(part(
+                PART_INTERVENTION, Intervention, [Intervention.studentid == studentid],
+                key=Intervention.interventionid, t1=Intervention.recommendation
+            ))
+
+        report = union_all(*parts).subquery('report')
+        return select(report).order_by(report.c.part, report.c.key)
+
+    @staticmethod
+    def build_report(studentid, sections=REPORT_SECTIONS):
+        """
+        Dựng báo cáo sinh viên bằng một truy vấn UNION ALL
+
+        Args:
+            studentid (str): ID sinh viên
+            sections (tuple): Các phần cần lấy (xem REPORT_SECTIONS)
+
+        Returns:
+            dict: Báo cáo, hoặc None nếu không tìm thấy sinh viên
+        """
+        rows = db.session.execute(StudentReportService._build_statement(studentid, sections))
+
+        student = None
+        progress, bloom_assessments, warnings = [], [], []
+        assignments, chapters, interventions = [], [], []
+        for row in rows:
+            if row.part == PART_STUDENT:
+                student = {
+                    'studentid': row.t1,
+                    'name': row.t2,
+                    'totalgpa': row.f1,
+                    'class': row.t3,
+                    'status': classify_student(row.f1)
+                }
+            elif row.part == PART_PROGRESS:
+                progress.append({
+                    'progressid': row.key,
+                    'progressrate': row.f1,
+                    'completionrate': row.f2,
+                    'lastupdated': row.d1,
+                    'courseid': row.i1
+                })
+            elif row.part == PART_BLOOM:
+                bloom_assessments.append({
+                    'assessmentid': row.key,
+                    'bloomlevel': row.t1,
+                    'status': row.t2,
+                    'score': row.f1,
+                    'lastupdated': row.d1
+                })
+            elif row.part == PART_WARNING:
+                warnings.append({
+                    'warningid': row.key,
+                    'class': row.t1,
+                    'warningtype': row.t2,
+                    'message': row.t3,
+                    'severity': row.t4,
+                    'priority': row.t5
+                })
+            elif row.part == PART_ASSIGNMENT:
+                assignments.append({
+                    'assignmentid': row.key,
+                    'name': row.t1,
+                    'deadline': row.d1,
+                    'submitted': row.t2,
+                    'completionrate': row.f1,
+                    'status': row.t3
+                })
+            elif row.part == PART_CHAPTER:
+                chapters.append({
+                    'chapterid': row.key,
+                    'name': row.t1,
+                    'completionrate': row.f1,
+                    'averagescore': row.f2,
+                    'estimatedtime': row.i1
+                })
+            elif row.part == PART_INTERVENTION:
+                interventions.append({
+                    'id': row.key,
+                    'title': 'Đề xuất can thiệp',
+                    'content': row.t1,
+                    'type': 'info'
+                })
+
+        if student is None:
+            return None
+
+        report = {'student': student}
+        if 'progress' in sections:
+            report['progress'] = progress
+        if 'bloom_assessments' in sections:
+            report['bloom_assessments'] = bloom_assessments
+        if 'warnings' in sections:
+            report['warnings'] = warnings
+        if 'assignments' in sections:
+            report['assignments'] = assignments
+        if 'chapters' in sections:
+            report['chapters'] = chapters
+        if 'suggestions' in sections:
+            report['suggestions'] = [{
+                'id': w['warningid'],
+                'title': 'Đề xuất cải thiện',
+                'content': w['message'],
+                'type': 'info'
+            } for w in warnings if w['warningtype'] == 'THÔNG TIN'] + interventions
+        return report
@@ -0,0 +1,263 @@
+"""
+Retention Service - Partition theo tháng và lưu trữ Notification/Warning cũ
+"""
+import logging
+from datetime import date
+from flask import current_app
+from sqlalchemy import select, insert, delete, literal, text, Date
+from app import db
+from app.models import Notification, Warning, NotificationArchive, WarningArchive
+from app.utils import month_start
+
+logger = logging.getLogger(__name__)
+
+# Bảng được partition theo createddate: tên bảng -> (khóa chính, cột được index)
+PARTITIONED_TABLES = {
+    'notification': ('notificationid', 'studentid'),
+    'warning': ('warningid', 'studentid')
+}
+
+class RetentionService:
+    """
+    Service quản lý vòng đời dữ liệu của Notification và Warning
+
+    Trên PostgreSQL hai bảng được partition theo tháng (createddate) nên truy vấn
+    theo cửa sổ thời gian chỉ quét các partition gần đây. Trên các database khác
+    (SQLite cho test) bảng giữ nguyên dạng thường, phần lưu trữ vẫn hoạt động.
+    """
+
+    @staticmethod
+    def supports_partitioning():
+        """Database hiện tại có hỗ trợ partition khai báo (PostgreSQL) hay không"""
+        return db.engine.dialect.name == 'postgresql'
+
+    @staticmethod
+    def is_partitioned(table_name):
+        """
+        Kiểm tra bảng đã được partition hay chưa
+
+        Args:
+            table_name (str): Tên bảng
+
+        Returns:
+            bool: True nếu bảng là partitioned table
+        """
+        if not RetentionService.supports_partitioning():
+            return False
+        return db.session.execute(text(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = :name AND pg_table_is_visible(c.oid)"
+        ), {'name': table_name}).first() is not None
+
+    @staticmethod
+    def _partition_name(table_name, month):
+        """Tên partition của một tháng, ví dụ notification_p202401"""
+        return f"{table_name}_p{month.year}{month.month:02d}"
+
+    @staticmethod
+    def _create_partition(table_name, month):
+        """Tạo partition cho một tháng nếu chưa có"""
+        upper = month_start(month, -1)
+        db.session.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {RetentionService._partition_name(table_name, month)} "
+            f"PARTITION OF {table_name} FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        ))
+
+    @staticmethod
+    def partition_table(table_name, months_ahead=None):
+        """
+        Chuyển một bảng thường thành bảng partition theo tháng (chạy một lần, trong một transaction)
+
+        Dữ liệu được chép sang bảng mới; sequence của khóa chính được giữ nguyên.
+        Khóa chính trở thành (id, createddate) vì PostgreSQL yêu cầu khóa chính
+        chứa cột partition. Thứ tự: chép dữ liệu, xóa bảng cũ, tạo khóa chính, tạo lại
+        các index không unique của bảng cũ (ví dụ index tìm kiếm của SearchService, mà
+        LIKE ... INCLUDING INDEXES không chép được vì kéo theo khóa chính cũ), rồi khóa ngoại.
+
+        Args:
+            table_name (str): 'notification' hoặc 'warning'
+            months_ahead (int): Số tháng tạo trước (mặc định PARTITION_MONTHS_AHEAD)
+
+        Returns:
+            bool: True nếu đã chuyển, False nếu không cần (đã partition hoặc không phải PostgreSQL)
+        """
+        if table_name not in PARTITIONED_TABLES:
+            raise ValueError(f"Bảng không hỗ trợ partition: {table_name}")
+        if not RetentionService.supports_partitioning() or RetentionService.is_partitioned(table_name):
+            return False
+
+        months_ahead = current_app.config.get('PARTITION_MONTHS_AHEAD', 3) if months_ahead is None else months_ahead
+        primary_key, indexed_column = PARTITIONED_TABLES[table_name]
+        legacy = f"{table_name}_legacy"
+        try:
+            sequence = db.session.execute(text(
+                "SELECT pg_get_serial_sequence(:table, :column)"
+            ), {'table': table_name, 'column': primary_key}).scalar()
+            oldest = db.session.execute(text(f"SELECT min(createddate) FROM {table_name}")).scalar()
+            # Định nghĩa index của bảng cũ (ON public.<table_name>, áp dụng được cho bảng mới)
+            indexes = db.session.execute(text(
+                "SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i JOIN pg_class c ON c.oid = i.indrelid "
+                "WHERE c.relname = :name AND pg_table_is_visible(c.oid) AND NOT i.indisunique"
+            ), {'name': table_name}).scalars().all()
+
+            db.session.execute(text(f"ALTER TABLE {table_name} RENAME TO {legacy}"))
+            db.session.execute(text(
+                f"CREATE TABLE {table_name} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING IDENTITY) "
+                f"PARTITION BY RANGE (createddate)"
+            ))
+            db.session.execute(text(f"CREATE TABLE {table_name}_default PARTITION OF {table_name} DEFAULT"))
+            month = month_start(oldest) if oldest else month_start()
+            last = month_start(months_back=-months_ahead)
+            while month <= last:
+                RetentionService._create_partition(table_name, month)
+                month = month_start(month, -1)
+
+            db.session.execute(text(f"INSERT INTO {table_name} SELECT * FROM {legacy}"))
+            if sequence:
+                db.session.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {table_name}.{primary_key}"))
+            db.session.execute(text(f"DROP TABLE {legacy}"))
+
+            db.session.execute(text(f"ALTER TABLE {table_name} ADD PRIMARY KEY ({primary_key}, createddate)"))
+            db.session.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{table_name}_{indexed_column} ON {table_name} ({indexed_column})"
+            ))
+            db.session.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{table_name}_{indexed_column}_createddate "
+                f"ON {table_name} ({indexed_column}, createddate)"
+            ))
+            for definition in indexes:
+                db.session.execute(text(definition.replace('CREATE INDEX ', 'CREATE INDEX IF NOT EXISTS ', 1)))
+            db.session.execute(text(
+                f"ALTER TABLE {table_name} ADD FOREIGN KEY ({indexed_column}) REFERENCES student (studentid)"
+            ))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        logger.info(f"Đã chuyển bảng {table_name} sang partition theo tháng")
+        return True
+
+    @staticmethod
+    def ensure_partitions(months_ahead=None):
+        """
+        Tạo trước partition cho các tháng sắp tới (chạy định kỳ)
+
+        Args:
+            months_ahead (int): Số tháng tạo trước (mặc định PARTITION_MONTHS_AHEAD)
+
+        Returns:
+            int: Số bảng đã được kiểm tra partition
+        """
+        months_ahead = current_app.config.get('PARTITION_MONTHS_AHEAD', 3) if months_ahead is None else months_ahead
+        checked = 0
+        for table_name in PARTITIONED_TABLES:
+            if not RetentionService.is_partitioned(table_name):
+                continue
+            for offset in range(0, months_ahead + 1):
+                RetentionService._create_partition(table_name, month_start(months_back=-offset))
+            checked += 1
+        db.session.commit()
+        return checked
+
+    @staticmethod
+    def drop_empty_partitions(cutoff):
+        """
+        Xóa các partition đã trống nằm hoàn toàn trước mốc lưu trữ
+
+        Args:
+            cutoff (date): Mốc lưu trữ (ngày đầu tháng)
+
+        Returns:
+            list: Tên các partition đã xóa
+        """
+        dropped = []
+        for table_name in PARTITIONED_TABLES:
+            if not RetentionService.is_partitioned(table_name):
+                continue
+            partitions = db.session.execute(text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = :name"
+            ), {'name': table_name}).scalars().all()
+            for partition in partitions:
+                suffix = partition[len(table_name) + 2:]
+                if not partition.startswith(f"{table_name}_p") or len(suffix) != 6 or not suffix.isdigit():
+                    continue
+                upper = month_start(date(int(suffix[:4]), int(suffix[4:]), 1), -1)
+                if upper > cutoff:
+                    continue
+                if db.session.execute(text(f"SELECT 1 FROM {partition} LIMIT 1")).first() is None:
+                    db.session.execute(text(f"DROP TABLE {partition}"))
+                    dropped.append(partition)
+        db.session.commit()
+        return dropped
+
+    @staticmethod
+    def _archive(source, archive, primary_key, condition, batch_size):
+        """Chuyển các dòng thỏa điều kiện từ source sang archive theo từng lô, mỗi lô một transaction"""
+        columns = [column.name for column in source.columns]
+        moved = 0
+        while True:
+            ids = db.session.execute(
+                select(primary_key).where(condition).order_by(primary_key).limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                return moved
+            try:
+                db.session.execute(insert(archive).from_select(
+                    columns + ['archiveddate'],
+                    select(*source.columns, literal(date.today(), Date)).where(primary_key.in_(ids))
+                ))
+                db.session.execute(delete(source).where(primary_key.in_(ids)))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            moved += len(ids)
+
+    @staticmethod
+    def archive_old_rows(months=None, batch_size=None):
+        """
+        Chuyển thông báo đã đọc và cảnh báo đã giải quyết cũ sang bảng archive
+
+        Cảnh báo được lưu trữ vẫn được tính trong studentwarningstats.
+
+        Args:
+            months (int): Giữ lại bao nhiêu tháng (mặc định RETENTION_MONTHS)
+            batch_size (int): Số dòng mỗi lô (mặc định RETENTION_BATCH_SIZE)
+
+        Returns:
+            dict: cutoff, notifications, warnings (số dòng đã chuyển)
+        """
+        months = months or current_app.config.get('RETENTION_MONTHS', 12)
+        batch_size = batch_size or current_app.config.get('RETENTION_BATCH_SIZE', 5000)
+        cutoff = month_start(months_back=months)
+
+        notifications = RetentionService._archive(
+            Notification.__table__, NotificationArchive.__table__, Notification.notificationid,
+            (Notification.isread == True) & (Notification.createddate < cutoff), batch_size
+        )
+        warnings = RetentionService._archive(
+            Warning.__table__, WarningArchive.__table__, Warning.warningid,
+            (Warning.isresolved == True) & (Warning.createddate < cutoff), batch_size
+        )
+        logger.info(f"Đã lưu trữ {notifications} thông báo và {warnings} cảnh báo trước {cutoff}")
+        return {'cutoff': cutoff, 'notifications': notifications, 'warnings': warnings}
+
+    @staticmethod
+    def run(months=None):
+        """
+        Job lưu trữ định kỳ: tạo partition tháng tới, lưu trữ dữ liệu cũ, xóa partition trống
+
+        Args:
+            months (int): Giữ lại bao nhiêu tháng (mặc định RETENTION_MONTHS)
+
+        Returns:
+            dict: Kết quả của archive_old_rows() kèm danh sách partition đã xóa
+        """
+        RetentionService.ensure_partitions()
+        result = RetentionService.archive_old_rows(months)
+        result['dropped_partitions'] = (RetentionService.drop_empty_partitions(result['cutoff'])
+                                        if RetentionService.supports_partitioning() else [])
+        return result
@@ -0,0 +1,281 @@
+"""
+Risk Sweep Service - Quét nguy cơ học vụ cho toàn bộ sinh viên theo từng khối
+"""
+import logging
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import select, insert, func, exists
+from app import db
+from app.models import Student, Progress, BloomAssessment, Warning, Notification, StudentWarningStats
+from app.services.container import get_services
+from app.services.warning_stats_service import WarningStatsService
+from app.services.data_version_service import DataVersionService, notification_scope, student_scope, warning_scope
+from app.utils import encode_priority, encode_severity, encode_bloomlevel
+
+logger = logging.getLogger(__name__)
+
+stats_table = StudentWarningStats.__table__
+
+# Loại cảnh báo do job quét tạo ra; sinh viên còn cảnh báo cùng loại chưa giải quyết sẽ được bỏ qua
+RISK_WARNING_TYPE = 'ACADEMIC'
+
+class RiskSweepService:
+    """
+    Service chấm điểm nguy cơ học vụ hàng loạt
+
+    Mỗi khối sinh viên được xử lý bằng: một truy vấn dựng đặc trưng, một lần gọi
+    mô hình, và bulk insert Warning/Notification trong cùng một transaction.
+    """
+
+    def __init__(self, warning_service=None):
+        """
+        Args:
+            warning_service (WarningService): Mặc định lấy từ ServiceContainer của app ở lần dùng đầu
+        """
+        self._warning_service = warning_service
+
+    @property
+    def warning_service(self):
+        if self._warning_service is None:
+            self._warning_service = get_services().warning_service
+        return self._warning_service
+
+    @property
+    def ml_service(self):
+        return self.warning_service.ml_service
+
+    @staticmethod
+    def chunk_bounds(chunk_size):
+        """
+        Chia danh sách sinh viên thành các khoảng studentid liên tiếp
+
+        Args:
+            chunk_size (int): Số sinh viên mỗi khoảng
+
+        Returns:
+            list: Các tuple (lower, upper) với lower <= studentid < upper (upper None = không giới hạn)
+        """
+        numbered = select(
+            Student.studentid,
+            func.row_number().over(order_by=Student.studentid).label('rownum')
+        ).subquery()
+        lowers = db.session.execute(
+            select(numbered.c.studentid)
+            .where((numbered.c.rownum - 1) % chunk_size == 0)
+            .order_by(numbered.c.studentid)
+        ).scalars().all()
+        return list(zip(lowers, lowers[1:] + [None]))
+
+    @staticmethod
+    def iter_student_chunks(chunk_size, lower=None, upper=None):
+        """
+        Duyệt studentid theo từng khối bằng keyset pagination
+
+        Args:
+            chunk_size (int): Số sinh viên mỗi khối
+            lower (str): studentid bắt đầu (bao gồm, tùy chọn)
+            upper (str): studentid kết thúc (không bao gồm, tùy chọn)
+
+        Yields:
+            list: Danh sách studentid của khối
+        """
+        last = None
+        while True:
+            statement = select(Student.studentid).order_by(Student.studentid).limit(chunk_size)
+            if last is not None:
+                statement = statement.where(Student.studentid > last)
+            elif lower is not None:
+                statement = statement.where(Student.studentid >= lower)
+            if upper is not None:
+                statement = statement.where(Student.studentid < upper)
+
+            studentids = db.session.execute(statement).scalars().all()
+            if not studentids:
+                return
+            yield studentids
+            if len(studentids) < chunk_size:
+                return
+            last = studentids[-1]
+
+    @staticmethod
+    def load_features(studentids):
+        """
+        Dựng đặc trưng rủi ro cho một khối sinh viên bằng một truy vấn
+
+        Dùng bản ghi tiến độ và đánh giá Bloom đầu tiên của mỗi sinh viên (giống
+        create_warning_for_student). Sinh viên thiếu tiến độ hoặc Bloom bị bỏ qua.
+
+        Args:
+            studentids (list): Danh sách studentid
+
+        Returns:
+            list: Các row (studentid, name, totalgpa, class_, progressrate, bloomscore,
+                  bloomlevel, warningcount, prioritysum, severitysum, hasopenwarning)
+        """
+        first_progress = select(
+            Progress.studentid, func.min(Progress.progressid).label('progressid')
+        ).where(Progress.studentid.in_(studentids)).group_by(Progress.studentid).subquery()
+        first_bloom = select(
+            BloomAssessment.studentid, func.min(BloomAssessment.assessmentid).label('assessmentid')
+        ).where(BloomAssessment.studentid.in_(studentids)).group_by(BloomAssessment.studentid).subquery()
+        open_warning = exists().where(
+            Warning.studentid == Student.studentid,
+            Warning.warningtype == RISK_WARNING_TYPE,
+            Warning.isresolved == False
+        )
+
+        return db.session.execute(
+            select(
+                Student.studentid, Student.name, Student.totalgpa, Student.class_,
+                Progress.progressrate,
+                BloomAssessment.score.label('bloomscore'), BloomAssessment.bloomlevel,
+                stats_table.c.warningcount, stats_table.c.prioritysum, stats_table.c.severitysum,
+                open_warning.label('hasopenwarning')
+            )
+            .join(first_progress, first_progress.c.studentid == Student.studentid)
+            .join(Progress, Progress.progressid == first_progress.c.progressid)
+            .join(first_bloom, first_bloom.c.studentid == Student.studentid)
+            .join(BloomAssessment, BloomAssessment.assessmentid == first_bloom.c.assessmentid)
+            .outerjoin(stats_table, stats_table.c.studentid == Student.studentid)
+            .where(Student.studentid.in_(studentids))
+            .order_by(Student.studentid)
+        ).all()
+
+    @staticmethod
+    def _warning_counters(rows):
+        """Lấy (count, prioritysum, severitysum) cho từng sinh viên, tính bù nếu chưa có dòng thống kê"""
+        counters = {row.studentid: (row.warningcount, row.prioritysum, row.severitysum)
+                    for row in rows if row.warningcount is not None}
+        missing = [row.studentid for row in rows if row.warningcount is None]
+        if missing:
+            for stats in db.session.execute(WarningStatsService.stats_statement(missing)):
+                counters[stats.studentid] = (stats.warningcount, stats.prioritysum, stats.severitysum)
+        return counters
+
+    def sweep_chunk(self, studentids):
+        """
+        Chấm điểm một khối sinh viên và ghi cảnh báo/thông báo trong một transaction
+
+        Args:
+            studentids (list): Danh sách studentid
+
+        Returns:
+            dict: Số sinh viên đã chấm (scored), bỏ qua (skipped) và bị cảnh báo (flagged)
+        """
+        rows = self.load_features(studentids)
+        candidates = [row for row in rows if not row.hasopenwarning]
+        skipped = len(studentids) - len(candidates)
+        if not candidates:
+            return {'scored': 0, 'skipped': skipped, 'flagged': 0}
+
+        counters = self._warning_counters(candidates)
+        features = []
+        for row in candidates:
+            count_errors, prioritysum, severitysum = counters.get(row.studentid, (0, 0, 0))
+            features.append((
+                row.totalgpa, row.progressrate, row.bloomscore, count_errors,
+                prioritysum / count_errors if count_errors else encode_priority('LOW'),
+                severitysum / count_errors if count_errors else encode_severity('LOW'),
+                encode_bloomlevel(row.bloomlevel)
+            ))
+        risks = self.ml_service.predict_risk_batch(features)
+
+        today = datetime.utcnow().date()
+        warnings, notifications = [], []
+        for row, feature, risk in zip(candidates, features, risks):
+            if int(risk) != 1:
+                continue
+            message = self.warning_service.generate_warning_message(
+                row, row.progressrate, row.bloomscore, feature[3], feature[4], feature[5], feature[6], risk
+            )
+            warnings.append({
+                'studentid': row.studentid,
+                'class_': row.class_,
+                'warningtype': RISK_WARNING_TYPE,
+                'message': message,
+                'severity': 'HIGH',
+                'priority': 'HIGH',
+                'createddate': today,
+                'isresolved': False,
+                'isnotified': True,
+                'notificationsentdate': today
+            })
+            notifications.append({
+                'studentid': row.studentid,
+                'message': message,
+                'createddate': today,
+                'isread': False
+            })
+
+        try:
+            if warnings:
+                db.session.execute(insert(Warning), warnings)
+                db.session.execute(insert(Notification), notifications)
+                # Bulk insert không đi qua flush nên phải cập nhật thống kê và phiên bản trực tiếp
+                WarningStatsService.record_inserted(warnings)
+                DataVersionService.bump([warning_scope(w['studentid']) for w in warnings]
+                                        + [notification_scope(w['studentid']) for w in warnings]
+                                        + [student_scope(w['studentid']) for w in warnings])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        return {'scored': len(candidates), 'skipped': skipped, 'flagged': len(warnings)}
+
+    def run(self, chunk_size=None, lower=None, upper=None):
+        """
+        Quét toàn bộ sinh viên (hoặc một khoảng studentid)
+
+        Args:
+            chunk_size (int): Số sinh viên mỗi khối (mặc định RISK_SWEEP_CHUNK_SIZE)
+            lower (str): studentid bắt đầu (bao gồm, tùy chọn)
+            upper (str): studentid kết thúc (không bao gồm, tùy chọn)
+
+        Returns:
+            dict: students, scored, skipped, flagged, failed_chunks, elapsed (giây)
+        """
+        chunk_size = chunk_size or current_app.config.get('RISK_SWEEP_CHUNK_SIZE', 1000)
+        started = time.perf_counter()
+        totals = {'students': 0, 'scored': 0, 'skipped': 0, 'flagged': 0, 'failed_chunks': 0}
+
+        for studentids in self.iter_student_chunks(chunk_size, lower, upper):
+            totals['students'] += len(studentids)
+            try:
+                result = self.sweep_chunk(studentids)
+            except Exception as e:
+                totals['failed_chunks'] += 1
+                logger.error(f"Lỗi khi quét khối {studentids[0]}..{studentids[-1]}: {str(e)}")
+                continue
+            for key, value in result.items():
+                totals[key] += value
+
+        totals['elapsed'] = time.perf_counter() - started
+        logger.info(f"Hoàn thành quét nguy cơ {totals['students']} sinh viên "
+                    f"({totals['flagged']} cảnh báo mới) trong {totals['elapsed']:.2f}s")
+        return totals
+
+def start_risk_sweep_scheduler(app):
+    """
+    Chạy job quét nguy cơ định kỳ trong process hiện tại nếu được bật trong cấu hình
+
+    Nhiều worker cùng bật scheduler vẫn an toàn: mỗi lượt chỉ process giữ được
+    lock file mới chạy.
+
+    Args:
+        app: Flask application
+
+    Returns:
+        threading.Thread: Thread của scheduler, hoặc None nếu không bật
+    """
+    interval_minutes = app.config.get('RISK_SWEEP_INTERVAL_MINUTES', 0)
+    if not interval_minutes:
+        return None
+
+    from app.utils.scheduler import start_periodic_job
+    sweep_service = RiskSweepService()
+    return start_periodic_job(
+        app, 'risk-sweep', interval_minutes * 60, sweep_service.run,
+        lock_path=app.config.get('RISK_SWEEP_LOCK_FILE')
+    )
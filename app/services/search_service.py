@@ -0,0 +1,235 @@
+"""
+Search Service - Tìm kiếm cảnh báo và lỗi thường gặp bằng full-text index
+"""
+import logging
+from sqlalchemy import select, func, literal, literal_column, text, union_all, table, column, and_, or_, Float
+from app import db
+from app.models import Warning, CommonError
+
+logger = logging.getLogger(__name__)
+
+# Các loại đối tượng tìm kiếm được
+SEARCH_KINDS = ('warning', 'commonerror')
+
+MAX_PER_PAGE = 100
+
+# PostgreSQL: 'simple' + unaccent để không phân biệt dấu tiếng Việt.
+# unaccent() không IMMUTABLE nên cần hàm bọc để dùng trong index biểu thức.
+POSTGRES_SETUP = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text "
+    "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT AS $$ SELECT public.unaccent('public.unaccent', $1) $$",
+    "CREATE INDEX IF NOT EXISTS ix_warning_message_fts ON warning "
+    "USING gin (to_tsvector('simple'::regconfig, f_unaccent(lower(message))))",
+    # Index trigram phục vụ trực tiếp ILIKE '%...%'
+    "CREATE INDEX IF NOT EXISTS ix_warning_message_trgm ON warning USING gin (message gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_commonerror_fts ON commonerror "
+    "USING gin (to_tsvector('simple'::regconfig, f_unaccent(lower(type || ' ' || description))))"
+]
+
+# SQLite: bảng FTS5 external content, đồng bộ bằng trigger
+SQLITE_SETUP = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS warningsearch USING fts5("
+    "message, content='warning', content_rowid='warningid', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS warningsearch_ai AFTER INSERT ON warning BEGIN "
+    "INSERT INTO warningsearch(rowid, message) VALUES (new.warningid, new.message); END",
+    "CREATE TRIGGER IF NOT EXISTS warningsearch_ad AFTER DELETE ON warning BEGIN "
+    "INSERT INTO warningsearch(warningsearch, rowid, message) VALUES ('delete', old.warningid, old.message); END",
+    "CREATE TRIGGER IF NOT EXISTS warningsearch_au AFTER UPDATE OF message ON warning BEGIN "
+    "INSERT INTO warningsearch(warningsearch, rowid, message) VALUES ('delete', old.warningid, old.message); "
+    "INSERT INTO warningsearch(rowid, message) VALUES (new.warningid, new.message); END",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS commonerrorsearch USING fts5("
+    "type, description, content='commonerror', content_rowid='errorid', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS commonerrorsearch_ai AFTER INSERT ON commonerror BEGIN "
+    "INSERT INTO commonerrorsearch(rowid, type, description) VALUES (new.errorid, new.type, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS commonerrorsearch_ad AFTER DELETE ON commonerror BEGIN "
+    "INSERT INTO commonerrorsearch(commonerrorsearch, rowid, type, description) "
+    "VALUES ('delete', old.errorid, old.type, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS commonerrorsearch_au AFTER UPDATE OF type, description ON commonerror BEGIN "
+    "INSERT INTO commonerrorsearch(commonerrorsearch, rowid, type, description) "
+    "VALUES ('delete', old.errorid, old.type, old.description); "
+    "INSERT INTO commonerrorsearch(rowid, type, description) VALUES (new.errorid, new.type, new.description); END",
+    "INSERT INTO warningsearch(warningsearch) VALUES ('rebuild')",
+    "INSERT INTO commonerrorsearch(commonerrorsearch) VALUES ('rebuild')"
+]
+
+warning_fts = table('warningsearch', column('rowid'))
+commonerror_fts = table('commonerrorsearch', column('rowid'))
+
+# Backend đã phát hiện cho từng engine
+_backends = {}
+
+def _pg_document(expression):
+    """Biểu thức tsvector giống hệt biểu thức trong index"""
+    return func.to_tsvector(literal_column("'simple'::regconfig"), func.f_unaccent(func.lower(expression)))
+
+def _pg_query(query):
+    """tsquery từ chuỗi người dùng nhập (hỗ trợ "cụm từ", OR, -loại trừ)"""
+    return func.websearch_to_tsquery(literal_column("'simple'::regconfig"), func.f_unaccent(func.lower(query)))
+
+def _contains_pattern(term):
+    """Mẫu ILIKE '%term%' với các ký tự đặc biệt đã được escape"""
+    return '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+def _fts5_query(query):
+    """Chuyển chuỗi người dùng nhập thành truy vấn FTS5 an toàn (các từ nối bằng AND)"""
+    return ' '.join('"' + token.replace('"', '""') + '"' for token in query.split())
+
+class SearchService:
+    """Service tìm kiếm full-text cho admin và các truy vấn theo từ khóa"""
+
+    @staticmethod
+    def install():
+        """
+        Tạo extension, index và bảng FTS cho database hiện tại
+
+        Returns:
+            str: Backend sau khi cài đặt ('postgresql', 'fts5' hoặc 'like')
+        """
+        dialect = db.engine.dialect.name
+        statements = POSTGRES_SETUP if dialect == 'postgresql' else SQLITE_SETUP if dialect == 'sqlite' else []
+        try:
+            for statement in statements:
+                db.session.execute(text(statement))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        _backends.pop(db.engine.url, None)
+        return SearchService.backend()
+
+    @staticmethod
+    def backend():
+        """
+        Backend tìm kiếm của database hiện tại
+
+        Returns:
+            str: 'postgresql' (tsvector/pg_trgm), 'fts5' (SQLite) hoặc 'like' (chưa cài đặt)
+        """
+        url = db.engine.url
+        if url not in _backends:
+            dialect = db.engine.dialect.name
+            backend = 'like'
+            if dialect == 'postgresql':
+                if db.session.execute(text("SELECT 1 FROM pg_proc WHERE proname = 'f_unaccent'")).first():
+                    backend = 'postgresql'
+            elif dialect == 'sqlite':
+                if db.session.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'warningsearch'"
+                )).first():
+                    backend = 'fts5'
+            if backend == 'like':
+                logger.warning("Chưa cài đặt index tìm kiếm, dùng LIKE (chạy setup_search.py)")
+            _backends[url] = backend
+        return _backends[url]
+
+    @staticmethod
+    def _ranked(kind, query, backend):
+        """Câu lệnh (kind, id, rank) cho một loại đối tượng, rank càng lớn càng liên quan"""
+        if kind == 'warning':
+            model, id_column, fts, document = Warning, Warning.warningid, warning_fts, Warning.message
+            like_columns = (Warning.message,)
+        else:
+            model, id_column, fts = CommonError, CommonError.errorid, commonerror_fts
+            document = CommonError.type.concat(literal_column("' '")).concat(CommonError.description)
+            like_columns = (CommonError.type, CommonError.description)
+
+        if backend == 'postgresql':
+            tsquery = _pg_query(query)
+            return select(
+                literal(kind).label('kind'), id_column.label('id'),
+                func.ts_rank(_pg_document(document), tsquery).label('rank')
+            ).where(_pg_document(document).op('@@')(tsquery))
+        if backend == 'fts5':
+            # bm25() càng nhỏ càng liên quan nên đổi dấu
+            return select(
+                literal(kind).label('kind'), fts.c.rowid.label('id'),
+                (-func.bm25(literal_column(fts.name))).label('rank')
+            ).select_from(fts).where(literal_column(fts.name).op('MATCH')(_fts5_query(query)))
+        conditions = [or_(*[c.ilike(_contains_pattern(token), escape='\\') for c in like_columns])
+                      for token in query.split()]
+        return select(
+            literal(kind).label('kind'), id_column.label('id'), literal(0.0, Float).label('rank')
+        ).select_from(model).where(and_(*conditions))
+
+    @staticmethod
+    def search(query, kinds=SEARCH_KINDS, page=1, per_page=20):
+        """
+        Tìm cảnh báo và lỗi thường gặp theo từ khóa, xếp hạng theo độ liên quan
+
+        Args:
+            query (str): Từ khóa (không phân biệt hoa thường và dấu khi đã cài index)
+            kinds (tuple): Các loại cần tìm (xem SEARCH_KINDS)
+            page (int): Trang (bắt đầu từ 1)
+            per_page (int): Số kết quả mỗi trang (tối đa MAX_PER_PAGE)
+
+        Returns:
+            dict: query, page, per_page, total, items (kind, id, rank, data)
+
+        Raises:
+            ValueError: Nếu từ khóa rỗng, thiếu loại hoặc loại không hợp lệ
+        """
+        query = (query or '').strip()
+        if not query:
+            raise ValueError("Thiếu từ khóa tìm kiếm")
+        if not kinds:
+            raise ValueError("Thiếu loại tìm kiếm")
+        invalid = [kind for kind in kinds if kind not in SEARCH_KINDS]
+        if invalid:
+            raise ValueError(f"Loại tìm kiếm không hợp lệ: {', '.join(invalid)}")
+        page = max(int(page), 1)
+        per_page = min(max(int(per_page), 1), MAX_PER_PAGE)
+
+        backend = SearchService.backend()
+        ranked = union_all(*[SearchService._ranked(kind, query, backend) for kind in kinds]).subquery('ranked')
+        total = db.session.execute(select(func.count()).select_from(ranked)).scalar()
+        hits = db.session.execute(
+            select(ranked.c.kind, ranked.c.id, ranked.c.rank)
+            .order_by(ranked.c.rank.desc(), ranked.c.kind, ranked.c.id.desc())
+            .limit(per_page).offset((page - 1) * per_page)
+        ).all()
+
+        warning_ids = [hit.id for hit in hits if hit.kind == 'warning']
+        error_ids = [hit.id for hit in hits if hit.kind == 'commonerror']
+        details = {}
+        if warning_ids:
+            details.update((('warning', w.warningid), w.to_dict())
+                           for w in Warning.query.filter(Warning.warningid.in_(warning_ids)))
+        if error_ids:
+            details.update((('commonerror', e.errorid), e.to_dict())
+                           for e in CommonError.query.filter(CommonError.errorid.in_(error_ids)))
+
+        return {
+            'query': query,
+            'page': page,
+            'per_page': per_page,
+            'total': total,
+            'items': [{
+                'kind': hit.kind,
+                'id': hit.id,
+                'rank': float(hit.rank or 0.0),
+                'data': details.get((hit.kind, hit.id))
+            } for hit in hits if (hit.kind, hit.id) in details]
+        }
+
+    @staticmethod
+    def student_warnings_containing(studentid, term):
+        """
+        Lấy cảnh báo của sinh viên có nội dung chứa chuỗi term (không phân biệt hoa thường)
+
+        Giữ nguyên ngữ nghĩa ILIKE '%term%'; trên PostgreSQL truy vấn dùng được
+        index trigram ix_warning_message_trgm thay vì quét toàn bộ chuỗi.
+
+        Args:
+            studentid (str): ID sinh viên
+            term (str): Chuỗi cần tìm
+
+        Returns:
+            list: Danh sách Warning
+        """
+        return Warning.query.filter(
+            Warning.studentid == studentid,
+            Warning.message.ilike(_contains_pattern(term), escape='\\')
+        ).all()
@@ -2,13 +2,46 @@
 Student Service - Business logic cho sinh viên
 """
 from datetime import datetime
+from sqlalchemy import select, and_
+from sqlalchemy.orm import joinedload, selectinload
 from app import db
-from app.models import Student, Progress, Assignment, BloomAssessment, Warning, CommonError
+from app.models import Student, Course, Progress, Assignment, BloomAssessment, Warning, CommonError
+from app.services.reference_data_service import ReferenceDataService
 from app.utils import classify_student
 
+# Chiến lược nạp quan hệ cho StudentService.get_student (các quan hệ đều lazy='raise').
+# Tiến độ và Bloom chỉ vài dòng mỗi sinh viên nên JOIN ngay trong truy vấn sinh viên.
+PROFILE_LOAD = (
+    joinedload(Student.progress),
+    joinedload(Student.bloom_assessments)
+)
+# Thêm khóa học của tiến độ và bài tập của khóa học (một truy vấn IN cho bài tập)
+PREDICTION_LOAD = (
+    joinedload(Student.progress).joinedload(Progress.course).selectinload(Course.assignments),
+    joinedload(Student.bloom_assessments)
+)
+# Cảnh báo có thể nhiều, nạp bằng truy vấn IN riêng để không nhân bản dòng của JOIN
+WARNINGS_LOAD = (selectinload(Student.warnings),)
+
 class StudentService:
     """Service xử lý logic nghiệp vụ cho sinh viên"""
     
+    @staticmethod
+    def get_student(studentid, *options):
+        """
+        Lấy sinh viên kèm các quan hệ được nạp sẵn
+        
+        Args:
+            studentid (str): ID sinh viên
+            options: Loader option (PROFILE_LOAD, PREDICTION_LOAD, WARNINGS_LOAD...) cho các quan hệ sẽ dùng
+            
+        Returns:
+            Student: Sinh viên hoặc None nếu không tìm thấy
+        """
+        return db.session.execute(
+            select(Student).where(Student.studentid == studentid).options(*options)
+        ).unique().scalar_one_or_none()
+    
     @staticmethod
     def count_student_submissions(student_name, assignments):
         """
@@ -40,18 +73,18 @@ class StudentService:
         Returns:
             dict: Dữ liệu sinh viên hoặc None nếu không tìm thấy
         """
-        student = Student.query.get(studentid)
+        student = StudentService.get_student(studentid, *PREDICTION_LOAD)
         if not student:
             return None
             
-        progress = Progress.query.filter_by(studentid=studentid).first()
-        bloom = BloomAssessment.query.filter_by(studentid=studentid).first()
+        progress = student.progress[0] if student.progress else None
+        bloom = student.bloom_assessments[0] if student.bloom_assessments else None
         
         if not progress or not bloom:
             return None
             
-        assignments = Assignment.query.filter_by(courseid=progress.courseid).all() if progress else []
-        errors = CommonError.query.filter_by(courseid=progress.courseid).all() if progress else []
+        assignments = progress.course.assignments if progress.course else []
+        errors = ReferenceDataService.get_common_errors(progress.courseid) if progress else []
         
         num_submissions = StudentService.count_student_submissions(student.name, assignments)
         num_errors = len(errors)
@@ -109,45 +142,81 @@ class StudentService:
         return None
     
     @staticmethod
-    def get_assignment_submission_details(assignment, course_students):
+    def get_course_student_rows(courseid):
+        """
+        Lấy sinh viên của khóa học kèm tiến độ và điểm Bloom trong một truy vấn
+
+        Student JOIN Progress (theo khóa học) LEFT JOIN BloomAssessment (theo
+        sinh viên và khóa học). Mỗi sinh viên chỉ giữ dòng đầu tiên, tương
+        đương với .first() trên Progress và BloomAssessment.
+
+        Args:
+            courseid (int): ID khóa học
+
+        Returns:
+            list: Danh sách row (studentid, name, progressrate, score)
+        """
+        rows = db.session.execute(
+            select(Student.studentid, Student.name, Progress.progressrate, BloomAssessment.score)
+            .select_from(Student)
+            .join(Progress, and_(
+                Progress.studentid == Student.studentid,
+                Progress.courseid == courseid
+            ))
+            .outerjoin(BloomAssessment, and_(
+                BloomAssessment.studentid == Student.studentid,
+                BloomAssessment.courseid == courseid
+            ))
+            .order_by(Progress.progressid, BloomAssessment.assessmentid)
+        )
+
+        seen = set()
+        course_rows = []
+        for row in rows:
+            if row.studentid not in seen:
+                seen.add(row.studentid)
+                course_rows.append(row)
+        return course_rows
+    
+    @staticmethod
+    def get_assignment_submission_details(assignment, course_rows):
         """
         Lấy chi tiết nộp bài của assignment
         
         Args:
             assignment: Assignment object
-            course_students: Danh sách sinh viên trong khóa học
+            course_rows: Danh sách row từ get_course_student_rows()
             
         Returns:
             dict: Chi tiết submission
         """
         submitted_names = assignment.studentssubmitted.split(', ') if assignment.studentssubmitted else []
         not_submitted_names = assignment.studentsnotsubmitted.split(', ') if assignment.studentsnotsubmitted else []
+        submitted_set = set(submitted_names)
+        not_submitted_set = set(not_submitted_names)
 
         result_submitted = []
         result_not_submitted = []
 
-        for student in course_students:
-            progress = Progress.query.filter_by(studentid=student.studentid, courseid=assignment.courseid).first()
-            bloom = BloomAssessment.query.filter_by(studentid=student.studentid, courseid=assignment.courseid).first()
-            current_score = bloom.score if bloom else None
-
+        for row in course_rows:
+            is_submitted = row.name in submitted_set
             student_info = {
-                'studentid': student.studentid,
-                'name': student.name,
-                'progress': progress.progressrate if progress else 0,
-                'current_score': current_score,
-                'status': 'Đã nộp' if student.name in submitted_names else 'Chưa nộp'
+                'studentid': row.studentid,
+                'name': row.name,
+                'progress': row.progressrate if row.progressrate is not None else 0,
+                'current_score': row.score,
+                'status': 'Đã nộp' if is_submitted else 'Chưa nộp'
             }
 
-            if student.name in submitted_names:
+            if is_submitted:
                 result_submitted.append(student_info)
-            elif student.name in not_submitted_names:
+            elif row.name in not_submitted_set:
                 result_not_submitted.append(student_info)
 
         return {
             'assignment_name': assignment.name,
-            'deadline': assignment.deadline.isoformat(),
-            'total_students': len(course_students),
+            'deadline': assignment.deadline,
+            'total_students': len(course_rows),
             'submitted_count': len(submitted_names),
             'not_submitted_count': len(not_submitted_names),
             'submitted_students': result_submitted,
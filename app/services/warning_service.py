@@ -2,29 +2,45 @@
 Warning Service - Xử lý tạo cảnh báo và lộ trình học tập
 """
 from datetime import datetime
-from app.models import Student, Progress, Warning, BloomAssessment, Course, CourseHistory, Assignment, CommonError
+from app.models import Student, Progress, Warning, BloomAssessment, CourseHistory, Assignment, CommonError
 from app.services.ml_service import MLService
+from app.services.reference_data_service import ReferenceDataService
+from app.services.student_service import StudentService, PROFILE_LOAD
+from app.services.warning_stats_service import WarningStatsService
+from app.utils import encode_priority, encode_severity, encode_bloomlevel
+
+def _course_data(course):
+    """Các trường khóa học trả về trong lộ trình học tập"""
+    return {
+        'courseid': course['courseid'],
+        'coursename': course['coursename'],
+        'credits': course['credits'],
+        'semester': course['semester'],
+        'difficulty': course['difficulty'],
+        'category': course['category']
+    }
 
 class WarningService:
     """Service xử lý cảnh báo và lộ trình học tập"""
     
-    def __init__(self):
-        self.ml_service = MLService()
+    def __init__(self, ml_service=None):
+        """
+        Args:
+            ml_service (MLService): Service ML dùng chung (mặc định tạo mới, xem ServiceContainer)
+        """
+        self.ml_service = ml_service or MLService()
     
     def encode_priority(self, priority):
         """Mã hóa priority"""
-        mapping = {'LOW': 0, 'MEDIUM': 1, 'HIGH': 2}
-        return mapping.get(priority, 1)
+        return encode_priority(priority)
 
     def encode_severity(self, severity):
         """Mã hóa severity"""
-        mapping = {'LOW': 0, 'MEDIUM': 1, 'HIGH': 2}
-        return mapping.get(severity, 1)
+        return encode_severity(severity)
 
     def encode_bloomlevel(self, bloomlevel):
         """Mã hóa bloom level"""
-        mapping = {'Nhớ': 0, 'Hiểu': 1, 'Áp dụng': 2, 'Phân tích': 3, 'Đánh giá': 4, 'Sáng tạo': 5}
-        return mapping.get(bloomlevel, 0)
+        return encode_bloomlevel(bloomlevel)
     
     def generate_warning_message(self, student, progressrate, bloomscore, count_errors, priority, severity, bloomlevel, risk):
         """
@@ -159,26 +175,26 @@ class WarningService:
             tuple: (success, message, data)
         """
         try:
-            # Kiểm tra sinh viên tồn tại
-            student = Student.query.get(studentid)
+            # Kiểm tra sinh viên tồn tại (tiến độ và Bloom được nạp cùng truy vấn)
+            student = StudentService.get_student(studentid, *PROFILE_LOAD)
             if not student:
                 return False, 'Không tìm thấy sinh viên', None
             
             # Kiểm tra tiến độ
-            progress = Progress.query.filter_by(studentid=studentid).first()
+            progress = student.progress[0] if student.progress else None
             if not progress:
                 return False, 'Không tìm thấy dữ liệu tiến độ', None
             
             # Kiểm tra đánh giá Bloom
-            bloom = BloomAssessment.query.filter_by(studentid=studentid).first()
+            bloom = student.bloom_assessments[0] if student.bloom_assessments else None
             if not bloom:
                 return False, 'Không tìm thấy đánh giá Bloom', None
             
-            # Đếm tổng số lỗi và lấy priority, severity
-            warnings = Warning.query.filter_by(studentid=studentid).all()
-            count_errors = len(warnings)
-            priority = sum([self.encode_priority(w.priority) for w in warnings]) / len(warnings) if warnings else self.encode_priority('LOW')
-            severity = sum([self.encode_severity(w.severity) for w in warnings]) / len(warnings) if warnings else self.encode_severity('LOW')
+            # Đếm tổng số lỗi và lấy priority, severity từ bảng thống kê
+            stats = WarningStatsService.get_stats(studentid)
+            count_errors = stats['warningcount']
+            priority = stats['prioritysum'] / stats['warningcount'] if stats['warningcount'] else self.encode_priority('LOW')
+            severity = stats['severitysum'] / stats['warningcount'] if stats['warningcount'] else self.encode_severity('LOW')
             bloomlevel = self.encode_bloomlevel(bloom.bloomlevel)
             
             # Dự đoán rủi ro
@@ -212,50 +228,39 @@ class WarningService:
             tuple: (success, message, data)
         """
         try:
-            # Kiểm tra sinh viên tồn tại
-            student = Student.query.get(studentid)
+            # Kiểm tra sinh viên tồn tại (tiến độ và Bloom được nạp cùng truy vấn)
+            student = StudentService.get_student(studentid, *PROFILE_LOAD)
             if not student:
                 return False, 'Không tìm thấy sinh viên', None
             
-            # Lấy khóa học hiện tại
-            current_course = Course.query.join(
-                Progress, Progress.courseid == Course.courseid
-            ).filter(
-                Progress.studentid == studentid,
-                Course.status == 'ACTIVE'
-            ).first()
+            # Khóa học lấy từ cache dữ liệu tham chiếu, chỉ dữ liệu của sinh viên đọc từ database
+            courses = ReferenceDataService.get_courses()
+            courses_by_id = {c['courseid']: c for c in courses}
+            progress_rows = student.progress
+
+            # Lấy khóa học hiện tại (khóa ACTIVE đầu tiên sinh viên đang học)
+            current_row = next((row for row in progress_rows
+                                if row.courseid in courses_by_id
+                                and courses_by_id[row.courseid]['status'] == 'ACTIVE'), None)
+            current_course = courses_by_id[current_row.courseid] if current_row else None
+            current_courseid = current_course['courseid'] if current_course else None
             
-            current_course_data = {
-                'courseid': current_course.courseid,
-                'coursename': current_course.coursename,
-                'credits': current_course.credits,
-                'semester': current_course.semester,
-                'difficulty': current_course.difficulty,
-                'category': current_course.category,
-                'progressrate': Progress.query.filter_by(studentid=studentid, courseid=current_course.courseid).first().progressrate if current_course else 0.0
-            } if current_course else {}
+            current_course_data = dict(
+                _course_data(current_course), progressrate=current_row.progressrate
+            ) if current_course else {}
             
             # Lấy danh sách khóa học đã hoàn thành
             completed_courses = CourseHistory.query.filter_by(studentid=studentid).with_entities(CourseHistory.courseid).all()
-            completed_course_ids = [c.courseid for c in completed_courses]
+            completed_course_ids = {c.courseid for c in completed_courses}
             
             # Lấy tất cả khóa học chưa hoàn thành (trừ khóa học hiện tại)
-            all_courses = Course.query.filter(
-                Course.courseid != (current_course.courseid if current_course else None),
-                ~Course.courseid.in_(completed_course_ids)
-            ).all()
-            all_courses_data = [{
-                'courseid': c.courseid,
-                'coursename': c.coursename,
-                'credits': c.credits,
-                'semester': c.semester,
-                'difficulty': c.difficulty,
-                'category': c.category
-            } for c in all_courses]
+            all_courses = [c for c in courses
+                           if c['courseid'] != current_courseid and c['courseid'] not in completed_course_ids]
+            all_courses_data = [_course_data(c) for c in all_courses]
             
             # Lấy dữ liệu tiến độ, Bloom, và cảnh báo
-            progress = Progress.query.filter_by(studentid=studentid).first()
-            bloom = BloomAssessment.query.filter_by(studentid=studentid).first()
+            progress = progress_rows[0] if progress_rows else None
+            bloom = student.bloom_assessments[0] if student.bloom_assessments else None
             
             if not progress:
                 return False, 'Không tìm thấy dữ liệu tiến độ', None
@@ -263,11 +268,11 @@ class WarningService:
             if not bloom:
                 return False, 'Không tìm thấy đánh giá Bloom', None
             
-            # Đếm số lỗi và lấy priority, severity
-            warnings = Warning.query.filter_by(studentid=studentid).all()
-            count_errors = min(len(warnings), 10)  # Giới hạn tối đa 10 lỗi
-            priority = sum([self.encode_priority(w.priority) for w in warnings]) / len(warnings) if warnings else self.encode_priority('LOW')
-            severity = sum([self.encode_severity(w.severity) for w in warnings]) / len(warnings) if warnings else self.encode_severity('LOW')
+            # Đếm số lỗi và lấy priority, severity từ bảng thống kê
+            stats = WarningStatsService.get_stats(studentid)
+            count_errors = min(stats['warningcount'], 10)  # Giới hạn tối đa 10 lỗi
+            priority = stats['prioritysum'] / stats['warningcount'] if stats['warningcount'] else self.encode_priority('LOW')
+            severity = stats['severitysum'] / stats['warningcount'] if stats['warningcount'] else self.encode_severity('LOW')
             bloomlevel = self.encode_bloomlevel(bloom.bloomlevel)
             
             # Dự đoán rủi ro
@@ -276,41 +281,15 @@ class WarningService:
                 count_errors, priority, severity, bloomlevel
             )
             
-            # Đề xuất khóa học
-            recommended_courses = []
-            if progress and bloom:
-                if risk_prediction == 1 or student.totalgpa < 2.0:
-                    recommended_courses = Course.query.filter(
-                        Course.difficulty == 'BASIC',
-                        Course.courseid != (current_course.courseid if current_course else None),
-                        ~Course.courseid.in_(completed_course_ids)
-                    ).limit(2).all()
-                elif bloom.bloomlevel in ['Sáng tạo', 'Đánh giá']:
-                    recommended_courses = Course.query.filter(
-                        Course.difficulty == 'ADVANCED',
-                        Course.courseid != (current_course.courseid if current_course else None),
-                        ~Course.courseid.in_(completed_course_ids)
-                    ).limit(2).all()
-                else:
-                    recommended_courses = Course.query.filter(
-                        Course.difficulty == 'INTERMEDIATE',
-                        Course.courseid != (current_course.courseid if current_course else None),
-                        ~Course.courseid.in_(completed_course_ids)
-                    ).limit(2).all()
+            # Đề xuất khóa học (2 khóa đầu tiên theo độ khó, trừ khóa hiện tại và đã hoàn thành)
+            if risk_prediction == 1 or student.totalgpa < 2.0:
+                difficulty = 'BASIC'
+            elif bloom.bloomlevel in ['Sáng tạo', 'Đánh giá']:
+                difficulty = 'ADVANCED'
             else:
-                recommended_courses = Course.query.filter(
-                    Course.difficulty == 'BASIC',
-                    ~Course.courseid.in_(completed_course_ids)
-                ).limit(2).all()
-            
-            recommended_courses_data = [{
-                'courseid': c.courseid,
-                'coursename': c.coursename,
-                'credits': c.credits,
-                'semester': c.semester,
-                'difficulty': c.difficulty,
-                'category': c.category
-            } for c in recommended_courses]
+                difficulty = 'INTERMEDIATE'
+            recommended_courses = [c for c in all_courses if c['difficulty'] == difficulty][:2]
+            recommended_courses_data = [_course_data(c) for c in recommended_courses]
             
             # Phản hồi
             response = {
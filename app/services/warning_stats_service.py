@@ -0,0 +1,246 @@
+"""
+Warning Stats Service - Duy trì bảng studentwarningstats cho đặc trưng rủi ro
+"""
+import logging
+from sqlalchemy import event, inspect, select, update, insert, delete, func, case, or_, union, union_all
+from sqlalchemy.orm import Session
+from app import db
+from app.models import Warning, WarningArchive, StudentWarningStats
+from app.utils import encode_priority, encode_severity
+from app.utils.helpers import (PRIORITY_CODES, SEVERITY_CODES, DEFAULT_PRIORITY_CODE,
+                               DEFAULT_SEVERITY_CODE)
+
+logger = logging.getLogger(__name__)
+
+stats_table = StudentWarningStats.__table__
+
+# Các cột cộng dồn được (lastwarningdate xử lý riêng)
+COUNTER_COLUMNS = ('warningcount', 'unresolvedcount', 'prioritysum', 'severitysum')
+
+# Các thuộc tính của Warning ảnh hưởng đến thống kê
+TRACKED_ATTRIBUTES = ('studentid', 'isresolved', 'priority', 'severity')
+
+# Số sinh viên mỗi lần tính lại trong refresh_all()
+REFRESH_BATCH_SIZE = 1000
+
+class WarningStatsService:
+    """
+    Service đọc và duy trì thống kê cảnh báo theo sinh viên
+
+    Thêm mới, giải quyết hoặc sửa Warning qua ORM được áp dụng dưới dạng cộng dồn
+    (col = col + delta) trong cùng transaction. Xóa Warning thì tính lại sinh viên
+    đó từ bảng warning. Cảnh báo được chuyển sang warningarchive vẫn được tính.
+    Đặc trưng ML chỉ cần đọc một dòng theo khóa chính.
+    """
+
+    @staticmethod
+    def stats_statement(studentids):
+        """
+        Câu lệnh tính thống kê từ bảng warning (kể cả warningarchive) cho các sinh viên
+
+        Args:
+            studentids (list): Danh sách ID sinh viên
+
+        Returns:
+            Select: Mỗi sinh viên có cảnh báo một dòng (studentid và các cột thống kê)
+        """
+        history = union_all(*[
+            select(model.studentid, model.isresolved, model.priority, model.severity, model.createddate)
+            .where(model.studentid.in_(studentids))
+            for model in (Warning, WarningArchive)
+        ]).subquery('history')
+        return select(
+            history.c.studentid,
+            func.count().label('warningcount'),
+            func.sum(case((history.c.isresolved == False, 1), else_=0)).label('unresolvedcount'),
+            func.sum(case(PRIORITY_CODES, value=history.c.priority, else_=DEFAULT_PRIORITY_CODE)).label('prioritysum'),
+            func.sum(case(SEVERITY_CODES, value=history.c.severity, else_=DEFAULT_SEVERITY_CODE)).label('severitysum'),
+            func.max(history.c.createddate).label('lastwarningdate')
+        ).group_by(history.c.studentid)
+
+    @staticmethod
+    def recompute(studentids, connection=None):
+        """
+        Tính lại thống kê của các sinh viên từ bảng warning
+
+        Args:
+            studentids (iterable): Danh sách ID sinh viên
+            connection: Connection đang dùng (mặc định là connection của db.session)
+        """
+        studentids = list(studentids)
+        if not studentids:
+            return
+        connection = connection if connection is not None else db.session.connection()
+        computed = {row.studentid: row._mapping for row in
+                    connection.execute(WarningStatsService.stats_statement(studentids))}
+        for studentid in studentids:
+            row = computed.get(studentid)
+            values = {column: row[column] if row else 0 for column in COUNTER_COLUMNS}
+            values['lastwarningdate'] = row['lastwarningdate'] if row else None
+            result = connection.execute(
+                update(stats_table).where(stats_table.c.studentid == studentid).values(**values)
+            )
+            if result.rowcount == 0 and row:
+                connection.execute(insert(stats_table).values(studentid=studentid, **values))
+
+    @staticmethod
+    def apply_deltas(deltas, connection=None):
+        """
+        Cộng dồn thay đổi vào bảng thống kê
+
+        Sinh viên chưa có dòng thống kê được tính lại đầy đủ từ bảng warning
+        (bảng warning lúc này đã chứa các thay đổi vừa flush).
+
+        Args:
+            deltas (dict): studentid -> dict các cột COUNTER_COLUMNS và lastwarningdate
+            connection: Connection đang dùng (mặc định là connection của db.session)
+        """
+        connection = connection if connection is not None else db.session.connection()
+        missing = []
+        for studentid, delta in deltas.items():
+            if not any(delta[column] for column in COUNTER_COLUMNS) and delta['lastwarningdate'] is None:
+                continue
+            values = {column: stats_table.c[column] + delta[column] for column in COUNTER_COLUMNS}
+            if delta['lastwarningdate'] is not None:
+                values['lastwarningdate'] = case(
+                    (or_(stats_table.c.lastwarningdate.is_(None),
+                         stats_table.c.lastwarningdate < delta['lastwarningdate']), delta['lastwarningdate']),
+                    else_=stats_table.c.lastwarningdate
+                )
+            result = connection.execute(
+                update(stats_table).where(stats_table.c.studentid == studentid).values(**values)
+            )
+            if result.rowcount == 0:
+                missing.append(studentid)
+        WarningStatsService.recompute(missing, connection)
+
+    @staticmethod
+    def record_inserted(warnings, connection=None):
+        """
+        Cập nhật thống kê cho các cảnh báo được thêm bằng bulk insert (không qua flush)
+
+        Args:
+            warnings (list): Danh sách dict cảnh báo vừa thêm (studentid, isresolved,
+                             priority, severity, createddate)
+            connection: Connection đang dùng (mặc định là connection của db.session)
+        """
+        deltas = {}
+        for warning in warnings:
+            _add_contribution(deltas, warning['studentid'], warning.get('isresolved'),
+                              warning['priority'], warning['severity'], warning.get('createddate'))
+        WarningStatsService.apply_deltas(deltas, connection)
+
+    @staticmethod
+    def get_stats(studentid):
+        """
+        Lấy thống kê cảnh báo của sinh viên
+
+        Nếu chưa có dòng thống kê thì tính trực tiếp từ bảng warning (không ghi).
+
+        Args:
+            studentid (str): ID sinh viên
+
+        Returns:
+            dict: warningcount, unresolvedcount, prioritysum, severitysum, lastwarningdate
+        """
+        row = db.session.execute(
+            select(stats_table).where(stats_table.c.studentid == studentid)
+        ).first()
+        if row is None:
+            row = db.session.execute(WarningStatsService.stats_statement([studentid])).first()
+        if row is None:
+            return {'studentid': studentid, 'warningcount': 0, 'unresolvedcount': 0,
+                    'prioritysum': 0, 'severitysum': 0, 'lastwarningdate': None}
+        return dict(row._mapping)
+
+    @staticmethod
+    def refresh_all():
+        """
+        Tính lại toàn bộ bảng thống kê (job định kỳ để xử lý sai lệch)
+
+        Returns:
+            int: Số sinh viên đã tính lại
+        """
+        studentids = db.session.execute(union(
+            select(Warning.studentid).where(Warning.studentid.is_not(None)),
+            select(WarningArchive.studentid).where(WarningArchive.studentid.is_not(None)),
+            select(stats_table.c.studentid)
+        )).scalars().all()
+        for start in range(0, len(studentids), REFRESH_BATCH_SIZE):
+            WarningStatsService.recompute(studentids[start:start + REFRESH_BATCH_SIZE])
+        # Dòng của sinh viên không còn cảnh báo nào thì bỏ đi
+        db.session.execute(delete(stats_table).where(stats_table.c.warningcount == 0))
+        db.session.commit()
+        logger.info(f"Đã tính lại thống kê cảnh báo cho {len(studentids)} sinh viên")
+        return len(studentids)
+
+def _empty_delta():
+    """Delta rỗng cho một sinh viên"""
+    delta = dict.fromkeys(COUNTER_COLUMNS, 0)
+    delta['lastwarningdate'] = None
+    return delta
+
+def _add_contribution(deltas, studentid, isresolved, priority, severity, createddate=None, sign=1):
+    """Cộng (sign=1) hoặc trừ (sign=-1) phần đóng góp của một cảnh báo vào delta"""
+    if studentid is None:
+        return
+    delta = deltas.setdefault(studentid, _empty_delta())
+    delta['warningcount'] += sign
+    delta['unresolvedcount'] += 0 if isresolved else sign
+    delta['prioritysum'] += sign * encode_priority(priority)
+    delta['severitysum'] += sign * encode_severity(severity)
+    if createddate is not None and (delta['lastwarningdate'] is None or createddate > delta['lastwarningdate']):
+        delta['lastwarningdate'] = createddate
+
+def _previous_value(state, name):
+    """Giá trị của thuộc tính trước lần thay đổi hiện tại"""
+    history = state.attrs[name].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(state.object, name)
+
+def _collect_changes(session):
+    """Gom các thay đổi Warning của lần flush hiện tại thành delta và danh sách cần tính lại"""
+    deltas = {}
+    recompute = set()
+    for obj in session.new:
+        if isinstance(obj, Warning):
+            _add_contribution(deltas, obj.studentid, obj.isresolved, obj.priority, obj.severity, obj.createddate)
+    for obj in session.deleted:
+        if isinstance(obj, Warning):
+            recompute.add(obj.studentid)
+    for obj in session.dirty:
+        if not isinstance(obj, Warning):
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[name].history.has_changes() for name in TRACKED_ATTRIBUTES):
+            continue
+        previous = {name: _previous_value(state, name) for name in TRACKED_ATTRIBUTES}
+        _add_contribution(deltas, previous['studentid'], previous['isresolved'],
+                          previous['priority'], previous['severity'], sign=-1)
+        _add_contribution(deltas, obj.studentid, obj.isresolved, obj.priority, obj.severity, obj.createddate)
+        if previous['studentid'] != obj.studentid:
+            # lastwarningdate của sinh viên cũ không trừ được, tính lại từ đầu
+            recompute.add(previous['studentid'])
+    recompute.discard(None)
+    return {studentid: delta for studentid, delta in deltas.items() if studentid not in recompute}, recompute
+
+def _refresh_after_flush(session, flush_context):
+    """Cập nhật studentwarningstats cho các cảnh báo vừa thay đổi, trong cùng transaction"""
+    deltas, recompute = _collect_changes(session)
+    if not deltas and not recompute:
+        return
+    connection = session.connection()
+    WarningStatsService.apply_deltas(deltas, connection)
+    WarningStatsService.recompute(recompute, connection)
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    """Không làm gì, chỉ để bật active_history cho các thuộc tính được theo dõi"""
+
+def register_warning_stats_events():
+    """Đăng ký các event duy trì studentwarningstats (gọi một lần trong create_app)"""
+    if not event.contains(Session, 'after_flush', _refresh_after_flush):
+        # Cần giá trị cũ kể cả khi thuộc tính đã bị expire, để trừ đúng phần đóng góp cũ
+        for name in TRACKED_ATTRIBUTES:
+            event.listen(getattr(Warning, name), 'set', _keep_previous_value, active_history=True)
+        event.listen(Session, 'after_flush', _refresh_after_flush)
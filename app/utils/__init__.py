@@ -1,6 +1,7 @@
 """
 Utils package
 """
-from .helpers import classify_student
+from .helpers import classify_student, encode_priority, encode_severity, encode_bloomlevel, month_start
 
-__all__ = ['classify_student']
\ No newline at end of file
+__all__ = ['classify_student', 'encode_priority', 'encode_severity', 'encode_bloomlevel',
+           'month_start']
\ No newline at end of file
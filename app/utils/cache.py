@@ -0,0 +1,223 @@
+"""
+Cache - Bộ nhớ đệm đọc xuyên (read-through) với namespace có phiên bản
+
+Backend:
+    memory: dict trong process có TTL (mặc định, mỗi worker một bản)
+    redis:  server Redis dùng chung giữa các worker (cần gói redis)
+    none:   tắt cache, mọi lần đọc đều gọi loader
+
+Mỗi namespace (ví dụ 'course') có một số phiên bản; khóa thực tế là
+'<prefix>:<namespace>:v<phiên bản>:<khóa>'. Vô hiệu hóa một namespace chỉ cần
+tăng phiên bản, các khóa cũ tự hết hạn theo TTL.
+"""
+import logging
+import pickle
+import threading
+import time
+from flask import current_app
+
+try:
+    import redis
+except ImportError:  # Chỉ cần khi CACHE_BACKEND = 'redis'
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+class MemoryBackend:
+    """Backend lưu trong dict của process, có TTL và giới hạn số khóa"""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Lấy giá trị, None nếu không có hoặc đã hết hạn"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Ghi giá trị, ttl (giây) None = không hết hạn"""
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                self._evict()
+            self._entries[key] = (expires_at, value)
+
+    def counter(self, key):
+        """Giá trị hiện tại của bộ đếm (0 nếu chưa có)"""
+        return self.get(key) or 0
+
+    def incr(self, key):
+        """Tăng bộ đếm (không hết hạn) và trả về giá trị mới"""
+        with self._lock:
+            _, value = self._entries.get(key, (None, 0))
+            self._entries[key] = (None, value + 1)
+            return value + 1
+
+    def clear(self):
+        """Xóa toàn bộ"""
+        with self._lock:
+            self._entries.clear()
+
+    def _evict(self):
+        """Bỏ các khóa đã hết hạn; nếu vẫn đầy thì bỏ khóa cũ nhất (trừ bộ đếm phiên bản)"""
+        now = time.monotonic()
+        for key in [key for key, (expires_at, _) in self._entries.items()
+                    if expires_at is not None and expires_at <= now]:
+            del self._entries[key]
+        if len(self._entries) >= self.max_entries:
+            oldest = next((key for key, (expires_at, _) in self._entries.items() if expires_at is not None), None)
+            if oldest is not None:
+                del self._entries[oldest]
+
+class RedisBackend:
+    """Backend Redis, giá trị được pickle (chỉ dùng với server tin cậy)"""
+
+    def __init__(self, url):
+        if redis is None:
+            raise RuntimeError("Chưa cài gói redis (pip install redis)")
+        self.client = redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0)
+
+    def get(self, key):
+        """Lấy giá trị, None nếu không có"""
+        raw = self.client.get(key)
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        """Ghi giá trị, ttl (giây) None = không hết hạn"""
+        self.client.set(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ex=ttl or None)
+
+    def counter(self, key):
+        """Giá trị hiện tại của bộ đếm (0 nếu chưa có)"""
+        return int(self.client.get(key) or 0)
+
+    def incr(self, key):
+        """Tăng bộ đếm và trả về giá trị mới"""
+        return self.client.incr(key)
+
+    def clear(self):
+        """Không xóa toàn bộ database Redis dùng chung; dùng invalidate() cho từng namespace"""
+
+class NullBackend:
+    """Backend không lưu gì (tắt cache)"""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def counter(self, key):
+        return 0
+
+    def incr(self, key):
+        return 0
+
+    def clear(self):
+        pass
+
+class Cache:
+    """
+    Cache đọc xuyên với namespace có phiên bản
+
+    Lỗi của backend (ví dụ Redis mất kết nối) không làm hỏng request: cache
+    được bỏ qua và dữ liệu đọc thẳng từ loader.
+    """
+
+    def __init__(self, backend, default_ttl=3600, prefix='lms'):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.prefix = prefix
+
+    def _version_key(self, namespace):
+        return f"{self.prefix}:{namespace}:version"
+
+    def _key(self, namespace, key):
+        version = self.backend.counter(self._version_key(namespace))
+        return f"{self.prefix}:{namespace}:v{version}:{key}"
+
+    def get_or_load(self, namespace, key, loader, ttl=None):
+        """
+        Lấy giá trị từ cache, nếu không có thì gọi loader và lưu lại
+
+        Giá trị trả về có thể được dùng chung giữa các request, không được sửa.
+
+        Args:
+            namespace (str): Namespace (thường là tên bảng)
+            key (str): Khóa trong namespace
+            loader (callable): Hàm không tham số trả về giá trị (None thì không lưu)
+            ttl (int): Thời gian sống (giây), mặc định default_ttl
+
+        Returns:
+            object: Giá trị
+        """
+        try:
+            cache_key = self._key(namespace, key)
+            value = self.backend.get(cache_key)
+            if value is not None:
+                return value
+        except Exception as e:
+            logger.warning(f"Không đọc được cache {namespace}:{key}: {str(e)}")
+            return loader()
+
+        value = loader()
+        if value is not None:
+            try:
+                self.backend.set(cache_key, value, ttl or self.default_ttl)
+            except Exception as e:
+                logger.warning(f"Không ghi được cache {namespace}:{key}: {str(e)}")
+        return value
+
+    def invalidate(self, *namespaces):
+        """Vô hiệu hóa toàn bộ khóa của các namespace bằng cách tăng phiên bản"""
+        for namespace in namespaces:
+            try:
+                self.backend.incr(self._version_key(namespace))
+            except Exception as e:
+                logger.warning(f"Không vô hiệu hóa được cache {namespace}: {str(e)}")
+
+    def clear(self):
+        """Xóa toàn bộ cache của backend trong process"""
+        self.backend.clear()
+
+def create_cache(config):
+    """
+    Tạo Cache theo cấu hình (CACHE_BACKEND, CACHE_REDIS_URL, CACHE_DEFAULT_TTL, CACHE_MAX_ENTRIES)
+
+    Backend redis không khởi tạo được thì dùng memory.
+
+    Args:
+        config (dict): app.config
+
+    Returns:
+        Cache: Đối tượng cache
+    """
+    name = config.get('CACHE_BACKEND', 'memory')
+    if name == 'redis':
+        try:
+            backend = RedisBackend(config['CACHE_REDIS_URL'])
+        except Exception as e:
+            logger.warning(f"Không dùng được Redis cache, chuyển sang memory: {str(e)}")
+            backend = MemoryBackend(config.get('CACHE_MAX_ENTRIES', 10000))
+    elif name == 'none':
+        backend = NullBackend()
+    else:
+        backend = MemoryBackend(config.get('CACHE_MAX_ENTRIES', 10000))
+    return Cache(backend, config.get('CACHE_DEFAULT_TTL', 3600), config.get('CACHE_KEY_PREFIX', 'lms'))
+
+def init_cache(app):
+    """Khởi tạo cache cho app (gọi một lần trong create_app)"""
+    app.extensions['cache'] = create_cache(app.config)
+    return app.extensions['cache']
+
+def get_cache():
+    """Cache của app hiện tại"""
+    return current_app.extensions['cache']
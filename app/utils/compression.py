@@ -0,0 +1,140 @@
+"""
+Compression - Nén gzip/brotli các response JSON theo Accept-Encoding của client
+"""
+import re
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli là tùy chọn, khi không có chỉ dùng gzip
+    brotli = None
+
+# Hậu tố ETag theo encoding, để bản nén và bản gốc có strong ETag khác nhau
+ETAG_SUFFIX = re.compile(r'-(gzip|br)"')
+
+# Khóa trong WSGI environ ghi nhớ encoding của ETag client gửi lên
+ETAG_ENCODING_KEY = 'app.etag_encoding'
+
+class _GzipStream:
+    """Nén gzip từng phần, flush sau mỗi phần để client nhận được dữ liệu ngay"""
+
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk):
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+class _BrotliStream:
+    """Nén brotli từng phần, flush sau mỗi phần"""
+
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, chunk):
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+def _compress(encoding, data, config):
+    """Nén toàn bộ body một lần"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=config['COMPRESS_BROTLI_QUALITY'])
+    return zlib.compress(data, config['COMPRESS_LEVEL'], 31)
+
+def _compress_stream(encoding, response, config):
+    """Bọc generator của response streaming bằng bộ nén tương ứng"""
+    stream = (_BrotliStream(config['COMPRESS_BROTLI_QUALITY']) if encoding == 'br'
+              else _GzipStream(config['COMPRESS_LEVEL']))
+    source = response.response
+    chunks = response.iter_encoded()
+
+    def generate():
+        try:
+            for chunk in chunks:
+                if chunk:
+                    yield stream.compress(chunk)
+            yield stream.finish()
+        finally:
+            # Đóng generator gốc (giải phóng cursor của stream_json_array)
+            if hasattr(source, 'close'):
+                source.close()
+
+    return generate()
+
+def _negotiate(encodings):
+    """Chọn encoding client chấp nhận với q cao nhất (cùng q thì theo thứ tự cấu hình)"""
+    return request.accept_encodings.best_match(encodings)
+
+def _strip_etag_suffix():
+    """
+    Bỏ hậu tố encoding trong If-None-Match trước khi route so sánh ETag
+
+    Hậu tố được ghi nhớ để gắn lại vào ETag của response 304.
+    """
+    header = request.environ.get('HTTP_IF_NONE_MATCH')
+    if header:
+        match = ETAG_SUFFIX.search(header)
+        if match:
+            request.environ[ETAG_ENCODING_KEY] = match.group(1)
+            request.environ['HTTP_IF_NONE_MATCH'] = ETAG_SUFFIX.sub('"', header)
+
+def _add_etag_suffix(response, encoding):
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f'{etag}-{encoding}', weak=weak)
+
+def init_compression(app):
+    """
+    Đăng ký nén response cho app (gọi một lần trong create_app)
+
+    Chỉ nén response có mimetype thuộc COMPRESS_MIMETYPES và body từ COMPRESS_MIN_SIZE byte
+    trở lên; response streaming luôn được nén từng phần vì không biết trước kích thước.
+    COMPRESS_ALGORITHMS rỗng để tắt.
+    """
+    config = app.config
+    encodings = [encoding for encoding in config.get('COMPRESS_ALGORITHMS', [])
+                 if encoding == 'gzip' or (encoding == 'br' and brotli is not None)]
+    if not encodings:
+        return
+
+    @app.before_request
+    def strip_etag_suffix():
+        _strip_etag_suffix()
+
+    @app.after_request
+    def compress_response(response):
+        if response.status_code == 304:
+            encoding = request.environ.get(ETAG_ENCODING_KEY)
+            if encoding:
+                _add_etag_suffix(response, encoding)
+            return response
+
+        if (response.status_code < 200 or response.status_code in (204, 206)
+                or response.direct_passthrough
+                or response.mimetype not in config['COMPRESS_MIMETYPES']
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        # Nội dung phụ thuộc Accept-Encoding kể cả khi lần này không nén
+        response.vary.add('Accept-Encoding')
+        encoding = _negotiate(encodings)
+        if not encoding:
+            return response
+
+        if response.is_streamed:
+            response.response = _compress_stream(encoding, response, config)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < config['COMPRESS_MIN_SIZE']:
+                return response
+            response.set_data(_compress(encoding, data, config))
+
+        response.headers['Content-Encoding'] = encoding
+        _add_etag_suffix(response, encoding)
+        return response
@@ -0,0 +1,56 @@
+"""
+Conditional GET - ETag/Last-Modified tính từ phiên bản dữ liệu, trả 304 trước khi truy vấn nặng
+"""
+import hashlib
+from flask import Response, request
+
+class Validators:
+    """
+    ETag và Last-Modified của một response, tính từ phiên bản các phạm vi dữ liệu
+
+    ETag là strong ETag, phụ thuộc đường dẫn + query string của request và phiên
+    bản (kèm thời điểm cập nhật) của từng phạm vi, nên không cần dựng payload.
+    """
+
+    def __init__(self, versions):
+        """
+        Args:
+            versions (dict): scope -> (version, updatedat) (updatedat None nếu chưa có)
+        """
+        digest = hashlib.sha1(request.full_path.encode('utf-8'))
+        for scope in sorted(versions):
+            version, updatedat = versions[scope]
+            digest.update(f"|{scope}:{version}:{updatedat.isoformat() if updatedat else ''}".encode('utf-8'))
+        self.etag = digest.hexdigest()[:32]
+        timestamps = [updatedat for _, updatedat in versions.values() if updatedat is not None]
+        # HTTP-date chỉ chính xác đến giây
+        self.last_modified = max(timestamps).replace(microsecond=0) if timestamps else None
+
+    def is_fresh(self):
+        """
+        Client đã có bản mới nhất hay chưa
+
+        If-None-Match được ưu tiên; chỉ xét If-Modified-Since khi không có If-None-Match.
+
+        Returns:
+            bool: True nếu có thể trả 304
+        """
+        if request.if_none_match:
+            return request.if_none_match.contains(self.etag)
+        if request.if_modified_since and self.last_modified:
+            return self.last_modified <= request.if_modified_since.replace(tzinfo=None)
+        return False
+
+    def _set_headers(self, response):
+        response.set_etag(self.etag)
+        if self.last_modified:
+            response.last_modified = self.last_modified
+        return response
+
+    def apply(self, response):
+        """Gắn ETag và Last-Modified vào response (chỉ response 200)"""
+        return self._set_headers(response) if response.status_code == 200 else response
+
+    def not_modified(self):
+        """Response 304 rỗng kèm validators"""
+        return self._set_headers(Response(status=304))
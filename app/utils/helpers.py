@@ -1,6 +1,7 @@
 """
 Helper functions
 """
+from datetime import date
 
 def classify_student(gpa):
     """
@@ -19,4 +20,39 @@ def classify_student(gpa):
     elif gpa >= 2.0:
         return 'CẦN CẢI THIỆN'
     else:
-        return 'NGUY HIỂM'
\ No newline at end of file
+        return 'NGUY HIỂM'
+
+# Bảng mã dùng chung cho đặc trưng ML (giá trị không có trong bảng được mã hóa thành mặc định)
+PRIORITY_CODES = {'LOW': 0, 'MEDIUM': 1, 'HIGH': 2}
+SEVERITY_CODES = {'LOW': 0, 'MEDIUM': 1, 'HIGH': 2}
+BLOOMLEVEL_CODES = {'Nhớ': 0, 'Hiểu': 1, 'Áp dụng': 2, 'Phân tích': 3, 'Đánh giá': 4, 'Sáng tạo': 5}
+DEFAULT_PRIORITY_CODE = 1
+DEFAULT_SEVERITY_CODE = 1
+DEFAULT_BLOOMLEVEL_CODE = 0
+
+def encode_priority(priority):
+    """Mã hóa priority"""
+    return PRIORITY_CODES.get(priority, DEFAULT_PRIORITY_CODE)
+
+def encode_severity(severity):
+    """Mã hóa severity"""
+    return SEVERITY_CODES.get(severity, DEFAULT_SEVERITY_CODE)
+
+def encode_bloomlevel(bloomlevel):
+    """Mã hóa bloom level"""
+    return BLOOMLEVEL_CODES.get(bloomlevel, DEFAULT_BLOOMLEVEL_CODE)
+
+def month_start(value=None, months_back=0):
+    """
+    Ngày đầu tháng, lùi lại months_back tháng
+
+    Args:
+        value (date): Ngày gốc (mặc định hôm nay)
+        months_back (int): Số tháng lùi lại (số âm để tiến lên)
+
+    Returns:
+        date: Ngày 1 của tháng tương ứng
+    """
+    value = value or date.today()
+    months = value.year * 12 + value.month - 1 - months_back
+    return date(months // 12, months % 12 + 1, 1)
\ No newline at end of file
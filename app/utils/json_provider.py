@@ -0,0 +1,91 @@
+"""
+JSON Provider - Serialize response JSON bằng orjson (nếu có), dự phòng json của thư viện chuẩn
+"""
+import decimal
+import logging
+from datetime import date, time
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson là tùy chọn, khi không có dùng json chuẩn
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+def _default(o):
+    """
+    Chuyển các kiểu json chuẩn không hỗ trợ
+
+    date/datetime/time thành chuỗi ISO 8601 (giống .isoformat()), Decimal thành chuỗi,
+    số/mảng numpy thành kiểu Python; các kiểu khác theo mặc định của Flask.
+    """
+    if isinstance(o, (date, time)):
+        return o.isoformat()
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if type(o).__module__ == 'numpy':
+        return o.tolist()
+    return DefaultJSONProvider.default(o)
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """JSON chuẩn, ngày tháng dạng ISO 8601, giữ nguyên ký tự tiếng Việt (không escape \\uXXXX)"""
+
+    default = staticmethod(_default)
+    ensure_ascii = False
+
+class OrjsonJSONProvider(StdlibJSONProvider):
+    """
+    orjson: date/datetime/numpy được encode trực tiếp trong C, response() ghi thẳng bytes
+
+    Kết quả tương đương StdlibJSONProvider (cùng thứ tự khóa, cùng định dạng ngày).
+    Lời gọi có tham số riêng của json chuẩn (indent, separators...) được chuyển về lớp cha.
+    """
+
+    def _option(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._option()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self._option(indent)),
+            mimetype=self.mimetype
+        )
+
+JSON_PROVIDERS = {
+    'stdlib': StdlibJSONProvider,
+    'orjson': OrjsonJSONProvider
+}
+
+def init_json_provider(app):
+    """
+    Chọn JSON provider theo JSON_BACKEND (gọi một lần trong create_app)
+
+    'auto' dùng orjson khi đã cài, ngược lại dùng json chuẩn.
+    """
+    backend = app.config.get('JSON_BACKEND', 'auto')
+    if backend == 'auto':
+        backend = 'orjson' if orjson is not None else 'stdlib'
+    elif backend == 'orjson' and orjson is None:
+        logger.warning("JSON_BACKEND=orjson nhưng chưa cài orjson, dùng json chuẩn")
+        backend = 'stdlib'
+    if backend not in JSON_PROVIDERS:
+        raise ValueError(f"JSON_BACKEND không hợp lệ: {backend}")
+    app.json = JSON_PROVIDERS[backend](app)
+    return app.json
@@ -0,0 +1,401 @@
+"""
+Metrics - Đo latency theo endpoint, truy vấn database, ML/LLM và xuất dạng text của Prometheus tại /metrics
+"""
+import glob
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import Response, current_app, has_app_context, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from flask_auth import ADMIN, require_role
+
+logger = logging.getLogger(__name__)
+
+# Trạng thái đo của request hiện tại (lưu trong environ vì app context có thể dùng chung giữa các request)
+REQUEST_STATE_KEY = 'app.metrics'
+# Nhãn endpoint cho truy vấn ngoài request (scheduler, CLI) và request không khớp route nào
+BACKGROUND_ENDPOINT = '<background>'
+UNMATCHED_ENDPOINT = '<unmatched>'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUERY_TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+ML_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+LLM_BUCKETS = (0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+class Metric:
+    """Một metric có nhãn; giá trị theo từng bộ giá trị nhãn, an toàn khi dùng nhiều thread"""
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def snapshot(self):
+        """Danh sách [giá trị nhãn, giá trị] (serialize được bằng JSON)"""
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(Metric):
+    """Histogram với bucket cố định; giá trị là [số đếm theo bucket (tích lũy), tổng, số lần]"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), [list(counts), total, count]] for key, (counts, total, count) in self._values.items()]
+
+class MetricsRegistry:
+    """Tập metric của process, cùng các hàm cập nhật giá trị ngay trước khi xuất"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+
+    def _register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector):
+        """Đăng ký hàm (không tham số) được gọi trước mỗi lần snapshot, ví dụ để chép thống kê của cache"""
+        self._collectors.append(collector)
+
+    def snapshot(self):
+        """Giá trị hiện tại của mọi metric: {name: [[nhãn, giá trị], ...]}"""
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"Không thể thu thập metrics: {str(e)}")
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def merge(self, snapshots):
+        """
+        Cộng snapshot của nhiều process (worker gunicorn)
+
+        Args:
+            snapshots (list): Danh sách (snapshot, còn sống); gauge của process đã dừng bị bỏ qua
+
+        Returns:
+            dict: {name: {tuple nhãn: giá trị}}
+        """
+        merged = {name: {} for name in self._metrics}
+        for snapshot, alive in snapshots:
+            for name, samples in snapshot.items():
+                metric = self._metrics.get(name)
+                if metric is None or (metric.kind == 'gauge' and not alive):
+                    continue
+                values = merged[name]
+                for labels, value in samples:
+                    key = tuple(labels)
+                    if metric.kind != 'histogram':
+                        values[key] = values.get(key, 0) + value
+                    elif key not in values:
+                        values[key] = [list(value[0]), value[1], value[2]]
+                    else:
+                        current = values[key]
+                        current[0] = [a + b for a, b in zip(current[0], value[0])]
+                        current[1] += value[1]
+                        current[2] += value[2]
+        return merged
+
+    def render(self, merged):
+        """Định dạng text exposition 0.0.4 của Prometheus"""
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for key, value in sorted(merged.get(name, {}).items()):
+                labels = list(zip(metric.labelnames, key))
+                if metric.kind != 'histogram':
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                    continue
+                counts, total, count = value
+                for bound, bucket_count in zip(metric.buckets, counts):
+                    lines.append(f"{name}_bucket{_format_labels(labels + [('le', _format_value(bound))])} {bucket_count}")
+                lines.append(f"{name}_bucket{_format_labels(labels + [('le', '+Inf')])} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return '\n'.join(lines) + '\n'
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+# Metrics dùng chung trong process
+REGISTRY = MetricsRegistry()
+HTTP_REQUESTS = REGISTRY.counter(
+    'http_requests_total', 'Số request đã xử lý', ('method', 'endpoint', 'status'))
+HTTP_LATENCY = REGISTRY.histogram(
+    'http_request_duration_seconds', 'Thời gian xử lý request (giây)', ('method', 'endpoint'))
+HTTP_IN_PROGRESS = REGISTRY.gauge(
+    'http_requests_in_progress', 'Số request đang xử lý', ('method', 'endpoint'))
+REQUEST_DB_QUERIES = REGISTRY.histogram(
+    'http_request_db_queries', 'Số truy vấn database mỗi request', ('endpoint',), QUERY_COUNT_BUCKETS)
+REQUEST_DB_TIME = REGISTRY.histogram(
+    'http_request_db_seconds', 'Tổng thời gian truy vấn database mỗi request (giây)', ('endpoint',), LATENCY_BUCKETS)
+DB_QUERY_TIME = REGISTRY.histogram(
+    'db_query_duration_seconds', 'Thời gian mỗi truy vấn database (giây)', ('endpoint',), QUERY_TIME_BUCKETS)
+ML_INFERENCE_TIME = REGISTRY.histogram(
+    'ml_inference_duration_seconds', 'Thời gian dự đoán của mô hình ML (giây)', ('operation',), ML_BUCKETS)
+LLM_REQUEST_TIME = REGISTRY.histogram(
+    'llm_request_duration_seconds', 'Thời gian gọi OpenAI (giây)', ('operation',), LLM_BUCKETS)
+LLM_ERRORS = REGISTRY.counter(
+    'llm_request_errors_total', 'Số lần gọi OpenAI bị lỗi', ('operation',))
+RESPONSE_CACHE_HITS = REGISTRY.counter('response_cache_hits_total', 'Số lần response cache hit')
+RESPONSE_CACHE_MISSES = REGISTRY.counter('response_cache_misses_total', 'Số lần response cache miss')
+RESPONSE_CACHE_BYTES = REGISTRY.gauge('response_cache_bytes', 'Tổng số byte đang lưu trong response cache')
+
+@contextmanager
+def timed(histogram, **labels):
+    """Đo thời gian khối lệnh vào histogram (kể cả khi khối lệnh ném exception)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, **labels)
+
+def _request_state():
+    try:
+        return request.environ.get(REQUEST_STATE_KEY)
+    except RuntimeError:
+        # Ngoài request context
+        return None
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('metrics_query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    state = _request_state()
+    if state is None:
+        DB_QUERY_TIME.observe(elapsed, endpoint=BACKGROUND_ENDPOINT)
+        return
+    state['queries'] += 1
+    state['db_time'] += elapsed
+    DB_QUERY_TIME.observe(elapsed, endpoint=state['endpoint'])
+
+def register_query_events():
+    """Đếm số truy vấn và thời gian truy vấn của mọi engine (đăng ký một lần cho process)"""
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+class MultiprocessStore:
+    """
+    Chia sẻ metrics giữa các worker qua file JSON trong METRICS_DIR
+
+    Mỗi process ghi snapshot của mình vào <pid>.json bằng một thread nền, mỗi
+    flush_interval giây nếu có request mới; /metrics cộng snapshot của mọi file.
+    Counter/histogram của worker đã dừng vẫn được cộng để tổng không bị giảm;
+    gauge chỉ lấy từ process còn sống.
+    """
+
+    def __init__(self, directory, flush_interval=5):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._dirty = threading.Event()
+        self._flusher_pid = None
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def mark_dirty(self):
+        """Báo có số liệu mới; thread ghi file được khởi động lười cho từng process (sau fork)"""
+        self._dirty.set()
+        if self._flusher_pid != os.getpid():
+            with self._lock:
+                if self._flusher_pid != os.getpid():
+                    self._flusher_pid = os.getpid()
+                    threading.Thread(target=self._run, name='metrics-flush', daemon=True).start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            if self._dirty.is_set():
+                self._dirty.clear()
+                try:
+                    self.flush()
+                except OSError as e:
+                    logger.warning(f"Không thể ghi metrics vào {self.directory}: {str(e)}")
+
+    def flush(self):
+        """Ghi snapshot của process hiện tại (ghi file tạm rồi đổi tên để không ai đọc file dở)"""
+        path = os.path.join(self.directory, f'{os.getpid()}.json')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(REGISTRY.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def collect(self):
+        """Snapshot của mọi process, kèm cờ process còn sống"""
+        self.flush()
+        snapshots = []
+        for path in glob.glob(os.path.join(self.directory, '*.json')):
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            snapshots.append((snapshot, _pid_alive(int(os.path.basename(path)[:-len('.json')]))))
+        return snapshots
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _collect_response_cache():
+    cache = current_app.extensions.get('response_cache') if has_app_context() else None
+    if cache is not None:
+        RESPONSE_CACHE_HITS.set(cache.hits)
+        RESPONSE_CACHE_MISSES.set(cache.misses)
+        RESPONSE_CACHE_BYTES.set(cache.size)
+
+REGISTRY.add_collector(_collect_response_cache)
+
+def require_metrics_token(token):
+    """Decorator chỉ cho request có header Authorization: Bearer <token> (so sánh thời gian hằng)"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+            if scheme.lower() != 'bearer' or not hmac.compare_digest(credentials.strip().encode('utf-8'),
+                                                                     token.encode('utf-8')):
+                logger.error("Unauthorized: Invalid metrics token")
+                response = jsonify({'error': 'Unauthorized: Invalid metrics token'})
+                response.status_code = 401
+                response.headers['WWW-Authenticate'] = 'Bearer'
+                return response
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+def init_metrics(app):
+    """
+    Đo mọi request của app và thêm endpoint METRICS_PATH (gọi một lần trong create_app)
+
+    Ghi nhận latency, status, số request đang xử lý, số truy vấn và thời gian database
+    theo endpoint (tên view, ví dụ dashboard.get_students). METRICS_ENABLED = False để tắt.
+    METRICS_PATH yêu cầu Authorization: Bearer METRICS_TOKEN (cho Prometheus); không đặt
+    METRICS_TOKEN thì chỉ admin gọi được.
+    """
+    if not app.config.get('METRICS_ENABLED', True):
+        return None
+
+    register_query_events()
+    store = None
+    if app.config.get('METRICS_DIR'):
+        store = MultiprocessStore(app.config['METRICS_DIR'], app.config.get('METRICS_FLUSH_INTERVAL', 5))
+    app.extensions['metrics'] = store
+
+    @app.before_request
+    def start_request_metrics():
+        endpoint = request.endpoint or UNMATCHED_ENDPOINT
+        request.environ[REQUEST_STATE_KEY] = {
+            'start': time.perf_counter(),
+            'endpoint': endpoint,
+            'status': None,
+            'queries': 0,
+            'db_time': 0.0
+        }
+        HTTP_IN_PROGRESS.inc(method=request.method, endpoint=endpoint)
+
+    @app.after_request
+    def record_status(response):
+        state = _request_state()
+        if state is not None:
+            state['status'] = response.status_code
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        # Chạy cả khi view ném exception; với response streaming, sau khi gửi xong body
+        state = request.environ.pop(REQUEST_STATE_KEY, None)
+        if state is None:
+            return
+        endpoint = state['endpoint']
+        status = state['status'] or 500
+        HTTP_IN_PROGRESS.dec(method=request.method, endpoint=endpoint)
+        HTTP_REQUESTS.inc(method=request.method, endpoint=endpoint, status=status)
+        HTTP_LATENCY.observe(time.perf_counter() - state['start'], method=request.method, endpoint=endpoint)
+        REQUEST_DB_QUERIES.observe(state['queries'], endpoint=endpoint)
+        REQUEST_DB_TIME.observe(state['db_time'], endpoint=endpoint)
+        if store is not None:
+            store.mark_dirty()
+
+    def metrics():
+        snapshots = store.collect() if store is not None else [(REGISTRY.snapshot(), True)]
+        return Response(REGISTRY.render(REGISTRY.merge(snapshots)),
+                        content_type='text/plain; version=0.0.4; charset=utf-8')
+
+    token = app.config.get('METRICS_TOKEN')
+    guard = require_metrics_token(token) if token else require_role(ADMIN)
+    app.add_url_rule(app.config.get('METRICS_PATH', '/metrics'), 'metrics', guard(metrics), methods=['GET'])
+
+    return store
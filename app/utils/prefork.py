@@ -0,0 +1,70 @@
+"""
+Prefork - Nạp sẵn mô hình và cache trong master trước khi fork worker (gunicorn preload_app)
+"""
+import gc
+import importlib
+import logging
+from datetime import datetime
+from app import db
+
+logger = logging.getLogger(__name__)
+
+# Module nặng chỉ cần import (không tạo object) để các worker dùng chung trang bộ nhớ
+PRELOAD_MODULES = ('sklearn.ensemble', 'openai')
+
+def warm_up(app):
+    """
+    Nạp mô hình ML, import module nặng và làm nóng cache dữ liệu tham chiếu
+
+    Gọi một lần khi nạp app (trong master nếu preload_app). Sau đó đóng mọi connection
+    database để worker không kế thừa socket của master, và gc.freeze() để bộ gom rác
+    của worker không duyệt (và ghi vào) các object đã nạp, giữ trang copy-on-write
+    được chia sẻ. Client OpenAI không được tạo ở đây vì connection pool không an toàn khi fork.
+
+    Args:
+        app: Flask application
+    """
+    start_time = datetime.now()
+    logger.info("Bắt đầu nạp sẵn trước khi fork")
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            logger.info(f"Bỏ qua module không có: {name}")
+
+    from app.services.container import get_services
+    from app.services.reference_data_service import ReferenceDataService
+    with app.app_context():
+        get_services().ml_service
+        try:
+            ReferenceDataService.get_courses()
+            ReferenceDataService.get_chapters()
+            ReferenceDataService.get_common_errors()
+        except Exception as e:
+            # Database chưa sẵn sàng không được làm hỏng khởi động, cache sẽ được nạp khi có request
+            logger.warning(f"Không thể làm nóng cache dữ liệu tham chiếu: {str(e)}")
+        finally:
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Hoàn thành nạp sẵn trong {datetime.now() - start_time}")
+
+def reinit_after_fork(app):
+    """
+    Khởi tạo lại tài nguyên không dùng chung được giữa các process (gọi trong post_fork)
+
+    - Connection pool: bỏ connection kế thừa mà không đóng socket của process cha
+    - Thread của scheduler không tồn tại sau fork nên được khởi động trong từng worker
+      (lock file đảm bảo mỗi lượt chỉ một worker chạy)
+
+    Args:
+        app: Flask application
+    """
+    from app.services.risk_sweep_service import start_risk_sweep_scheduler
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    start_risk_sweep_scheduler(app)
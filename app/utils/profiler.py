@@ -0,0 +1,262 @@
+"""
+Profiler - Profile theo yêu cầu một request (admin) bằng cách lấy mẫu stack của thread xử lý request
+"""
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from flask import Response, current_app, jsonify, request
+from flask_auth import get_current_user
+from app.utils.rate_limit import MemoryBackend, RateLimit
+
+logger = logging.getLogger(__name__)
+
+# Profiler của request hiện tại (lưu trong environ vì app context có thể dùng chung giữa các request)
+PROFILER_KEY = 'app.profiler'
+PROFILE_ID_RE = re.compile(r'^[0-9]{8}-[0-9]{6}-[0-9a-f]{8}$')
+TRUE_VALUES = ('1', 'true', 'yes')
+
+# Số profiler đang chạy và switch interval gốc của interpreter
+_switch_lock = threading.Lock()
+_active_profilers = 0
+_original_switch_interval = None
+
+def _lower_switch_interval(interval):
+    global _active_profilers, _original_switch_interval
+    with _switch_lock:
+        if _active_profilers == 0:
+            _original_switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(min(interval, _original_switch_interval))
+        _active_profilers += 1
+
+def _restore_switch_interval():
+    global _active_profilers
+    with _switch_lock:
+        _active_profilers -= 1
+        if _active_profilers == 0:
+            sys.setswitchinterval(_original_switch_interval)
+
+class SamplingProfiler:
+    """
+    Lấy mẫu stack của một thread mỗi interval giây từ một thread nền
+
+    Chi phí thấp và không đổi theo số lời gọi hàm (khác cProfile), nên dùng được
+    trên production. Thread lấy mẫu chỉ chạy được khi giành được GIL, nên trong lúc
+    profile, switch interval của interpreter được hạ xuống bằng interval (mặc định 5ms
+    thì request 10ms chỉ có 1-2 mẫu).
+    """
+
+    def __init__(self, thread_id, interval=0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_time = None
+        self._labels = {}
+
+    def start(self):
+        _lower_switch_interval(self.interval)
+        self._start_time = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._start_time
+        _restore_switch_interval()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += 1
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            if 'site-packages' + os.sep in filename:
+                filename = filename.split('site-packages' + os.sep, 1)[1]
+            elif filename.startswith(os.getcwd()):
+                filename = os.path.relpath(filename)
+            # Dấu ; là ký tự phân tách frame của định dạng collapsed
+            label = self._labels[code] = f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(';', ':')
+        return label
+
+    @property
+    def sample_count(self):
+        return sum(self.samples.values())
+
+    def collapsed(self):
+        """Định dạng collapsed stack ("a;b;c số_mẫu") cho flamegraph.pl, speedscope"""
+        return '\n'.join(f"{';'.join(stack)} {count}" for stack, count in self.samples.most_common()) + '\n'
+
+    def top_functions(self, limit=30):
+        """
+        Hàm tốn thời gian nhất theo số mẫu
+
+        Returns:
+            list: [{'function', 'self', 'total', 'self_pct', 'total_pct'}] - self là mẫu hàm đang chạy,
+                  total là mẫu hàm nằm trên stack (tính cả hàm con)
+        """
+        self_counts = Counter()
+        total_counts = Counter()
+        for stack, count in self.samples.items():
+            self_counts[stack[-1]] += count
+            for label in set(stack):
+                total_counts[label] += count
+        n = self.sample_count or 1
+        return [{
+            'function': label,
+            'self': self_counts[label],
+            'total': total,
+            'self_pct': round(self_counts[label] * 100 / n, 1),
+            'total_pct': round(total * 100 / n, 1)
+        } for label, total in sorted(total_counts.items(), key=lambda item: (-self_counts[item[0]], -item[1]))[:limit]]
+
+class ProfileStore:
+    """Lưu profile thành <id>.collapsed và <id>.json trong một thư mục, giữ tối đa keep profile mới nhất"""
+
+    def __init__(self, directory, keep=100):
+        self.directory = directory
+        self.keep = keep
+        os.makedirs(directory, exist_ok=True)
+
+    def save(self, profile_id, profiler, metadata):
+        with open(os.path.join(self.directory, f'{profile_id}.collapsed'), 'w') as f:
+            f.write(profiler.collapsed())
+        summary = dict(metadata, id=profile_id, samples=profiler.sample_count,
+                       duration=round(profiler.duration, 4), top=profiler.top_functions())
+        with open(os.path.join(self.directory, f'{profile_id}.json'), 'w') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        self._prune()
+        return summary
+
+    def path(self, profile_id, extension):
+        """Đường dẫn file của profile, hoặc None nếu id không hợp lệ hoặc không tồn tại"""
+        if not PROFILE_ID_RE.match(profile_id):
+            return None
+        path = os.path.join(self.directory, f'{profile_id}.{extension}')
+        return path if os.path.exists(path) else None
+
+    def _prune(self):
+        # id bắt đầu bằng thời điểm tạo nên sắp xếp theo tên là theo thời gian
+        profile_ids = sorted(name[:-len('.json')] for name in os.listdir(self.directory) if name.endswith('.json'))
+        for profile_id in profile_ids[:-self.keep]:
+            for extension in ('json', 'collapsed'):
+                try:
+                    os.remove(os.path.join(self.directory, f'{profile_id}.{extension}'))
+                except FileNotFoundError:
+                    pass
+
+def profile_requested():
+    """Request yêu cầu profile bằng header X-Profile: 1 hoặc ?profile=1"""
+    value = request.headers.get('X-Profile') or request.args.get('profile') or ''
+    return value.lower() in TRUE_VALUES
+
+def init_profiler(app):
+    """
+    Cho phép admin profile một request bằng X-Profile: 1 hoặc ?profile=1 (gọi một lần trong create_app)
+
+    Request của người không phải admin, hoặc vượt PROFILE_MAX_PER_HOUR trong process, được xử lý
+    bình thường (header X-Profile-Status cho biết lý do). Profile được lưu trong PROFILE_DIR và
+    đọc lại qua PROFILE_PATH/<id> (JSON top hàm) hoặc PROFILE_PATH/<id>?format=collapsed.
+    Với response streaming, profile chỉ gồm phần tạo response, không gồm phần gửi body.
+    PROFILING_ENABLED = False để tắt.
+    """
+    if not app.config.get('PROFILING_ENABLED', True):
+        return None
+
+    store = ProfileStore(app.config['PROFILE_DIR'], app.config.get('PROFILE_KEEP', 100))
+    # Token bucket trong process: tối đa PROFILE_MAX_PER_HOUR profile liên tiếp, nạp lại đều trong một giờ
+    profile_limit = RateLimit(app.config.get('PROFILE_MAX_PER_HOUR', 10), 3600)
+    limiter = MemoryBackend(max_keys=1)
+    interval = app.config.get('PROFILE_INTERVAL', 0.001)
+    app.extensions['profiler'] = store
+
+    def is_admin():
+        user = get_current_user()
+        return bool(user) and user.get('role') == 'admin'
+
+    @app.before_request
+    def start_profiler():
+        if not profile_requested():
+            return
+        if not is_admin():
+            request.environ[PROFILER_KEY] = 'forbidden'
+            return
+        allowed, _, _ = limiter.take('profile', profile_limit)
+        if not allowed:
+            logger.warning(f"Bỏ qua yêu cầu profile {request.path}: vượt giới hạn PROFILE_MAX_PER_HOUR")
+            request.environ[PROFILER_KEY] = 'rate-limited'
+            return
+        profiler = SamplingProfiler(threading.get_ident(), interval)
+        request.environ[PROFILER_KEY] = profiler
+        profiler.start()
+
+    @app.after_request
+    def save_profile(response):
+        profiler = request.environ.pop(PROFILER_KEY, None)
+        if profiler is None:
+            return response
+        if isinstance(profiler, str):
+            response.headers['X-Profile-Status'] = profiler
+            return response
+
+        profiler.stop()
+        profile_id = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+        try:
+            summary = store.save(profile_id, profiler, {
+                'method': request.method,
+                'path': request.full_path.rstrip('?'),
+                'endpoint': request.endpoint,
+                'status': response.status_code,
+                'createdat': datetime.now().isoformat(timespec='seconds')
+            })
+        except OSError as e:
+            logger.error(f"Không thể lưu profile {profile_id}: {str(e)}")
+            response.headers['X-Profile-Status'] = 'error'
+            return response
+
+        logger.info(f"Đã profile {request.method} {request.path}: {summary['samples']} mẫu trong "
+                    f"{summary['duration']}s, id {profile_id}")
+        response.headers['X-Profile-Status'] = 'ok'
+        response.headers['X-Profile-Id'] = profile_id
+        response.headers['X-Profile-Url'] = f"{current_app.config['PROFILE_PATH']}/{profile_id}"
+        return response
+
+    @app.teardown_request
+    def stop_orphan_profiler(exc):
+        # after_request không chạy (lỗi trong after_request khác): không để thread lấy mẫu chạy mãi
+        profiler = request.environ.pop(PROFILER_KEY, None)
+        if isinstance(profiler, SamplingProfiler):
+            profiler.stop()
+
+    @app.route(f"{app.config['PROFILE_PATH']}/<string:profile_id>", methods=['GET'])
+    def get_profile(profile_id):
+        if not is_admin():
+            return jsonify({'error': 'Chỉ admin được xem profile'}), 403
+        collapsed = request.args.get('format') == 'collapsed'
+        path = store.path(profile_id, 'collapsed' if collapsed else 'json')
+        if path is None:
+            return jsonify({'error': 'Không tìm thấy profile'}), 404
+        with open(path, encoding='utf-8') as f:
+            body = f.read()
+        if collapsed:
+            return Response(body, mimetype='text/plain')
+        return Response(body, mimetype='application/json')
+
+    return store
@@ -0,0 +1,141 @@
+"""
+Query Inspector - Ghi lại truy vấn theo request và phát hiện mẫu N+1 (dùng khi phát triển và test)
+"""
+import logging
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Recorder của request hiện tại (lưu trong environ vì app context có thể dùng chung giữa các request)
+RECORDER_KEY = 'app.query_recorder'
+
+# Chuẩn hóa câu SQL về "hình dạng": bỏ giá trị literal và độ dài danh sách tham số
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s|:\w+|\?")
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+_local = threading.local()
+
+def normalize_statement(statement):
+    """
+    Hình dạng của câu SQL: hai truy vấn chỉ khác tham số (kể cả số phần tử của IN) cho cùng kết quả
+
+    Args:
+        statement (str): Câu SQL đã compile
+
+    Returns:
+        str: Câu SQL với tham số, literal và danh sách tham số thay bằng ?
+    """
+    shape = _STRING_RE.sub('?', statement)
+    shape = _PARAM_RE.sub('?', shape)
+    shape = _NUMBER_RE.sub('?', shape)
+    shape = _SPACE_RE.sub(' ', shape).strip()
+    return _LIST_RE.sub('(?)', shape)
+
+class QueryRecorder:
+    """Danh sách câu SQL đã chạy trong một khối lệnh hoặc một request"""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def repeated(self, threshold):
+        """
+        Các hình dạng SQL chạy từ threshold lần trở lên (dấu hiệu N+1)
+
+        Returns:
+            list: [(hình dạng, số lần)] giảm dần theo số lần
+        """
+        shapes = Counter(normalize_statement(statement) for statement in self.statements)
+        return [(shape, n) for shape, n in shapes.most_common() if n >= threshold]
+
+    def report(self, threshold=2):
+        """Mô tả ngắn để in trong log hoặc thông báo lỗi của test"""
+        lines = [f"{self.count} truy vấn"]
+        lines.extend(f"  {n} lần: {shape}" for shape, n in self.repeated(threshold))
+        return '\n'.join(lines)
+
+def _active_recorders():
+    recorders = getattr(_local, 'recorders', None)
+    if recorders is None:
+        recorders = _local.recorders = []
+    return recorders
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    for recorder in _active_recorders():
+        recorder.statements.append(statement)
+
+def register_query_recorder_events():
+    """Chuyển mọi câu SQL của mọi engine tới các recorder đang hoạt động trong thread (một lần cho process)"""
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+
+@contextmanager
+def record_queries():
+    """
+    Ghi lại các câu SQL chạy trong khối lệnh (cùng thread)
+
+    Ví dụ:
+        with record_queries() as recorder:
+            client.get('/api/dashboard/students')
+        assert recorder.count <= 2
+    """
+    register_query_recorder_events()
+    recorder = QueryRecorder()
+    recorders = _active_recorders()
+    recorders.append(recorder)
+    try:
+        yield recorder
+    finally:
+        recorders.remove(recorder)
+
+def init_query_inspector(app):
+    """
+    Đếm truy vấn của mỗi request và cảnh báo N+1 (gọi một lần trong create_app)
+
+    Chỉ bật khi QUERY_INSPECTOR_ENABLED (mặc định trong development/testing). Response
+    có thêm header X-Query-Count; request có một câu SQL lặp từ QUERY_INSPECTOR_REPEAT_THRESHOLD
+    lần trở lên được ghi log warning kèm câu SQL đó.
+    """
+    if not app.config.get('QUERY_INSPECTOR_ENABLED'):
+        return
+
+    register_query_recorder_events()
+    threshold = app.config.get('QUERY_INSPECTOR_REPEAT_THRESHOLD', 5)
+
+    @app.before_request
+    def start_query_recorder():
+        recorder = QueryRecorder()
+        _active_recorders().append(recorder)
+        request.environ[RECORDER_KEY] = recorder
+
+    @app.after_request
+    def add_query_count_header(response):
+        recorder = request.environ.get(RECORDER_KEY)
+        if recorder is not None:
+            response.headers['X-Query-Count'] = str(recorder.count)
+        return response
+
+    @app.teardown_request
+    def check_query_recorder(exc):
+        recorder = request.environ.pop(RECORDER_KEY, None)
+        if recorder is None:
+            return
+        recorders = _active_recorders()
+        if recorder in recorders:
+            recorders.remove(recorder)
+        repeated = recorder.repeated(threshold)
+        if repeated:
+            logger.warning(f"Nghi N+1 tại {request.method} {request.path} ({request.endpoint}): "
+                           f"{recorder.report(threshold)}")
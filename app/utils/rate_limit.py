@@ -0,0 +1,265 @@
+"""
+Rate limit - Token bucket theo người dùng và endpoint cho các endpoint tốn kém (ML, LLM)
+
+Backend:
+    memory: bucket trong process (mặc định, mỗi worker một bản)
+    redis:  bucket dùng chung giữa các worker, cập nhật nguyên tử bằng script Lua (cần gói redis)
+
+Mỗi bucket chứa tối đa capacity token và được nạp lại đều capacity token mỗi period giây;
+mỗi request lấy một token, hết token thì trả 429 với header Retry-After.
+"""
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from flask import current_app, jsonify, request
+from flask_auth import access_denied, get_current_user
+from app.utils.metrics import REGISTRY
+
+try:
+    import redis
+except ImportError:  # Chỉ cần khi RATE_LIMIT_BACKEND = 'redis'
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Quyết định của request hiện tại (lưu trong environ để after_request thêm header)
+DECISION_KEY = 'app.rate_limit'
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+LIMIT_RE = re.compile(r'^\s*(\d+)\s*/\s*(\d*)\s*(second|minute|hour|day)s?\s*$')
+
+RATE_LIMITED = REGISTRY.counter(
+    'rate_limited_requests_total', 'Số request bị từ chối do vượt rate limit', ('endpoint', 'role'))
+
+Decision = namedtuple('Decision', ['allowed', 'limit', 'remaining', 'retry_after'])
+
+class RateLimit(namedtuple('RateLimit', ['capacity', 'period'])):
+    """Ngân sách capacity request mỗi period giây (cũng là số request tối đa liên tiếp)"""
+
+    @classmethod
+    def parse(cls, value):
+        """
+        Đọc ngân sách dạng '5/minute', '100/hour', '10/30second'
+
+        Raises:
+            ValueError: Nếu chuỗi không đúng định dạng
+        """
+        match = LIMIT_RE.match(value)
+        if not match or int(match.group(1)) <= 0:
+            raise ValueError(f"Rate limit không hợp lệ: {value!r} (ví dụ '5/minute')")
+        return cls(int(match.group(1)), int(match.group(2) or 1) * PERIODS[match.group(3)])
+
+    @property
+    def rate(self):
+        """Số token nạp lại mỗi giây"""
+        return self.capacity / self.period
+
+    def __str__(self):
+        return f"{self.capacity}/{self.period}s"
+
+class MemoryBackend:
+    """Bucket trong dict của process, giới hạn số khóa (bỏ bucket ít dùng nhất khi đầy)"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, limit, cost=1):
+        """
+        Lấy cost token từ bucket key
+
+        Returns:
+            tuple: (được phép, số token còn lại, số giây chờ đến khi đủ token)
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (limit.capacity, now))
+            tokens = min(limit.capacity, tokens + (now - updated) * limit.rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, tokens, 0.0 if allowed else (cost - tokens) / limit.rate
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+# KEYS[1] = khóa bucket; ARGV = capacity, rate (token/giây), cost. Dùng đồng hồ của server Redis
+# để mọi worker cùng một mốc thời gian; khóa tự hết hạn khi bucket đã nạp đầy.
+TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+class RedisBackend:
+    """Bucket trong Redis dùng chung giữa các worker"""
+
+    def __init__(self, url):
+        if redis is None:
+            raise RuntimeError("Chưa cài gói redis (pip install redis)")
+        self.client = redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0)
+        self._take = self.client.register_script(TAKE_SCRIPT)
+
+    def take(self, key, limit, cost=1):
+        allowed, tokens, retry_after = self._take(keys=[key], args=[limit.capacity, limit.rate, cost])
+        return bool(allowed), float(tokens), float(retry_after)
+
+    def clear(self):
+        """Không xóa database Redis dùng chung; bucket tự hết hạn khi nạp đầy"""
+
+class RateLimiter:
+    """
+    Token bucket theo (endpoint, người dùng), ngân sách theo vai trò
+
+    Lỗi của backend (ví dụ Redis mất kết nối) không chặn request: request được cho qua.
+    """
+
+    def __init__(self, backend, limits, prefix='lms'):
+        """
+        Args:
+            backend: MemoryBackend hoặc RedisBackend
+            limits (dict): endpoint -> {vai trò: '5/minute'}; vai trò 'default' dùng cho vai trò
+                           không liệt kê, không có thì vai trò đó không bị giới hạn
+            prefix (str): Tiền tố khóa (dùng chung CACHE_KEY_PREFIX)
+        """
+        self.backend = backend
+        self.prefix = prefix
+        self.limits = {endpoint: {role: RateLimit.parse(value) for role, value in budgets.items()}
+                       for endpoint, budgets in limits.items()}
+
+    def limit_for(self, endpoint, role):
+        budgets = self.limits.get(endpoint)
+        if not budgets:
+            return None
+        return budgets.get(role) or budgets.get('default')
+
+    def check(self, endpoint, user, cost=1):
+        """
+        Lấy một lượt của user cho endpoint
+
+        Returns:
+            Decision: Hoặc None nếu endpoint/vai trò không bị giới hạn
+        """
+        role = user.get('role')
+        limit = self.limit_for(endpoint, role)
+        if limit is None:
+            return None
+        key = f"{self.prefix}:ratelimit:{endpoint}:{role}:{user_identity(user)}"
+        try:
+            allowed, tokens, retry_after = self.backend.take(key, limit, cost)
+        except Exception as e:
+            logger.warning(f"Không kiểm tra được rate limit {endpoint}: {str(e)}")
+            return None
+        return Decision(allowed, limit.capacity, int(tokens), retry_after)
+
+    def clear(self):
+        """Xóa các bucket trong process"""
+        self.backend.clear()
+
+def user_identity(user):
+    """
+    Định danh người dùng để đếm lượt: id trong token/header, sinh viên theo studentId;
+    không có id nào (ví dụ x-user của admin) thì theo địa chỉ IP (sau reverse proxy cần
+    PROXY_FIX_X_FOR để đây là IP của client thay vì của proxy)
+    """
+    for field in ('sub', 'userId', 'studentId', 'email'):
+        if user.get(field):
+            return f"{field}:{user[field]}"
+    return f"ip:{request.remote_addr}"
+
+def create_rate_limit_backend(config):
+    """
+    Tạo backend theo RATE_LIMIT_BACKEND ('memory' hoặc 'redis', RATE_LIMIT_REDIS_URL)
+
+    Backend redis không khởi tạo hoặc không kết nối được thì dùng memory (giới hạn tính riêng từng worker).
+    """
+    if config.get('RATE_LIMIT_BACKEND', 'memory') == 'redis':
+        try:
+            backend = RedisBackend(config['RATE_LIMIT_REDIS_URL'])
+            backend.client.ping()
+            return backend
+        except Exception as e:
+            logger.warning(f"Không dùng được Redis cho rate limit, chuyển sang memory: {str(e)}")
+    return MemoryBackend(config.get('RATE_LIMIT_MAX_KEYS', 100000))
+
+def init_rate_limiter(app):
+    """
+    Giới hạn tần suất gọi các endpoint trong RATE_LIMITS theo người dùng (gọi một lần trong create_app)
+
+    Request vượt ngân sách nhận 429 với Retry-After (giây); request được phép trên endpoint bị giới hạn
+    có X-RateLimit-Limit và X-RateLimit-Remaining. Request mà route sẽ từ chối (chưa xác thực, sai vai trò,
+    sinh viên xem dữ liệu người khác) không bị đếm. RATE_LIMIT_ENABLED = False để tắt.
+    """
+    if not app.config.get('RATE_LIMIT_ENABLED', True):
+        return None
+
+    limiter = RateLimiter(create_rate_limit_backend(app.config), app.config.get('RATE_LIMITS', {}),
+                          app.config.get('CACHE_KEY_PREFIX', 'lms'))
+    app.extensions['rate_limiter'] = limiter
+    workers = app.config.get('WORKERS', 1)
+    if isinstance(limiter.backend, MemoryBackend) and workers > 1:
+        logger.warning(f"Rate limit dùng backend memory với {workers} worker: mỗi người dùng được tới "
+                       f"{workers} lần ngân sách, cần Redis (RATE_LIMIT_BACKEND=redis, RATE_LIMIT_REDIS_URL) để dùng chung")
+
+    @app.before_request
+    def enforce_rate_limit():
+        if request.endpoint not in limiter.limits or request.method == 'OPTIONS':
+            return None
+        user = get_current_user()
+        if not user or access_denied(app.view_functions.get(request.endpoint), user, request.view_args):
+            return None
+        decision = limiter.check(request.endpoint, user)
+        if decision is None:
+            return None
+        request.environ[DECISION_KEY] = decision
+        if decision.allowed:
+            return None
+
+        retry_after = max(1, math.ceil(decision.retry_after))
+        role = user.get('role')
+        RATE_LIMITED.inc(endpoint=request.endpoint, role=role)
+        logger.warning(f"Rate limit {request.endpoint} cho {role} {user_identity(user)}: thử lại sau {retry_after}s")
+        response = jsonify({'error': f'Quá nhiều yêu cầu, vui lòng thử lại sau {retry_after} giây',
+                            'retry_after': retry_after})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(retry_after)
+        return response
+
+    @app.after_request
+    def add_rate_limit_headers(response):
+        decision = request.environ.pop(DECISION_KEY, None)
+        if decision is not None:
+            response.headers['X-RateLimit-Limit'] = str(decision.limit)
+            response.headers['X-RateLimit-Remaining'] = str(decision.remaining)
+        return response
+
+    return limiter
+
+def get_rate_limiter():
+    """Rate limiter của app hiện tại (None nếu tắt)"""
+    return current_app.extensions.get('rate_limiter')
@@ -0,0 +1,119 @@
+"""
+Response Cache - Cache bytes JSON đã serialize của các endpoint GET tốn kém
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, current_app, request
+from flask_auth import get_current_user
+from app.utils.conditional import Validators
+
+logger = logging.getLogger(__name__)
+
+# Header được lưu cùng body để dựng lại response khi hit
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+class ResponseCache:
+    """
+    Cache LRU trong process, giới hạn theo tổng số byte của body
+
+    Mỗi entry mang dấu phiên bản dữ liệu (stamp); khi đọc với stamp khác,
+    entry bị bỏ ngay thay vì chờ bị đẩy ra khỏi LRU.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        # Một entry không được chiếm quá 1/4 dung lượng để không đẩy hết các entry khác
+        self.max_entry_bytes = max_bytes // 4
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, stamp):
+        """
+        Lấy entry còn hạn và cùng phiên bản dữ liệu
+
+        Returns:
+            tuple: (body, headers) hoặc None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, entry_stamp, body, headers = entry
+                if expires_at > time.monotonic() and entry_stamp == stamp:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return body, headers
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def set(self, key, stamp, body, headers, ttl):
+        """Lưu body (bytes) kèm header, đẩy các entry ít dùng nhất khi vượt max_bytes"""
+        if len(body) > self.max_entry_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, stamp, body, headers)
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        """Xóa toàn bộ"""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _remove(self, key):
+        self.size -= len(self._entries.pop(key)[2])
+
+def init_response_cache(app):
+    """Khởi tạo response cache cho app (gọi một lần trong create_app)"""
+    app.extensions['response_cache'] = ResponseCache(app.config.get('RESPONSE_CACHE_MAX_BYTES', 0))
+    return app.extensions['response_cache']
+
+def cached_response(stamp):
+    """
+    Decorator cache bytes của response 200 theo đường dẫn, query string và người dùng
+
+    Khóa gồm role và studentId của người dùng, nên một entry chỉ được trả lại
+    cho đúng người đã nhận response 200 đó (route vẫn tự kiểm tra quyền khi miss).
+    TTL lấy từ RESPONSE_CACHE_TTLS theo tên endpoint (0 hoặc không có = tắt).
+
+    Args:
+        stamp (callable): Nhận các tham số của route, trả về dict scope -> (version, updatedat)
+                          (xem DataVersionService.get_versions)
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = current_app.extensions.get('response_cache')
+            ttl = current_app.config.get('RESPONSE_CACHE_TTLS', {}).get(request.endpoint, 0)
+            user = get_current_user()
+            if not cache or not cache.max_bytes or not ttl or not user:
+                return view(*args, **kwargs)
+
+            versions = stamp(*args, **kwargs)
+            version_stamp = tuple(sorted(versions.items()))
+            key = (request.full_path, user.get('role'), user.get('studentId'))
+            cached = cache.get(key, version_stamp)
+            if cached is not None:
+                body, headers = cached
+                return Response(body, status=200, headers=headers).make_conditional(request)
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed or not response.is_json:
+                return response
+            if not response.get_etag()[0]:
+                Validators(versions).apply(response)
+            cache.set(key, version_stamp, response.get_data(),
+                      [(name, response.headers[name]) for name in STORED_HEADERS if name in response.headers], ttl)
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
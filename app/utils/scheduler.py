@@ -0,0 +1,76 @@
+"""
+Scheduler - Chạy job định kỳ trong process bằng thread nền
+"""
+import logging
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows không có fcntl
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+def _try_lock(lock_path):
+    """
+    Giữ lock file không chặn
+
+    Returns:
+        file: File đang giữ lock, hoặc None nếu process khác đang giữ
+    """
+    lock_file = open(lock_path, 'a')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+def _release(lock_file):
+    """Nhả lock file"""
+    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    lock_file.close()
+
+def start_periodic_job(app, name, interval_seconds, job, lock_path=None):
+    """
+    Chạy job mỗi interval_seconds giây trong một daemon thread
+
+    Job chạy trong app context. Khi có lock_path, mỗi lượt chỉ process giữ được
+    lock file mới chạy, nên nhiều worker (gunicorn, reloader) không chạy trùng.
+
+    Args:
+        app: Flask application
+        name (str): Tên job (dùng cho log và tên thread)
+        interval_seconds (float): Khoảng cách giữa hai lượt chạy
+        job (callable): Hàm không tham số
+        lock_path (str): Đường dẫn lock file (tùy chọn)
+
+    Returns:
+        threading.Thread: Thread đã khởi động (thuộc tính stop_event để dừng)
+    """
+    if lock_path and fcntl is None:
+        logger.warning(f"Không hỗ trợ lock file trên hệ điều hành này, job {name} có thể chạy trùng")
+        lock_path = None
+
+    stop_event = threading.Event()
+
+    def run():
+        while not stop_event.wait(interval_seconds):
+            lock_file = _try_lock(lock_path) if lock_path else None
+            if lock_path and lock_file is None:
+                logger.info(f"Bỏ qua lượt chạy {name}: process khác đang giữ lock")
+                continue
+            try:
+                with app.app_context():
+                    job()
+            except Exception as e:
+                logger.error(f"Lỗi khi chạy job {name}: {str(e)}")
+            finally:
+                if lock_file is not None:
+                    _release(lock_file)
+
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.stop_event = stop_event
+    thread.start()
+    logger.info(f"Đã khởi động job {name} mỗi {interval_seconds}s")
+    return thread
@@ -0,0 +1,57 @@
+"""
+Streaming helpers - Trả JSON array theo từng phần cho các endpoint xuất toàn bộ dữ liệu
+"""
+import logging
+from flask import Response, current_app, request, stream_with_context
+from app import db
+
+logger = logging.getLogger(__name__)
+
+def wants_stream():
+    """
+    Kiểm tra request có yêu cầu chế độ streaming (?stream=1) hay không
+
+    Returns:
+        bool: True nếu client yêu cầu streaming
+    """
+    return request.args.get('stream', '').lower() in ('1', 'true', 'yes')
+
+def stream_json_array(statement, serialize, chunk_size=None):
+    """
+    Trả về JSON array được sinh dần từ server-side cursor
+
+    Mỗi lần chỉ giữ một khối `chunk_size` dòng trong bộ nhớ, nên RSS của worker
+    không phụ thuộc vào số dòng của bảng.
+
+    Args:
+        statement: Câu lệnh select() chỉ lấy các cột cần thiết
+        serialize (callable): Hàm chuyển một row thành dict
+        chunk_size (int): Số dòng mỗi lần fetch (mặc định STREAM_CHUNK_SIZE)
+
+    Returns:
+        Response: Flask response dạng generator
+    """
+    chunk_size = chunk_size or current_app.config.get('STREAM_CHUNK_SIZE', 1000)
+    dumps = current_app.json.dumps
+
+    def generate():
+        result = db.session.execute(
+            statement.execution_options(stream_results=True, yield_per=chunk_size)
+        )
+        try:
+            yield '['
+            separator = ''
+            for rows in result.partitions():
+                chunk = ','.join(dumps(serialize(row)) for row in rows)
+                if chunk:
+                    yield separator + chunk
+                    separator = ','
+            yield ']'
+        except Exception as e:
+            # Header đã gửi đi nên không thể đổi status code, chỉ ghi log
+            logger.error(f"Lỗi khi stream dữ liệu: {str(e)}")
+            raise
+        finally:
+            result.close()
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
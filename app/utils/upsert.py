@@ -0,0 +1,34 @@
+"""
+Upsert theo dialect - INSERT ... ON CONFLICT DO UPDATE (PostgreSQL, SQLite)
+"""
+from sqlalchemy.dialects import postgresql, sqlite
+
+INSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+def upsert(connection, table, values, index_elements, update=None):
+    """
+    Thêm một dòng, hoặc cập nhật dòng đã có cùng khóa trong cùng một câu lệnh
+
+    Khác với UPDATE rồi INSERT khi rowcount == 0, hai transaction đồng thời cùng tạo một
+    dòng không gặp IntegrityError (làm rollback cả thay đổi của người dùng).
+
+    Args:
+        connection: Connection đang dùng
+        table (Table): Bảng cần ghi
+        values (dict): Giá trị của dòng mới
+        index_elements (list): Tên các cột khóa chính/unique xác định dòng trùng
+        update (dict): Giá trị gán khi đã có dòng (có thể là biểu thức theo cột của bảng);
+                       mặc định là values trừ các cột khóa
+
+    Returns:
+        CursorResult: Kết quả câu lệnh
+    """
+    dialect = connection.dialect.name
+    if dialect not in INSERTS:
+        raise RuntimeError(f"Upsert chưa hỗ trợ dialect {dialect}")
+    if update is None:
+        update = {name: value for name, value in values.items() if name not in index_elements}
+    statement = INSERTS[dialect](table).values(**values).on_conflict_do_update(
+        index_elements=index_elements, set_=update
+    )
+    return connection.execute(statement)
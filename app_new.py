@@ -3,10 +3,14 @@ Main application file - Rút gọn sau khi chia tách
 """
 import os
 from app import create_app, db
+from app.services.risk_sweep_service import start_risk_sweep_scheduler
 
 # Tạo Flask app
 app = create_app(os.getenv('FLASK_ENV', 'default'))
 
+# Job quét nguy cơ định kỳ (chỉ chạy khi RISK_SWEEP_INTERVAL_MINUTES > 0)
+start_risk_sweep_scheduler(app)
+
 if __name__ == '__main__':
     with app.app_context():
         # Tạo các bảng database nếu chưa tồn tại
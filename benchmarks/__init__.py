@@ -0,0 +1,3 @@
+"""
+Benchmarks package - Các script đo hiệu năng (chạy bằng python -m benchmarks.<tên>)
+"""
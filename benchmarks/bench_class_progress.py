@@ -0,0 +1,75 @@
+"""
+Benchmark: /class-progress với cách tính cũ (Python, O(n²)) và CourseService (SQL aggregate)
+
+Chạy: python -m benchmarks.bench_class_progress [--sizes 1000 2000 5000] [--repeat 3]
+
+Thời gian mỗi sinh viên của đường mới phải gần như không đổi khi sĩ số tăng.
+"""
+import argparse
+import time
+from app import create_app, db
+from app.models import Student, Progress
+from app.services.course_service import CourseService
+from app.utils import classify_student
+from benchmarks.seed import reset_database, seed_courses, seed_students, seed_progress
+
+COURSE_ID = 1
+
+def legacy_path(courseid):
+    """Cách tính cũ: load toàn bộ rồi tính trong Python"""
+    students = Student.query.select_from(Student).join(
+        Progress, Progress.studentid == Student.studentid
+    ).filter(Progress.courseid == courseid).all()
+    total_students = len(students)
+    progress_data = Progress.query.filter_by(courseid=courseid).all()
+    total_completion = sum(p.completionrate for p in progress_data) / total_students
+    avg_gpa = sum(s.totalgpa for s in students) / total_students
+    active_students = sum(1 for p in progress_data if p.completionrate == 100)
+    students_list = [{
+        'studentid': s.studentid,
+        'name': s.name,
+        'totalgpa': s.totalgpa,
+        'class': s.class_,
+        'progress': next((p.progressrate for p in progress_data if p.studentid == s.studentid), 0),
+        'status': classify_student(s.totalgpa)
+    } for s in students]
+    return total_completion, avg_gpa, active_students, students_list
+
+def aggregate_path(courseid):
+    """Cách tính mới: SQL aggregate + JOIN"""
+    aggregates = CourseService.get_class_aggregates(courseid)
+    students_list = CourseService.get_class_students(courseid)
+    return aggregates, students_list
+
+def measure(fn, repeat):
+    """Trả về thời gian tốt nhất (giây) sau `repeat` lần chạy"""
+    best = None
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        fn(COURSE_ID)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 2000, 5000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--skip-legacy', action='store_true', help='Bỏ qua đường cũ (chậm với sĩ số lớn)')
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    with app.app_context():
+        print(f"{'students':>8} {'legacy (ms)':>12} {'legacy µs/sv':>13} {'sql (ms)':>10} {'sql µs/sv':>10}")
+        for size in args.sizes:
+            reset_database()
+            seed_courses(1)
+            seed_progress(seed_students(size), COURSE_ID)
+            legacy = None if args.skip_legacy else measure(legacy_path, args.repeat)
+            new = measure(aggregate_path, args.repeat)
+            legacy_cols = f"{'-':>12} {'-':>13}" if legacy is None else f"{legacy * 1e3:>12.1f} {legacy / size * 1e6:>13.1f}"
+            print(f"{size:>8} {legacy_cols} {new * 1e3:>10.1f} {new / size * 1e6:>10.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Microbenchmark các hàm CPU thuần chạy trong mỗi request (cần pytest-benchmark)
+
+Chạy và lưu kết quả vào lịch sử (.benchmarks/), so với lần lưu gần nhất và thất bại
+khi chậm đi quá 20% (so theo min vì ít bị nhiễu bởi tiến trình khác hơn median):
+    pip install pytest-benchmark
+    python -m pytest benchmarks/bench_hot_functions.py --benchmark-autosave \\
+        --benchmark-compare --benchmark-compare-fail=min:20%
+Xem lịch sử: pytest-benchmark list; so sánh hai lần lưu: pytest-benchmark compare 0001 0002
+
+File không khớp mẫu test_*.py nên không chạy cùng `python -m pytest` thông thường.
+"""
+import os
+import random
+from types import SimpleNamespace
+import numpy as np
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from app.services.llm_service import LLMService
+from app.services.ml_service import MLService
+from app.services.student_service import StudentService
+from app.services.warning_service import WarningService
+from app.utils import classify_student
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(ROOT, 'rf_model.pkl')
+BATCH_SIZE = 1000
+
+# Chạy nóng trước khi đo để vòng đầu (cache, import lười) không lệch kết quả
+pytestmark = pytest.mark.benchmark(warmup=True, warmup_iterations=10)
+
+# (gpa, progressrate, bloomscore, count_errors, priority, severity, bloomlevel, risk): tốt, nguy cơ, trung bình, mô hình báo nguy cơ
+PROFILES = [
+    (3.8, 92.0, 8.5, 2, 0, 0, 4, 0),
+    (1.6, 35.0, 3.0, 25, 2, 2, 0, 1),
+    (2.6, 60.0, 5.5, 12, 1, 1, 2, 0),
+    (3.2, 45.0, 6.0, 8, 2, 1, 3, 1)
+]
+
+@pytest.fixture(scope='module')
+def ml_service():
+    if not os.path.exists(MODEL_PATH):
+        pytest.skip(f"Không có mô hình tại {MODEL_PATH}")
+    return MLService(model_path=MODEL_PATH)
+
+@pytest.fixture(scope='module')
+def warning_service(ml_service):
+    return WarningService(ml_service=ml_service)
+
+@pytest.fixture(scope='module')
+def llm_service():
+    # Chỉ dùng phần phân tích markdown, không gọi OpenAI
+    return LLMService(client=object())
+
+def long_recommendation(n_errors=30):
+    """Markdown theo định dạng prompt yêu cầu, với n_errors lỗi và ví dụ code"""
+    sections = []
+    for i in range(1, n_errors + 1):
+        sections.append(f"""## Lỗi {i}: Lỗi con trỏ số {i}
+### 1. Phân tích lỗi
+- Mô tả: Truy cập vùng nhớ đã giải phóng ở vòng lặp thứ {i}.
+- Nguyên nhân: Không gán NULL sau khi free.
+- Ví dụ minh họa:
+```c
+int *p = malloc(sizeof(int) * {i});
+free(p);
+p[0] = {i};
+```
+### 2. Đề xuất cải thiện
+- Gán p = NULL sau free và kiểm tra trước khi dùng.
+- Ví dụ sửa lỗi:
+```c
+free(p);
+p = NULL;
+```
+""")
+    return '\n'.join(sections)
+
+def submission_assignments(n_students=2000, n_assignments=10):
+    """Bài tập với danh sách tên sinh viên đã nộp dài (như cột studentssubmitted)"""
+    rng = random.Random(42)
+    names = [f'Sinh viên SV{i:07d}' for i in range(n_students)]
+    return names, [SimpleNamespace(studentssubmitted=', '.join(name for name in names if rng.random() < 0.7))
+                   for _ in range(n_assignments)]
+
+@pytest.fixture(scope='module')
+def students():
+    """BATCH_SIZE sinh viên xoay vòng qua PROFILES, như một lần quét nguy cơ"""
+    batch = []
+    for i in range(BATCH_SIZE):
+        gpa, *features = PROFILES[i % len(PROFILES)]
+        batch.append((SimpleNamespace(studentid=f'SV{i:07d}', name=f'Sinh viên SV{i:07d}', totalgpa=gpa), features))
+    return batch
+
+def test_generate_warning_message(benchmark, warning_service, students):
+    messages = benchmark(lambda: [warning_service.generate_warning_message(student, *features)
+                                  for student, features in students])
+    assert all(messages)
+
+def test_generate_learning_path(benchmark, warning_service, students):
+    paths = benchmark(lambda: [warning_service.generate_learning_path(student, *features)
+                               for student, features in students])
+    assert all(paths)
+
+def test_parse_intervention_suggestions(benchmark, llm_service):
+    recommendation = long_recommendation()
+    errors = [f'Lỗi con trỏ số {i}' for i in range(30)]
+    suggestions = benchmark(llm_service.parse_intervention_suggestions, recommendation, 'SV0000001', errors)
+    assert len(suggestions) == 30
+
+def test_predict_risk_single(benchmark, ml_service):
+    result = benchmark(ml_service.predict_risk, 2.5, 60.0, 5.5, 12, 1, 1, 2)
+    assert result in (0, 1)
+
+def test_predict_risk_batch(benchmark, ml_service):
+    rng = np.random.default_rng(42)
+    features = np.column_stack([
+        rng.uniform(1, 4, BATCH_SIZE), rng.uniform(0, 100, BATCH_SIZE), rng.uniform(0, 10, BATCH_SIZE),
+        rng.integers(0, 30, BATCH_SIZE), rng.integers(0, 3, BATCH_SIZE), rng.integers(0, 3, BATCH_SIZE),
+        rng.integers(0, 6, BATCH_SIZE)
+    ])
+    assert len(benchmark(ml_service.predict_risk_batch, features)) == BATCH_SIZE
+
+def test_count_student_submissions(benchmark):
+    names, assignments = submission_assignments()
+    # Sinh viên cuối danh sách: trường hợp xấu nhất của tìm kiếm tuyến tính
+    assert benchmark(StudentService.count_student_submissions, names[-1], assignments) >= 0
+
+def test_classify_student(benchmark):
+    gpas = [round(random.Random(42).uniform(0, 4), 2) for _ in range(1000)]
+    result = benchmark(lambda: [classify_student(gpa) for gpa in gpas])
+    assert len(result) == len(gpas)
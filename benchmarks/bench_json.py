@@ -0,0 +1,91 @@
+"""
+Benchmark: serialize các payload dashboard lớn nhất bằng json chuẩn và orjson
+
+Chạy: python -m benchmarks.bench_json [--size 50000] [--repeat 5]
+
+- legacy: .isoformat() từng trường ngày rồi json chuẩn của Flask (cách cũ)
+- stdlib: StdlibJSONProvider, ngày tháng được encode trong hook default
+- orjson: OrjsonJSONProvider (bỏ qua nếu chưa cài orjson)
+"""
+import argparse
+import time
+from flask.json.provider import DefaultJSONProvider
+from app import create_app, db
+from app.models import Progress
+from app.routes.dashboard_complete import serialize_progress
+from app.services.course_service import CourseService
+from app.services.read_model_service import ReadModelService
+from app.utils.json_provider import StdlibJSONProvider, OrjsonJSONProvider, orjson
+from benchmarks.seed import reset_database, seed_courses, seed_students, seed_progress
+
+COURSE_ID = 1
+
+def progress_payload():
+    """GET /progress"""
+    return [serialize_progress(p) for p in db.session.execute(db.select(Progress)).scalars()]
+
+def students_payload():
+    """GET /students"""
+    return ReadModelService.get_student_summaries()
+
+def class_progress_payload():
+    """Danh sách sinh viên của GET /class-progress/<courseid>"""
+    return CourseService.get_class_students(COURSE_ID)
+
+PAYLOADS = {
+    'progress': progress_payload,
+    'students': students_payload,
+    'class-progress': class_progress_payload
+}
+
+def legacy_convert(payload):
+    """Chuyển ngày tháng sang chuỗi từng trường như các to_dict() cũ"""
+    return [{key: value.isoformat() if hasattr(value, 'isoformat') else value
+             for key, value in row.items()} for row in payload]
+
+def measure(fn, repeat):
+    """Trả về thời gian tốt nhất (giây) và số byte sau `repeat` lần chạy"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(body)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    legacy = DefaultJSONProvider(app)
+    providers = [('stdlib', StdlibJSONProvider(app))]
+    if orjson is not None:
+        providers.append(('orjson', OrjsonJSONProvider(app)))
+    else:
+        print("orjson chưa được cài, chỉ so sánh json chuẩn")
+
+    with app.app_context():
+        reset_database()
+        seed_courses(1)
+        seed_progress(seed_students(args.size), COURSE_ID)
+
+        header = f"{'payload':>15} {'rows':>8} {'legacy (ms)':>12}"
+        header += ''.join(f" {name + ' (ms)':>12}" for name, _ in providers) + f" {'KB':>8} {'speedup':>8}"
+        print(header)
+        with app.test_request_context():
+            for name, build in PAYLOADS.items():
+                payload = build()
+                legacy_time, _ = measure(lambda: legacy.response(legacy_convert(payload)).get_data(), args.repeat)
+                line = f"{name:>15} {len(payload):>8} {legacy_time * 1e3:>12.1f}"
+                best = None
+                for _, provider in providers:
+                    elapsed, size = measure(lambda: provider.response(payload).get_data(), args.repeat)
+                    best = elapsed if best is None else min(best, elapsed)
+                    line += f" {elapsed * 1e3:>12.1f}"
+                print(f"{line} {size / 1024:>8.0f} {legacy_time / best:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
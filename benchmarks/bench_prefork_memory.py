@@ -0,0 +1,123 @@
+"""
+Benchmark: bộ nhớ mỗi worker gunicorn khi nạp app trong từng worker và khi preload trong master
+
+Chạy (Linux, cần gunicorn): python -m benchmarks.bench_prefork_memory [--workers 4] [--requests 200]
+
+Mỗi chế độ khởi động `gunicorn -c gunicorn.conf.py` với database SQLite tạm, gửi
+một loạt request rồi đọc /proc/<pid>/smaps_rollup của master và các worker:
+- RSS: gồm cả trang dùng chung nên gần như không đổi giữa hai chế độ
+- PSS: trang dùng chung được chia đều cho các process dùng nó
+- private: trang chỉ riêng worker đó (phần thực sự nhân lên theo số worker)
+"""
+import argparse
+import base64
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADMIN_HEADER = base64.b64encode(json.dumps({'role': 'admin', 'studentId': None}).encode()).decode()
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def children(pid):
+    """PID các process con trực tiếp"""
+    result = []
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    if int(f.read().rsplit(')', 1)[1].split()[1]) == pid:
+                        result.append(int(entry))
+            except (FileNotFoundError, ProcessLookupError):
+                continue
+    return result
+
+def memory(pid):
+    """Rss, Pss và phần private (MB) của một process"""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                values[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return {
+        'rss': values.get('Rss', 0),
+        'pss': values.get('Pss', 0),
+        'private': values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)
+    }
+
+def request(url):
+    req = urllib.request.Request(url, headers={'x-user': ADMIN_HEADER})
+    with urllib.request.urlopen(req, timeout=10) as response:
+        return response.read()
+
+def measure(preload, workers, n_requests, db_url, boot_timeout):
+    """Khởi động gunicorn ở một chế độ, trả về bộ nhớ của master và các worker"""
+    port = free_port()
+    env = dict(os.environ, DB_URL=db_url, FLASK_ENV='production', GUNICORN_BIND=f'127.0.0.1:{port}',
+               GUNICORN_WORKERS=str(workers), GUNICORN_PRELOAD='1' if preload else '0',
+               RISK_SWEEP_INTERVAL_MINUTES='0')
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'], cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        base_url = f'http://127.0.0.1:{port}'
+        deadline = time.monotonic() + boot_timeout
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError("gunicorn dừng khi khởi động")
+            try:
+                request(f'{base_url}/ping')
+                if len(children(server.pid)) >= workers:
+                    break
+            except OSError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("gunicorn không sẵn sàng")
+            time.sleep(0.5)
+        # Chờ các worker còn lại nạp xong app (khi không preload)
+        time.sleep(boot_timeout / 10)
+        for i in range(n_requests):
+            request(f'{base_url}/api/dashboard/courses' if i % 2 else f'{base_url}/api/dashboard/chapters')
+        return memory(server.pid), [memory(pid) for pid in children(server.pid)]
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--boot-timeout', type=float, default=60)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f'sqlite:///{os.path.join(tmp, "bench.db")}'
+        # TestingConfig đọc TEST_DB_URL khi import config, nên phải đặt trước khi import app
+        os.environ['TEST_DB_URL'] = db_url
+        from app import create_app
+        from benchmarks.seed import reset_database, seed_courses
+        app = create_app('testing')
+        with app.app_context():
+            reset_database()
+            seed_courses(200)
+
+        print(f"{'mode':>10} {'workers':>8} {'RSS/worker':>11} {'PSS/worker':>11} {'private/worker':>15} {'PSS total':>10}")
+        for preload in (False, True):
+            master, workers = measure(preload, args.workers, args.requests, db_url, args.boot_timeout)
+            n = len(workers)
+            avg = {key: sum(w[key] for w in workers) / n for key in ('rss', 'pss', 'private')}
+            total = master['pss'] + sum(w['pss'] for w in workers)
+            print(f"{'preload' if preload else 'per-worker':>10} {n:>8} {avg['rss']:>9.1f}MB {avg['pss']:>9.1f}MB "
+                  f"{avg['private']:>13.1f}MB {total:>8.1f}MB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark: Model.query.all() so với ReadModelService (Core select) cho /students
+
+Chạy: python -m benchmarks.bench_read_path [--sizes 10000 100000] [--repeat 3]
+"""
+import argparse
+import time
+from app import create_app, db
+from app.models import Student
+from app.services.read_model_service import ReadModelService
+from app.utils import classify_student
+from benchmarks.seed import reset_database, seed_students
+
+def orm_path():
+    """Đường đọc cũ: load mapped instance rồi copy sang dict"""
+    students = Student.query.all()
+    return [{
+        'studentid': s.studentid,
+        'name': s.name,
+        'totalgpa': s.totalgpa,
+        'class': s.class_,
+        'status': classify_student(s.totalgpa)
+    } for s in students]
+
+def read_model_path():
+    """Đường đọc mới: Core select sang tuple"""
+    return ReadModelService.get_student_summaries()
+
+def measure(fn, repeat):
+    """Trả về thời gian tốt nhất (giây) sau `repeat` lần chạy"""
+    best = None
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(result)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    with app.app_context():
+        print(f"{'rows':>8} {'orm (µs/row)':>14} {'core (µs/row)':>14} {'speedup':>8}")
+        for size in args.sizes:
+            reset_database()
+            seed_students(size)
+            orm_time, n = measure(orm_path, args.repeat)
+            core_time, _ = measure(read_model_path, args.repeat)
+            print(f"{n:>8} {orm_time / n * 1e6:>14.2f} {core_time / n * 1e6:>14.2f} {orm_time / core_time:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
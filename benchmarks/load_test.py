@@ -0,0 +1,276 @@
+"""
+Load test: phát lại hỗn hợp endpoint thực tế với LLM giả lập, báo cáo throughput và p50/p95/p99
+
+Chạy trong process (gọi WSGI trực tiếp, không qua mạng) trên database đã seed:
+    TEST_DB_URL=sqlite:////tmp/lms.db python -m benchmarks.seed --students 10000
+    TEST_DB_URL=sqlite:////tmp/lms.db python -m benchmarks.load_test --duration 30 --concurrency 4
+
+Lưu kết quả làm baseline, rồi so sánh sau mỗi thay đổi hiệu năng (exit code 1 nếu chậm hơn
+quá --threshold):
+    ... python -m benchmarks.load_test --save-baseline /tmp/load_baseline.json
+    ... python -m benchmarks.load_test --baseline /tmp/load_baseline.json
+
+Với --url (ví dụ server gunicorn -c gunicorn.conf.py trên cùng database), request đi qua HTTP;
+các endpoint gọi LLM bị bỏ khỏi hỗn hợp vì không giả lập được LLM của server.
+"""
+import argparse
+import base64
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from types import SimpleNamespace
+
+# (tên, method, đường dẫn, trọng số, role, có gọi LLM); {studentid}/{courseid} được chọn ngẫu nhiên
+SCENARIOS = [
+    ('notification-poll', 'GET', '/api/dashboard/notifications/unread-count/{studentid}', 40, 'user', False),
+    ('student-report', 'GET', '/api/dashboard/student-report/{studentid}', 20, 'user', False),
+    ('notification-list', 'GET', '/api/dashboard/student-notifications/{studentid}', 15, 'user', False),
+    ('class-progress', 'GET', '/api/dashboard/class-progress/{courseid}', 15, 'admin', False),
+    ('create-warning', 'POST', '/api/dashboard/create-warning/{studentid}', 5, 'admin', False),
+    ('predict-intervention', 'GET', '/api/dashboard/predict-intervention/{studentid}', 5, 'admin', True)
+]
+
+# Số sinh viên tối đa lấy từ database làm tập "người dùng đang hoạt động"
+ACTIVE_STUDENTS = 10000
+
+STUB_RECOMMENDATION = """## Lỗi cú pháp
+- Mô tả: Thiếu dấu chấm phẩy cuối câu lệnh.
+- Đề xuất: Kiểm tra lại cuối mỗi câu lệnh trước khi biên dịch.
+
+## Đề xuất cải thiện chung
+- Mô tả: Cần luyện tập debug thường xuyên.
+- Đề xuất: Làm thêm bài tập với gdb.
+"""
+
+class StubLLMClient:
+    """Client giả lập OpenAI: trả đề xuất cố định sau latency giây (không gọi mạng, không tốn phí)"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=STUB_RECOMMENDATION))])
+
+def auth_header(role, studentid=None):
+    user = json.dumps({'role': role, 'studentId': studentid if role == 'user' else None})
+    return {'x-user': base64.b64encode(user.encode()).decode()}
+
+def percentile(sorted_values, pct):
+    """Percentile theo nearest-rank của danh sách đã sắp xếp"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+class InProcessTarget:
+    """Gọi app Flask qua test client (mỗi thread một client)"""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method, path, headers):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(path, method=method, headers=headers)
+        response.get_data()
+        return response.status_code
+
+class HttpTarget:
+    """Gọi server đang chạy qua HTTP"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, headers):
+        req = urllib.request.Request(self.base_url + path, method=method, headers=headers,
+                                     data=b'' if method == 'POST' else None)
+        try:
+            with urllib.request.urlopen(req, timeout=60) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+def run_load(target, scenarios, studentids, courseids, duration, concurrency, warmup, seed):
+    """
+    Chạy concurrency thread, mỗi thread gửi request liên tục (closed loop) trong warmup + duration giây
+
+    Returns:
+        tuple: (dict tên -> [(latency giây, status)], thời gian đo thực tế)
+    """
+    results = defaultdict(list)
+    lock = threading.Lock()
+    weights = [scenario[3] for scenario in scenarios]
+    start = time.perf_counter()
+    measure_from = start + warmup
+    deadline = measure_from + duration
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        local = defaultdict(list)
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            name, method, template, _, role, _ = rng.choices(scenarios, weights)[0]
+            studentid = rng.choice(studentids)
+            path = template.format(studentid=studentid, courseid=rng.choice(courseids))
+            request_start = time.perf_counter()
+            try:
+                status = target.request(method, path, auth_header(role, studentid))
+            except Exception:
+                status = 0
+            elapsed = time.perf_counter() - request_start
+            if request_start >= measure_from:
+                local[name].append((elapsed, status))
+        with lock:
+            for name, samples in local.items():
+                results[name].extend(samples)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - measure_from
+
+def summarize(samples, elapsed):
+    latencies = sorted(latency for latency, _ in samples)
+    errors = sum(1 for _, status in samples if status == 0 or status >= 500)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'throughput': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0
+    }
+
+def build_report(results, elapsed, config):
+    report = {'config': config, 'elapsed': round(elapsed, 2), 'scenarios': {}}
+    for name, samples in sorted(results.items()):
+        report['scenarios'][name] = summarize(samples, elapsed)
+    report['total'] = summarize([sample for samples in results.values() for sample in samples], elapsed)
+    return report
+
+def print_report(report):
+    print(f"{'scenario':>22} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    rows = list(report['scenarios'].items()) + [('TOTAL', report['total'])]
+    for name, row in rows:
+        print(f"{name:>22} {row['requests']:>9} {row['errors']:>7} {row['throughput']:>9.1f} {row['p50_ms']:>9.2f} "
+              f"{row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f} {row['max_ms']:>9.2f}")
+
+def compare(report, baseline, threshold, min_requests):
+    """
+    In chênh lệch so với baseline; latency tăng hoặc throughput giảm quá threshold là chậm đi
+
+    Scenario có ít hơn min_requests request (ở lần chạy này hoặc baseline) chỉ được in,
+    không tính là chậm đi vì p95/p99 của vài chục mẫu dao động quá lớn.
+
+    Returns:
+        list: Các (scenario, chỉ số) bị chậm đi
+    """
+    regressions = []
+    print(f"\nSo với baseline (ngưỡng {threshold:.0%}):")
+    print(f"{'scenario':>22} {'req/s':>10} {'p50':>10} {'p95':>10} {'p99':>10}")
+    rows = [(name, row, baseline['scenarios'].get(name)) for name, row in report['scenarios'].items()]
+    rows.append(('TOTAL', report['total'], baseline.get('total')))
+    for name, row, base in rows:
+        if not base:
+            print(f"{name:>22} {'(không có trong baseline)':>43}")
+            continue
+        cells = []
+        for metric, higher_is_worse in (('throughput', False), ('p50_ms', True), ('p95_ms', True), ('p99_ms', True)):
+            change = (row[metric] - base[metric]) / base[metric] if base[metric] else 0.0
+            worse = change > threshold if higher_is_worse else change < -threshold
+            worse = worse and min(row['requests'], base['requests']) >= min_requests
+            if worse:
+                regressions.append((name, metric))
+            cells.append(f"{change:>+9.1%}{'!' if worse else ' '}")
+        print(f"{name:>22} {' '.join(cells)}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duration', type=float, default=30, help='Số giây đo')
+    parser.add_argument('--warmup', type=float, default=5, help='Số giây chạy trước khi đo (nạp cache, mô hình)')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--url', help='Gọi server đang chạy thay vì app trong process')
+    parser.add_argument('--llm-latency', type=float, default=0.5, help='Độ trễ (giây) của LLM giả lập')
+    parser.add_argument('--exclude', nargs='*', default=[], help='Bỏ các scenario khỏi hỗn hợp')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Ghi báo cáo JSON')
+    parser.add_argument('--save-baseline', help='Ghi báo cáo làm baseline')
+    parser.add_argument('--baseline', help='So sánh với baseline đã lưu')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Mức chậm đi tối đa so với baseline')
+    parser.add_argument('--min-requests', type=int, default=200,
+                        help='Số request tối thiểu của một scenario để so sánh percentile với baseline')
+    parser.add_argument('--rate-limit', action='store_true',
+                        help='Giữ rate limit của app trong process (mặc định tắt: request admin dùng chung một bucket theo IP)')
+    args = parser.parse_args()
+
+    if not args.rate_limit:
+        os.environ['RATE_LIMIT_ENABLED'] = '0'
+    from app import create_app, db
+    from app.models import Course, Student
+    from app.services.llm_service import LLMService
+    from sqlalchemy import select
+
+    scenarios = [s for s in SCENARIOS if s[0] not in args.exclude and not (args.url and s[5])]
+    app = create_app('testing')
+    with app.app_context():
+        url = db.engine.url
+        if not args.url and args.concurrency > 1 and url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+            parser.error("SQLite in-memory chỉ dùng được với --concurrency 1; đặt TEST_DB_URL tới database đã seed")
+        studentids = db.session.execute(select(Student.studentid).limit(ACTIVE_STUDENTS)).scalars().all()
+        courseids = db.session.execute(select(Course.courseid)).scalars().all()
+        db.session.remove()
+    if not studentids or not courseids:
+        parser.error("Database chưa có dữ liệu, chạy python -m benchmarks.seed trước")
+
+    if args.url:
+        target = HttpTarget(args.url)
+    else:
+        app.extensions['services'].override('llm', LLMService(client=StubLLMClient(args.llm_latency)))
+        target = InProcessTarget(app)
+
+    config = {
+        'target': args.url or 'in-process',
+        'database': url.render_as_string(hide_password=True),
+        'students': len(studentids),
+        'courses': len(courseids),
+        'duration': args.duration,
+        'concurrency': args.concurrency,
+        'llm_latency': args.llm_latency,
+        'scenarios': [s[0] for s in scenarios]
+    }
+    print(f"Chạy {args.duration}s (+{args.warmup}s warmup), {args.concurrency} luồng, {config['target']}, {config['database']}")
+    results, elapsed = run_load(target, scenarios, studentids, courseids, args.duration, args.concurrency,
+                                args.warmup, args.seed)
+    report = build_report(results, elapsed, config)
+    print_report(report)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold, args.min_requests):
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
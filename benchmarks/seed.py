@@ -0,0 +1,293 @@
+"""
+Seed dữ liệu giả lập cho benchmark
+
+Sinh cả một trường (khóa học, sinh viên, tiến độ, bài tập, cảnh báo, thông báo...) vào
+database của TEST_DB_URL, ví dụ 100k sinh viên vào SQLite file:
+    TEST_DB_URL=sqlite:////tmp/lms.db python -m benchmarks.seed --students 100000
+Hoặc PostgreSQL local:
+    TEST_DB_URL=postgresql://localhost/lms_bench python -m benchmarks.seed --students 1000000
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from itertools import islice
+from app import db
+from app.models import (Student, Course, Progress, Assignment, Chapter, CommonError, BloomAssessment,
+                        Warning, Notification, Intervention)
+
+BATCH_SIZE = 5000
+
+BLOOM_LEVELS = ['Nhớ', 'Hiểu', 'Áp dụng', 'Phân tích', 'Đánh giá', 'Sáng tạo']
+LEVELS = ['LOW', 'MEDIUM', 'HIGH']
+WARNING_TYPES = ['HỌC VỤ', 'TIẾN ĐỘ', 'THÔNG TIN']
+WARNING_MESSAGES = ['Lỗi cú pháp khi nộp bài', 'Lỗi logic trong vòng lặp', 'Lỗi con trỏ rỗng',
+                    'GPA thấp, cần cải thiện kết quả học tập', 'Tiến độ chậm so với lớp']
+ERROR_TYPES = ['Lỗi cú pháp', 'Lỗi logic', 'Lỗi con trỏ', 'Lỗi tràn bộ nhớ', 'Lỗi biên mảng']
+
+def bulk_insert(model, rows):
+    """Insert theo lô bằng Core executemany (rows là list hoặc generator)"""
+    table = model.__table__
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, BATCH_SIZE))
+        if not batch:
+            break
+        db.session.execute(table.insert(), batch)
+    db.session.commit()
+
+def seed_courses(n_courses):
+    """Tạo n_courses khóa học"""
+    bulk_insert(Course, [{
+        'courseid': courseid,
+        'coursename': f'Khóa học {courseid}',
+        'credits': 3,
+        'prerequisite': None,
+        'semester': 'HK1',
+        'status': 'ACTIVE',
+        'difficulty': random.choice(['BASIC', 'INTERMEDIATE', 'ADVANCED']),
+        'category': 'Lập trình'
+    } for courseid in range(1, n_courses + 1)])
+
+def seed_students(n_students, start=0):
+    """Tạo n_students sinh viên, trả về danh sách studentid"""
+    studentids = [f'SV{i:07d}' for i in range(start, start + n_students)]
+    bulk_insert(Student, ({
+        'studentid': studentid,
+        'name': student_name(studentid),
+        'grade': 'K20',
+        'major': 'CNTT',
+        'academicyear': '2024',
+        'totalcredits': random.randint(0, 150),
+        'totalgpa': round(random.uniform(1.0, 4.0), 2),
+        'currentsemester': 'HK1',
+        'class': 'CNTT-K20'
+    } for studentid in studentids))
+    return studentids
+
+def student_name(studentid):
+    return f'Sinh viên {studentid}'
+
+def seed_progress(studentids, courseid):
+    """Tạo một bản ghi tiến độ cho mỗi sinh viên trong khóa học"""
+    bulk_insert(Progress, [{
+        'studentid': studentid,
+        'courseid': courseid,
+        'progressrate': round(random.uniform(0, 100), 1),
+        'completedcredits': random.randint(0, 3),
+        'completionrate': random.choice([100.0, round(random.uniform(0, 100), 1)]),
+        'lastupdated': date(2024, 1, 1)
+    } for studentid in studentids])
+
+def reset_database():
+    """Xóa và tạo lại toàn bộ bảng"""
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+
+def enrolled_courses(index, n_courses, courses_per_student):
+    """Các khóa học của sinh viên thứ index (trải đều, không cần lưu bảng ghi danh trong bộ nhớ)"""
+    stride = max(1, n_courses // courses_per_student)
+    return [(index + j * stride) % n_courses + 1 for j in range(courses_per_student)]
+
+def course_students(courseid, studentids, n_courses, courses_per_student):
+    """Studentid của các sinh viên ghi danh vào courseid (ngược của enrolled_courses)"""
+    stride = max(1, n_courses // courses_per_student)
+    members = []
+    for j in range(courses_per_student):
+        members.extend(studentids[(courseid - 1 - j * stride) % n_courses::n_courses])
+    return members
+
+def seed_enrollments(studentids, n_courses, courses_per_student):
+    """Tiến độ và đánh giá Bloom cho mỗi cặp (sinh viên, khóa học) đã ghi danh"""
+    def progress_rows():
+        for index, studentid in enumerate(studentids):
+            for courseid in enrolled_courses(index, n_courses, courses_per_student):
+                yield {
+                    'studentid': studentid,
+                    'courseid': courseid,
+                    'progressrate': round(random.uniform(0, 100), 1),
+                    'completedcredits': random.randint(0, 3),
+                    'completionrate': random.choice([100.0, round(random.uniform(0, 100), 1)]),
+                    'lastupdated': date(2024, 1, 1) + timedelta(days=random.randint(0, 365))
+                }
+
+    def bloom_rows():
+        for index, studentid in enumerate(studentids):
+            for courseid in enrolled_courses(index, n_courses, courses_per_student):
+                yield {
+                    'studentid': studentid,
+                    'courseid': courseid,
+                    'bloomlevel': random.choice(BLOOM_LEVELS),
+                    'status': 'Đã đánh giá',
+                    'score': round(random.uniform(0, 10), 1),
+                    'lastupdated': date(2024, 1, 1) + timedelta(days=random.randint(0, 365))
+                }
+
+    bulk_insert(Progress, progress_rows())
+    bulk_insert(BloomAssessment, bloom_rows())
+
+def seed_course_content(studentids, n_courses, courses_per_student, assignments_per_course,
+                        chapters_per_course, errors_per_course):
+    """Bài tập, chương và lỗi thường gặp của mỗi khóa học, theo danh sách sinh viên ghi danh"""
+    assignments, chapters, errors = [], [], []
+    for courseid in range(1, n_courses + 1):
+        names = [student_name(studentid) for studentid in
+                 course_students(courseid, studentids, n_courses, courses_per_student)]
+        for k in range(assignments_per_course):
+            submitted = [name for name in names if random.random() < 0.7]
+            submitted_set = set(submitted)
+            assignments.append({
+                'courseid': courseid,
+                'name': f'Bài tập {k + 1} - Khóa học {courseid}',
+                'deadline': date(2024, 3, 1) + timedelta(weeks=2 * k),
+                'submitted': f'{len(submitted)}/{len(names)}',
+                'completionrate': round(len(submitted) * 100 / len(names), 1) if names else 0.0,
+                'status': random.choice(['open', 'closed']),
+                'studentssubmitted': ', '.join(submitted),
+                'studentsnotsubmitted': ', '.join(name for name in names if name not in submitted_set)
+            })
+        for k in range(chapters_per_course):
+            completed = [name for name in names if random.random() < 0.5]
+            chapters.append({
+                'courseid': courseid,
+                'name': f'Chương {k + 1}',
+                'totalstudents': len(names),
+                'completionrate': round(len(completed) * 100 / len(names), 1) if names else 0.0,
+                'averagescore': round(random.uniform(4, 9), 1),
+                'studentscompleted': ', '.join(completed),
+                'estimatedtime': random.randint(2, 10)
+            })
+        for k in range(errors_per_course):
+            errors.append({
+                'courseid': courseid,
+                'type': ERROR_TYPES[k % len(ERROR_TYPES)],
+                'occurrences': random.randint(1, 200),
+                'description': f'{ERROR_TYPES[k % len(ERROR_TYPES)]} thường gặp trong khóa học {courseid}',
+                'studentsaffected': random.randint(1, max(1, len(names))),
+                'relatedchapters': str(random.randint(1, max(1, chapters_per_course)))
+            })
+    bulk_insert(Assignment, assignments)
+    bulk_insert(Chapter, chapters)
+    bulk_insert(CommonError, errors)
+
+def seed_student_activity(studentids, warnings_per_student, notifications_per_student, interventions_per_student):
+    """Cảnh báo, thông báo (trải trong 12 tháng gần nhất) và can thiệp; số bản ghi mỗi sinh viên ngẫu nhiên quanh trung bình"""
+    today = date.today()
+
+    def count(average):
+        return random.randint(0, round(2 * average)) if average >= 0.5 else int(random.random() < average)
+
+    def warning_rows():
+        for studentid in studentids:
+            for _ in range(count(warnings_per_student)):
+                isresolved = random.random() < 0.4
+                createddate = today - timedelta(days=random.randint(0, 730))
+                yield {
+                    'studentid': studentid,
+                    'class': 'CNTT-K20',
+                    'warningtype': random.choice(WARNING_TYPES),
+                    'message': random.choice(WARNING_MESSAGES),
+                    'severity': random.choice(LEVELS),
+                    'priority': random.choice(LEVELS),
+                    'createddate': createddate,
+                    'isresolved': isresolved,
+                    'resolveddate': createddate + timedelta(days=7) if isresolved else None,
+                    'isnotified': False,
+                    'notificationsentdate': None
+                }
+
+    def notification_rows():
+        for studentid in studentids:
+            for _ in range(count(notifications_per_student)):
+                yield {
+                    'studentid': studentid,
+                    'message': f'Sinh viên {studentid} cần chú ý tiến độ học tập',
+                    'createddate': today - timedelta(days=random.randint(0, 365)),
+                    'isread': random.random() < 0.6
+                }
+
+    def intervention_rows():
+        for studentid in studentids:
+            for _ in range(count(interventions_per_student)):
+                yield {
+                    'studentid': studentid,
+                    'recommendation': 'Ôn tập lại con trỏ và mảng, làm thêm bài tập debug',
+                    'createddate': today - timedelta(days=random.randint(0, 365)),
+                    'isapplied': random.random() < 0.5
+                }
+
+    bulk_insert(Warning, warning_rows())
+    bulk_insert(Notification, notification_rows())
+    bulk_insert(Intervention, intervention_rows())
+
+def refresh_read_models():
+    """Tính lại bảng tổng hợp khóa học và thống kê cảnh báo (bulk insert đi vòng qua event ORM)"""
+    from app.services.course_summary_service import CourseSummaryService
+    from app.services.warning_stats_service import WarningStatsService
+    CourseSummaryService.refresh_all()
+    WarningStatsService.refresh_all()
+
+def seed_institution(n_students, n_courses=None, courses_per_student=4, assignments_per_course=3,
+                     chapters_per_course=5, errors_per_course=3, warnings_per_student=1.5,
+                     notifications_per_student=3, interventions_per_student=0.2, seed=42):
+    """
+    Sinh dữ liệu của cả một trường vào database đang dùng (sau reset_database)
+
+    Cùng seed cho cùng dữ liệu, nên kết quả benchmark giữa các lần chạy so sánh được.
+
+    Args:
+        n_students (int): Số sinh viên
+        n_courses (int): Số khóa học (mặc định khoảng 250 sinh viên mỗi lớp-khóa học)
+        courses_per_student (int): Số khóa học mỗi sinh viên ghi danh
+        warnings_per_student, notifications_per_student, interventions_per_student (float): Trung bình mỗi sinh viên
+
+    Returns:
+        dict: Số sinh viên, khóa học và thời gian seed từng phần (giây)
+    """
+    random.seed(seed)
+    n_courses = n_courses or max(courses_per_student, n_students * courses_per_student // 250)
+    courses_per_student = min(courses_per_student, n_courses)
+    timings = {}
+
+    def step(name, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        timings[name] = round(time.perf_counter() - start, 2)
+        return result
+
+    step('courses', seed_courses, n_courses)
+    studentids = step('students', seed_students, n_students)
+    step('enrollments', seed_enrollments, studentids, n_courses, courses_per_student)
+    step('course_content', seed_course_content, studentids, n_courses, courses_per_student,
+         assignments_per_course, chapters_per_course, errors_per_course)
+    step('activity', seed_student_activity, studentids, warnings_per_student, notifications_per_student,
+         interventions_per_student)
+    step('read_models', refresh_read_models)
+    return {'students': n_students, 'courses': n_courses, 'timings': timings}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=1000)
+    parser.add_argument('--courses', type=int, default=None)
+    parser.add_argument('--courses-per-student', type=int, default=4)
+    parser.add_argument('--assignments-per-course', type=int, default=3)
+    parser.add_argument('--chapters-per-course', type=int, default=5)
+    parser.add_argument('--errors-per-course', type=int, default=3)
+    parser.add_argument('--warnings-per-student', type=float, default=1.5)
+    parser.add_argument('--notifications-per-student', type=float, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    from app import create_app
+    app = create_app('testing')
+    with app.app_context():
+        print(f"Seed vào {db.engine.url.render_as_string(hide_password=True)}")
+        reset_database()
+        result = seed_institution(args.students, args.courses, args.courses_per_student, args.assignments_per_course,
+                                  args.chapters_per_course, args.errors_per_course, args.warnings_per_student,
+                                  args.notifications_per_student, seed=args.seed)
+        print(f"Đã seed {result['students']} sinh viên, {result['courses']} khóa học: {result['timings']}")
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,7 @@
 Cấu hình ứng dụng Flask
 """
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load biến môi trường
@@ -26,16 +27,115 @@ class Config:
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     
     # Machine Learning
-    MODEL_PATH = 'rf_model.pkl'
+    MODEL_PATH = os.getenv("MODEL_PATH", 'rf_model.pkl')
     
+    # Xác thực: mặc định tin header x-user do gateway gửi; AUTH_VERIFY_JWT = 1 để kiểm tra JWT
+    # trong Authorization: Bearer với JWT_PUBLIC_KEY (cần PyJWT[crypto])
+    AUTH_VERIFY_JWT = os.getenv("AUTH_VERIFY_JWT", "0") == "1"
+    JWT_PUBLIC_KEY = os.getenv("JWT_PUBLIC_KEY", "").replace("\\n", "\n")
+    JWT_ALGORITHM = os.getenv("ALGORITHM", "RS256")
+    JWT_AUDIENCE = os.getenv("JWT_AUDIENCE")
+    JWT_LEEWAY = int(os.getenv("JWT_LEEWAY", 0))
+
     # Logging
     LOG_LEVEL = 'INFO'
 
+    # Số worker phục vụ app (gunicorn.conf.py đặt WEB_CONCURRENCY), để chọn backend dùng chung
+    WORKERS = int(os.getenv("WEB_CONCURRENCY", 1))
+
+    # Sau reverse proxy: số proxy tin cậy đặt X-Forwarded-For/X-Forwarded-Proto (0 = không dùng ProxyFix),
+    # để IP client (rate limit theo IP) và scheme là của client thay vì của proxy
+    PROXY_FIX_X_FOR = int(os.getenv("PROXY_FIX_X_FOR", 0))
+    PROXY_FIX_X_PROTO = int(os.getenv("PROXY_FIX_X_PROTO", 0))
+    
+    # Streaming - số dòng mỗi lần fetch khi trả dữ liệu lớn với ?stream=1
+    STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", 1000))
+    
+    # Quét nguy cơ hàng loạt - RISK_SWEEP_INTERVAL_MINUTES = 0 để tắt scheduler trong process
+    RISK_SWEEP_CHUNK_SIZE = int(os.getenv("RISK_SWEEP_CHUNK_SIZE", 1000))
+    RISK_SWEEP_INTERVAL_MINUTES = int(os.getenv("RISK_SWEEP_INTERVAL_MINUTES", 0))
+    RISK_SWEEP_LOCK_FILE = os.getenv("RISK_SWEEP_LOCK_FILE", os.path.join(tempfile.gettempdir(), "risk_sweep.lock"))
+    
+    # Lưu trữ - thông báo đã đọc/cảnh báo đã giải quyết cũ hơn RETENTION_MONTHS tháng được chuyển sang bảng archive
+    RETENTION_MONTHS = int(os.getenv("RETENTION_MONTHS", 12))
+    RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", 5000))
+    # Số tháng partition tạo trước (chỉ PostgreSQL)
+    PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", 3))
+    # Danh sách thông báo mặc định lấy NOTIFICATION_HOT_MONTHS tháng gần nhất và mọi thông báo chưa đọc
+    # (?history=1 để lấy tất cả)
+    NOTIFICATION_HOT_MONTHS = int(os.getenv("NOTIFICATION_HOT_MONTHS", 6))
+
+    # Cache dữ liệu tham chiếu (khóa học, chương, lỗi thường gặp): 'memory', 'redis' hoặc 'none'
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    CACHE_DEFAULT_TTL = int(os.getenv("CACHE_DEFAULT_TTL", 3600))
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 10000))
+    CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "lms")
+
+    # Cache bytes JSON của các endpoint tốn kém (trong process, LRU theo byte; 0 = tắt)
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+    # TTL (giây) theo endpoint; entry còn bị bỏ sớm hơn khi phiên bản dữ liệu thay đổi
+    RESPONSE_CACHE_TTLS = {
+        'dashboard.get_class_progress': 60,
+        'dashboard.get_learning_path': 600,
+        'dashboard.get_student_report': 300
+    }
+
+    # Serialize JSON: 'auto' (orjson nếu đã cài), 'orjson' hoặc 'stdlib'
+    JSON_BACKEND = os.getenv("JSON_BACKEND", "auto")
+
+    # Nén response JSON theo Accept-Encoding ('br' cần `pip install brotli`); để trống để tắt
+    COMPRESS_ALGORITHMS = [name.strip() for name in os.getenv("COMPRESS_ALGORITHMS", "br,gzip").split(",") if name.strip()]
+    COMPRESS_MIMETYPES = ['application/json']
+    # Body nhỏ hơn ngưỡng này (byte) được gửi nguyên; response streaming luôn được nén
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+    COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", 6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", 4))
+
+    # Metrics Prometheus (latency theo endpoint, truy vấn database, ML/LLM) tại METRICS_PATH
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+    METRICS_PATH = os.getenv("METRICS_PATH", "/metrics")
+    # Token Prometheus gửi trong Authorization: Bearer; để trống thì METRICS_PATH chỉ dành cho admin
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+    # Thư mục chung để cộng metrics của các worker gunicorn (để trống khi chỉ có một process)
+    METRICS_DIR = os.getenv("METRICS_DIR")
+    METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 5))
+
+    # Đếm truy vấn mỗi request (header X-Query-Count) và cảnh báo khi một câu SQL lặp
+    # từ QUERY_INSPECTOR_REPEAT_THRESHOLD lần (N+1); bật sẵn trong development/testing
+    QUERY_INSPECTOR_ENABLED = os.getenv("QUERY_INSPECTOR_ENABLED", "0") == "1"
+    QUERY_INSPECTOR_REPEAT_THRESHOLD = int(os.getenv("QUERY_INSPECTOR_REPEAT_THRESHOLD", 5))
+
+    # Profile theo yêu cầu (admin, X-Profile: 1 hoặc ?profile=1): lấy mẫu stack mỗi PROFILE_INTERVAL giây,
+    # tối đa PROFILE_MAX_PER_HOUR lần mỗi process, giữ PROFILE_KEEP profile mới nhất trong PROFILE_DIR
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "1") == "1"
+    PROFILE_PATH = os.getenv("PROFILE_PATH", "/api/dashboard/profiles")
+    PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "lms-profiles"))
+    PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", 0.001))
+    PROFILE_MAX_PER_HOUR = int(os.getenv("PROFILE_MAX_PER_HOUR", 10))
+    PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", 100))
+
+    # Rate limit token bucket theo người dùng cho endpoint tốn kém: 'memory' (mỗi worker một bản)
+    # hoặc 'redis' (dùng chung giữa các worker, mặc định khi WORKERS > 1); ngân sách
+    # '<số request>/<second|minute|hour|day>' theo vai trò
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "redis" if WORKERS > 1 else "memory")
+    RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"))
+    RATE_LIMITS = {
+        # Gọi LLM (tốn phí) và mô hình ML
+        'dashboard.predict_intervention': {'admin': '60/minute', 'user': '10/hour'},
+        'intervention.predict_intervention': {'admin': '60/minute', 'user': '10/hour'},
+        # Mỗi lần đánh giá gọi LLM 4 lần
+        'dashboard.evaluate_llm': {'admin': '10/minute', 'user': '3/hour'},
+        'dashboard.evaluate_model': {'admin': '10/minute', 'user': '5/minute'}
+    }
+
 class DevelopmentConfig(Config):
     """Cấu hình cho môi trường phát triển"""
     DEBUG = True
     HOST = '0.0.0.0'
     PORT = 8000
+    QUERY_INSPECTOR_ENABLED = os.getenv("QUERY_INSPECTOR_ENABLED", "1") == "1"
 
 class ProductionConfig(Config):
     """Cấu hình cho môi trường production"""
@@ -43,9 +143,17 @@ class ProductionConfig(Config):
     HOST = '0.0.0.0'
     PORT = 8000
 
+class TestingConfig(Config):
+    """Cấu hình cho test và benchmark (mặc định SQLite in-memory)"""
+    TESTING = True
+    DEBUG = False
+    SQLALCHEMY_DATABASE_URI = os.getenv("TEST_DB_URL", "sqlite:///:memory:")
+    QUERY_INSPECTOR_ENABLED = True
+
 # Mapping cấu hình
 config = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
+    'testing': TestingConfig,
     'default': DevelopmentConfig
 }
@@ -0,0 +1,99 @@
+"""
+Fixture dùng chung cho pytest: app testing với SQLite in-memory đã seed và ngân sách truy vấn
+"""
+import base64
+import json
+from contextlib import contextmanager
+from datetime import date
+import pytest
+from app import create_app, db
+from app.utils.query_inspector import record_queries
+
+# Script kiểm thử thủ công, gọi server thật tại localhost:8000
+collect_ignore = ['test_notifications.py']
+
+N_STUDENTS = 30
+
+def auth_header(role='admin', student_id=None):
+    """Header x-user như frontend gửi (base64 JSON)"""
+    user = json.dumps({'role': role, 'studentId': student_id})
+    return {'x-user': base64.b64encode(user.encode()).decode()}
+
+def seed_sample_data(n_students=N_STUDENTS):
+    """Hai khóa học, n_students sinh viên với tiến độ, đánh giá Bloom, cảnh báo, can thiệp, thông báo"""
+    from app.models import (Student, Course, Progress, Warning, Assignment, Chapter, CommonError,
+                            BloomAssessment, Intervention, Notification)
+    for courseid in (1, 2):
+        db.session.add(Course(courseid=courseid, coursename=f'Khóa học {courseid}', credits=3, semester='HK1',
+                              status='ACTIVE', difficulty='BASIC', category='CNTT'))
+    names = []
+    for i in range(n_students):
+        studentid = f'SV{i:03d}'
+        names.append(f'Sinh viên {i}')
+        db.session.add(Student(studentid=studentid, name=names[-1], grade='A', major='CNTT', academicyear='2024',
+                               totalcredits=10, totalgpa=1.5 + (i % 5) * 0.6, currentsemester='HK1', class_='K1'))
+        for courseid in (1, 2):
+            db.session.add(Progress(studentid=studentid, courseid=courseid, progressrate=i * 3 % 100,
+                                    completedcredits=3, completionrate=100 if i % 4 == 0 else 50 + i % 40,
+                                    lastupdated=date(2024, 1, 1)))
+            db.session.add(BloomAssessment(studentid=studentid, courseid=courseid, bloomlevel='Hiểu', status='ok',
+                                           score=5 + i % 5, lastupdated=date(2024, 1, 2)))
+        for k in range(i % 3):
+            db.session.add(Warning(studentid=studentid, class_='K1', warningtype='THÔNG TIN',
+                                   message=f'Lỗi cú pháp {k}', severity='HIGH', priority='LOW',
+                                   createddate=date(2024, 2, 1), isresolved=(k == 1)))
+        db.session.add(Intervention(studentid=studentid, recommendation='Ôn tập con trỏ',
+                                    createddate=date(2024, 3, 1), isapplied=False))
+        db.session.add(Notification(studentid=studentid, message='Cần cải thiện tiến độ',
+                                    isread=bool(i % 2)))
+    for courseid in (1, 2):
+        db.session.add(Assignment(assignmentid=courseid, courseid=courseid, name=f'Bài tập {courseid}',
+                                  deadline=date(2030, 1, 1), submitted='x', completionrate=50, status='open',
+                                  studentssubmitted=', '.join(names[::2]), studentsnotsubmitted=', '.join(names[1::2])))
+        db.session.add(Chapter(chapterid=courseid, courseid=courseid, name=f'Chương {courseid}',
+                               totalstudents=n_students, completionrate=50, averagescore=7,
+                               studentscompleted=', '.join(names[::3]), estimatedtime=3))
+        db.session.add(CommonError(errorid=courseid, courseid=courseid, type='Lỗi cú pháp', occurrences=3,
+                                   description='Thiếu dấu ;', studentsaffected=2, relatedchapters=str(courseid)))
+    db.session.commit()
+
+@pytest.fixture(scope='session')
+def app():
+    """App testing với database đã seed, dùng chung cho cả phiên test"""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        seed_sample_data()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def query_budget(app):
+    """
+    Kiểm tra số truy vấn của một khối lệnh
+
+    Cache dữ liệu tham chiếu và response cache được xóa trước, nên ngân sách là của
+    đường đi nguội (cache miss). Test thất bại khi vượt max_queries hoặc khi một câu SQL
+    lặp từ repeat_threshold lần trở lên (N+1).
+
+    Ví dụ:
+        with query_budget(2):
+            client.get('/api/dashboard/students', headers=auth_header())
+    """
+    @contextmanager
+    def budget(max_queries, repeat_threshold=None):
+        threshold = repeat_threshold or app.config['QUERY_INSPECTOR_REPEAT_THRESHOLD']
+        app.extensions['cache'].clear()
+        app.extensions['response_cache'].clear()
+        with record_queries() as recorder:
+            yield recorder
+        assert recorder.count <= max_queries, f"Vượt ngân sách {max_queries} truy vấn: {recorder.report()}"
+        repeated = recorder.repeated(threshold)
+        assert not repeated, f"Nghi N+1: {recorder.report(threshold)}"
+
+    return budget
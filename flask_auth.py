@@ -1,40 +1,212 @@
+"""
+Xác thực cho Flask: danh tính người dùng của request (header x-user hoặc JWT) và decorator phân quyền
+"""
 import base64
+import binascii
 import json
-from flask import request
+import logging
+from flask import current_app, g, has_request_context, jsonify, request
 from functools import wraps
-import os
 
-JWT_PUBLIC_KEY = os.getenv("JWT_PUBLIC_KEY", "").replace("\\n", "\n")
-ALGORITHM = os.getenv("ALGORITHM", "RS256")
+try:
+    import jwt
+except ImportError:
+    # PyJWT chỉ cần khi AUTH_VERIFY_JWT bật
+    jwt = None
 
-def get_current_user():
+logger = logging.getLogger(__name__)
+
+ADMIN = 'admin'
+STUDENT = 'user'
+
+# Danh tính đã giải mã của request hiện tại trên flask.g: (environ của request, user)
+USER_KEY = '_current_user'
+
+class TokenVerifier:
     """
-    Function để lấy thông tin người dùng từ header X-User trong Flask
-    Returns: dict - thông tin user hoặc None nếu không có
+    Xác thực JWT bằng public key
+
+    PEM được parse một lần khi khởi tạo; mỗi request chỉ còn kiểm tra chữ ký và claims.
+    """
+
+    def __init__(self, public_key, algorithm='RS256', audience=None, leeway=0):
+        if jwt is None:
+            raise RuntimeError("AUTH_VERIFY_JWT cần PyJWT: pip install 'PyJWT[crypto]'")
+        if not public_key:
+            raise RuntimeError("AUTH_VERIFY_JWT cần JWT_PUBLIC_KEY")
+        algorithms = jwt.algorithms.get_default_algorithms()
+        if algorithm not in algorithms:
+            raise RuntimeError(f"Thuật toán JWT không được hỗ trợ: {algorithm} (thuật toán RS/ES cần cryptography)")
+        self.algorithm = algorithm
+        self.audience = audience
+        self.leeway = leeway
+        self.key = algorithms[algorithm].prepare_key(public_key)
+
+    def verify(self, token):
+        """
+        Kiểm tra chữ ký, hạn dùng (và audience nếu cấu hình) của token
+
+        Returns:
+            dict: Claims của token, hoặc None nếu token không hợp lệ
+        """
+        try:
+            claims = jwt.decode(token, self.key, algorithms=[self.algorithm], audience=self.audience,
+                                leeway=self.leeway, options={'verify_aud': self.audience is not None})
+        except jwt.InvalidTokenError as e:
+            logger.warning(f"JWT không hợp lệ: {str(e)}")
+            return None
+        return claims if isinstance(claims, dict) else None
+
+def init_auth(app):
+    """
+    Bật xác thực JWT khi AUTH_VERIFY_JWT (gọi một lần trong create_app)
+
+    Khi bật, danh tính lấy từ claims của token trong header Authorization: Bearer, đã kiểm tra
+    với JWT_PUBLIC_KEY; header x-user bị bỏ qua. Khi tắt (mặc định), danh tính lấy từ header x-user
+    do gateway đã xác thực gửi tới. Cấu hình sai (thiếu key, thiếu PyJWT) báo lỗi ngay khi khởi động.
     """
+    if not app.config.get('AUTH_VERIFY_JWT'):
+        return None
+
+    verifier = TokenVerifier(
+        app.config.get('JWT_PUBLIC_KEY'),
+        app.config.get('JWT_ALGORITHM', 'RS256'),
+        audience=app.config.get('JWT_AUDIENCE'),
+        leeway=app.config.get('JWT_LEEWAY', 0)
+    )
+    app.extensions['auth'] = verifier
+    logger.info(f"Xác thực JWT bật ({verifier.algorithm})")
+    return verifier
+
+def decode_user_header(x_user):
+    """
+    Giải mã header x-user (base64 của JSON)
+
+    Returns:
+        dict: Thông tin user, hoặc None nếu header không hợp lệ
+    """
+    try:
+        user_data = json.loads(base64.b64decode(x_user))
+    except (binascii.Error, ValueError) as e:
+        logger.warning(f"Header x-user không hợp lệ: {str(e)}")
+        return None
+    return user_data if isinstance(user_data, dict) else None
+
+def load_user():
+    """Giải mã danh tính của request hiện tại (không cache, dùng get_current_user)"""
+    verifier = current_app.extensions.get('auth')
+    if verifier is not None:
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not token.strip():
+            return None
+        return verifier.verify(token.strip())
+
     x_user = request.headers.get("x-user")
     if not x_user:
         return None
-    
-    try:
-        decoded_user = base64.b64decode(x_user).decode("utf-8")
-        user_data = json.loads(decoded_user)
-        return user_data
-    except Exception as e:
-        print(f"Error decoding user data: {e}")
+    return decode_user_header(x_user)
+
+def get_current_user():
+    """
+    Function để lấy thông tin người dùng của request hiện tại trong Flask
+
+    Header chỉ được giải mã (và xác thực) một lần mỗi request; kết quả được lưu trên flask.g
+    cho các lần gọi sau (decorator, handler, response cache, profiler).
+    Returns: dict - thông tin user hoặc None nếu không có
+    """
+    if not has_request_context():
         return None
+    cached = g.get(USER_KEY)
+    # App context (và g) có thể dùng chung giữa các request, ví dụ khi test giữ app context
+    if cached is None or cached[0] is not request.environ:
+        cached = (request.environ, load_user())
+        setattr(g, USER_KEY, cached)
+    return cached[1]
+
+MISSING_USER = ("Unauthorized: Missing user data", 401)
+INVALID_ROLE = ("Unauthorized: Invalid role", 403)
+
+def _deny(message, status):
+    logger.error(message)
+    return jsonify({'error': message}), status
+
+def _guard(check):
+    """
+    Decorator từ hàm kiểm tra quyền check(user, kwargs) -> None (cho phép) hoặc (thông báo, mã lỗi)
+
+    Hàm kiểm tra được gắn vào route (access_check) để access_denied() dùng lại, ví dụ
+    rate limiter không đếm các request mà route sẽ từ chối.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            denied = check(get_current_user(), kwargs)
+            if denied:
+                return _deny(*denied)
+            return f(*args, **kwargs)
+        decorated_function.access_check = check
+        return decorated_function
+    return decorator
+
+def access_denied(view, user, view_args=None):
+    """
+    Kiểm tra quyền của route mà không gọi route
+
+    Args:
+        view: View function (app.view_functions[endpoint])
+        user (dict): Người dùng của request (None nếu chưa đăng nhập)
+        view_args (dict): Tham số URL của request
+
+    Returns:
+        tuple: (thông báo, mã lỗi) nếu route sẽ từ chối, None nếu cho phép hoặc route không khai báo quyền
+    """
+    check = getattr(view, 'access_check', None)
+    return check(user, view_args or {}) if check else None
 
 def require_auth(f):
     """
     Decorator để yêu cầu authentication cho Flask routes
     """
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        user = get_current_user()
+    return _guard(lambda user, kwargs: None if user else MISSING_USER)(f)
+
+def require_role(*roles):
+    """
+    Decorator chỉ cho các vai trò roles gọi route (401 nếu chưa đăng nhập, 403 nếu sai vai trò)
+
+    Ví dụ:
+        @dashboard_bp.route('/search')
+        @require_role(ADMIN)
+        def search(): ...
+    """
+    def check(user, kwargs):
         if not user:
-            return {"error": "Unauthorized: Missing or invalid user data"}, 401
-        return f(*args, **kwargs)
-    return decorated_function
+            return MISSING_USER
+        return None if user.get('role') in roles else INVALID_ROLE
+    return _guard(check)
+
+def require_student_access(param='studentid', allow_other_roles=False):
+    """
+    Decorator cho route dữ liệu của một sinh viên: admin xem được mọi sinh viên,
+    sinh viên (role 'user') chỉ xem được dữ liệu có studentId của mình ở tham số URL param
+
+    Args:
+        param (str): Tên tham số URL chứa studentid
+        allow_other_roles (bool): Cho các vai trò khác admin/user gọi route (mặc định 403),
+                                  giữ hành vi cũ của /learning-path và /create-warning
+    """
+    def check(user, kwargs):
+        if not user:
+            return MISSING_USER
+        role = user.get('role')
+        if role == STUDENT:
+            if not user.get('studentId'):
+                return ("Unauthorized: Missing student ID", 401)
+            if user.get('studentId') != kwargs.get(param):
+                return ("Unauthorized: Students can only access their own data", 403)
+        elif role != ADMIN and not allow_other_roles:
+            return INVALID_ROLE
+        return None
+    return _guard(check)
 
 def get_current_user_or_error():
     """
@@ -44,5 +216,5 @@ def get_current_user_or_error():
     """
     user = get_current_user()
     if not user:
-        raise Exception("Unauthorized: Missing or invalid user data")
-    return user
\ No newline at end of file
+        raise Exception("Unauthorized: Missing user data")
+    return user
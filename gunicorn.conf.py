@@ -0,0 +1,40 @@
+"""
+Cấu hình Gunicorn cho production
+
+Chạy: gunicorn -c gunicorn.conf.py
+
+App được nạp trong master (preload_app) rồi mới fork worker: sklearn, mô hình
+Random Forest và cache dữ liệu tham chiếu chỉ nằm một lần trong RAM. Đặt
+GUNICORN_PRELOAD=0 để mỗi worker tự nạp app (cách cũ, dùng khi cần reload code
+bằng HUP).
+
+Metrics của các worker được cộng qua file trong METRICS_DIR (mặc định một thư mục
+tạm, làm sạch mỗi lần khởi động master).
+"""
+import glob
+import multiprocessing
+import os
+import tempfile
+
+wsgi_app = 'wsgi:app'
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', 1))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') == '1'
+
+# Đặt trước khi nạp app vì config đọc biến môi trường khi import
+os.environ.setdefault('METRICS_DIR', os.path.join(tempfile.gettempdir(), f'lms-metrics-{os.getpid()}'))
+# Cho app biết số worker (chọn backend rate limit dùng chung)
+os.environ['WEB_CONCURRENCY'] = str(workers)
+
+def on_starting(server):
+    """Bỏ snapshot metrics còn sót từ lần chạy trước"""
+    for path in glob.glob(os.path.join(os.environ['METRICS_DIR'], '*.json')):
+        os.remove(path)
+
+def post_fork(server, worker):
+    """Khởi tạo lại connection pool và scheduler trong worker vừa fork"""
+    from app.utils.prefork import reinit_after_fork
+    from wsgi import app
+    reinit_after_fork(app)
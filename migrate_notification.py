@@ -64,14 +64,17 @@ def check_notification_relationship():
         app = create_app(os.getenv('FLASK_ENV', 'default'))
         
         with app.app_context():
+            from sqlalchemy.orm import selectinload
             from app.models import Student, Notification
+            from app.services.student_service import StudentService
             
             # Lấy sinh viên đầu tiên
             student = Student.query.first()
             if student:
                 print(f"Sinh viên: {student.name} ({student.studentid})")
                 
-                # Kiểm tra relationship
+                # Kiểm tra relationship (lazy='raise': phải nạp rõ bằng selectinload)
+                student = StudentService.get_student(student.studentid, selectinload(Student.notifications))
                 notifications = student.notifications
                 print(f"Số thông báo: {len(notifications)}")
                 
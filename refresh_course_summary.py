@@ -0,0 +1,37 @@
+"""
+Script tạo và đồng bộ lại bảng CourseSummary
+
+Bảng coursesummary được duy trì tự động khi Progress/Student thay đổi qua ORM.
+Chạy script này khi triển khai lần đầu và định kỳ (cron) để sửa các sai lệch do
+cập nhật đi vòng qua ORM (bulk update, SQL thủ công).
+"""
+import os
+import sys
+from app import create_app, db
+
+def refresh_course_summary():
+    """Tạo bảng coursesummary nếu chưa có và tính lại toàn bộ"""
+    print("Bắt đầu đồng bộ bảng CourseSummary...")
+    
+    try:
+        app = create_app(os.getenv('FLASK_ENV', 'default'))
+        
+        with app.app_context():
+            from app.services.course_summary_service import CourseSummaryService
+            
+            # Tạo bảng coursesummary nếu chưa tồn tại
+            db.create_all()
+            
+            count = CourseSummaryService.refresh_all()
+            print(f"✅ Đã tính lại tổng hợp cho {count} khóa học")
+            return True
+            
+    except Exception as e:
+        print(f"❌ Lỗi khi đồng bộ CourseSummary: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    print("=== COURSE SUMMARY REFRESH SCRIPT ===")
+    
+    if not refresh_course_summary():
+        sys.exit(1)
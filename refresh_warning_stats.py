@@ -0,0 +1,37 @@
+"""
+Script tạo và đồng bộ lại bảng StudentWarningStats
+
+Bảng studentwarningstats được duy trì tự động khi Warning thay đổi qua ORM.
+Chạy script này khi triển khai lần đầu và định kỳ (cron) để sửa các sai lệch do
+cập nhật đi vòng qua ORM (bulk update, SQL thủ công).
+"""
+import os
+import sys
+from app import create_app, db
+
+def refresh_warning_stats():
+    """Tạo bảng studentwarningstats nếu chưa có và tính lại toàn bộ"""
+    print("Bắt đầu đồng bộ bảng StudentWarningStats...")
+    
+    try:
+        app = create_app(os.getenv('FLASK_ENV', 'default'))
+        
+        with app.app_context():
+            from app.services.warning_stats_service import WarningStatsService
+            
+            # Tạo bảng studentwarningstats nếu chưa tồn tại
+            db.create_all()
+            
+            count = WarningStatsService.refresh_all()
+            print(f"✅ Đã tính lại thống kê cảnh báo cho {count} sinh viên")
+            return True
+            
+    except Exception as e:
+        print(f"❌ Lỗi khi đồng bộ StudentWarningStats: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    print("=== WARNING STATS REFRESH SCRIPT ===")
+    
+    if not refresh_warning_stats():
+        sys.exit(1)
@@ -0,0 +1,50 @@
+"""
+Script partition và lưu trữ dữ liệu Notification/Warning
+
+Ví dụ:
+    python retention_job.py --partition     # chạy một lần: chuyển bảng sang partition theo tháng (PostgreSQL)
+    python retention_job.py                 # định kỳ (cron hàng tháng): tạo partition mới, lưu trữ dữ liệu cũ
+    python retention_job.py --months 6
+"""
+import argparse
+import os
+import sys
+from app import create_app, db
+
+def main():
+    parser = argparse.ArgumentParser(description='Partition và lưu trữ Notification/Warning')
+    parser.add_argument('--partition', action='store_true',
+                        help='Chuyển bảng notification/warning sang partition theo tháng (chạy một lần)')
+    parser.add_argument('--months', type=int, default=None, help='Số tháng dữ liệu được giữ lại')
+    parser.add_argument('--config', default=os.getenv('FLASK_ENV', 'default'), help='Tên cấu hình Flask')
+    args = parser.parse_args()
+
+    print("=== RETENTION JOB ===")
+    try:
+        app = create_app(args.config)
+        
+        with app.app_context():
+            from app.services.retention_service import RetentionService, PARTITIONED_TABLES
+            
+            # Tạo bảng archive nếu chưa tồn tại
+            db.create_all()
+            
+            if args.partition:
+                if not RetentionService.supports_partitioning():
+                    print("Database không phải PostgreSQL, giữ nguyên bảng thường")
+                for table_name in PARTITIONED_TABLES:
+                    if RetentionService.partition_table(table_name):
+                        print(f"✅ Đã chuyển bảng '{table_name}' sang partition theo tháng")
+            
+            result = RetentionService.run(args.months)
+            print(f"Mốc lưu trữ: {result['cutoff'].isoformat()}")
+            print(f"✅ Đã lưu trữ {result['notifications']} thông báo và {result['warnings']} cảnh báo")
+            if result['dropped_partitions']:
+                print(f"Đã xóa partition trống: {', '.join(result['dropped_partitions'])}")
+    
+    except Exception as e:
+        print(f"❌ Lỗi khi chạy retention job: {str(e)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
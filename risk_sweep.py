@@ -0,0 +1,93 @@
+"""
+Script quét nguy cơ học vụ cho toàn bộ sinh viên
+
+Ví dụ:
+    python risk_sweep.py                      # một process
+    python risk_sweep.py --workers 4          # chia theo khoảng studentid cho 4 process
+    python risk_sweep.py --chunk-size 2000
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from app import create_app, db
+
+# App và service riêng của từng worker process
+_worker_app = None
+_worker_service = None
+
+def _init_worker(config_name):
+    """Khởi tạo app và service trong worker process"""
+    global _worker_app, _worker_service
+    from app.services.risk_sweep_service import RiskSweepService
+    _worker_app = create_app(config_name)
+    with _worker_app.app_context():
+        _worker_service = RiskSweepService()
+
+def _sweep_range(bounds, chunk_size):
+    """Quét một khoảng studentid trong worker process"""
+    lower, upper = bounds
+    with _worker_app.app_context():
+        return _worker_service.run(chunk_size, lower, upper)
+
+def run_sweep(config_name, chunk_size=None, workers=1):
+    """
+    Chạy quét nguy cơ và trả về kết quả tổng hợp
+
+    Args:
+        config_name (str): Tên cấu hình Flask
+        chunk_size (int): Số sinh viên mỗi khối (mặc định RISK_SWEEP_CHUNK_SIZE)
+        workers (int): Số process
+
+    Returns:
+        dict: Kết quả tổng hợp (xem RiskSweepService.run)
+    """
+    from app.services.risk_sweep_service import RiskSweepService
+
+    app = create_app(config_name)
+    with app.app_context():
+        chunk_size = chunk_size or app.config.get('RISK_SWEEP_CHUNK_SIZE', 1000)
+        if workers <= 1:
+            return RiskSweepService().run(chunk_size)
+
+        started = time.perf_counter()
+        ranges = RiskSweepService.chunk_bounds(chunk_size)
+        # Không để worker fork kế thừa connection của process cha
+        db.session.remove()
+        db.engine.dispose()
+
+    totals = {'students': 0, 'scored': 0, 'skipped': 0, 'flagged': 0, 'failed_chunks': 0}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config_name,)) as executor:
+        for result in executor.map(_sweep_range, ranges, [chunk_size] * len(ranges)):
+            for key in totals:
+                totals[key] += result[key]
+    totals['elapsed'] = time.perf_counter() - started
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description='Quét nguy cơ học vụ cho toàn bộ sinh viên')
+    parser.add_argument('--chunk-size', type=int, default=None, help='Số sinh viên mỗi khối')
+    parser.add_argument('--workers', type=int, default=1, help='Số process chạy song song')
+    parser.add_argument('--config', default=os.getenv('FLASK_ENV', 'default'), help='Tên cấu hình Flask')
+    args = parser.parse_args()
+
+    print("=== RISK SWEEP ===")
+    try:
+        totals = run_sweep(args.config, args.chunk_size, args.workers)
+    except Exception as e:
+        print(f"❌ Lỗi khi quét nguy cơ: {str(e)}")
+        sys.exit(1)
+
+    elapsed = totals['elapsed']
+    throughput = totals['students'] / elapsed if elapsed else 0.0
+    print(f"Sinh viên: {totals['students']} (chấm điểm {totals['scored']}, bỏ qua {totals['skipped']})")
+    print(f"Cảnh báo mới: {totals['flagged']}")
+    print(f"Thời gian: {elapsed:.2f}s - {throughput:.0f} sinh viên/giây")
+    if totals['failed_chunks']:
+        print(f"❌ {totals['failed_chunks']} khối bị lỗi, xem log để biết chi tiết")
+        sys.exit(1)
+    print("✅ Hoàn thành")
+
+if __name__ == "__main__":
+    main()
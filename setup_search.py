@@ -0,0 +1,35 @@
+"""
+Script cài đặt index tìm kiếm cho cảnh báo và lỗi thường gặp
+
+PostgreSQL: extension unaccent + pg_trgm, index tsvector (không phân biệt dấu) và trigram.
+SQLite: bảng FTS5 (unicode61 remove_diacritics 2) đồng bộ bằng trigger.
+Chạy lại an toàn; trên SQLite lần chạy lại sẽ dựng lại bảng FTS từ dữ liệu hiện có.
+"""
+import os
+import sys
+from app import create_app, db
+
+def setup_search():
+    """Cài đặt index tìm kiếm cho database đang cấu hình"""
+    print("Bắt đầu cài đặt index tìm kiếm...")
+    
+    try:
+        app = create_app(os.getenv('FLASK_ENV', 'default'))
+        
+        with app.app_context():
+            from app.services.search_service import SearchService
+            
+            db.create_all()
+            backend = SearchService.install()
+            print(f"✅ Backend tìm kiếm: {backend}")
+            return True
+            
+    except Exception as e:
+        print(f"❌ Lỗi khi cài đặt index tìm kiếm: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    print("=== SEARCH SETUP SCRIPT ===")
+    
+    if not setup_search():
+        sys.exit(1)
@@ -0,0 +1,70 @@
+"""
+Xác thực và phân quyền: danh tính giải mã một lần mỗi request, decorator vai trò, JWT (nếu có PyJWT)
+
+Chạy: python -m pytest -q test_auth.py
+"""
+import time
+import pytest
+import flask_auth
+from conftest import auth_header
+
+def test_missing_or_invalid_user_is_unauthorized(client):
+    assert client.get('/api/dashboard/students').status_code == 401
+    assert client.get('/api/dashboard/students', headers={'x-user': 'không-phải-base64'}).status_code == 401
+
+def test_student_can_only_access_own_data(client):
+    assert client.get('/api/dashboard/progress/SV001', headers=auth_header('user', 'SV001')).status_code == 200
+    assert client.get('/api/dashboard/progress/SV002', headers=auth_header('user', 'SV001')).status_code == 403
+    assert client.get('/api/dashboard/progress/SV001', headers=auth_header('user')).status_code == 401
+    assert client.get('/api/dashboard/progress/SV001', headers=auth_header('teacher')).status_code == 403
+    # Lộ trình học tập vẫn mở cho các vai trò khác như trước khi dùng decorator
+    assert client.get('/api/dashboard/learning-path/SV001', headers=auth_header('teacher')).status_code == 200
+    assert client.get('/api/dashboard/learning-path/SV002', headers=auth_header('user', 'SV001')).status_code == 403
+
+def test_admin_only_route(client):
+    assert client.get('/api/dashboard/search?q=Sinh', headers=auth_header('user', 'SV001')).status_code == 403
+    assert client.get('/api/dashboard/search?q=Sinh', headers=auth_header()).status_code == 200
+    assert client.get('/api/dashboard/search?q=Lỗi&type=,', headers=auth_header()).status_code == 400
+
+def test_metrics_requires_admin(client):
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers=auth_header('user', 'SV001')).status_code == 403
+    assert client.get('/metrics', headers=auth_header()).status_code == 200
+
+def test_identity_decoded_once_per_request(client, monkeypatch):
+    calls = []
+    load_user = flask_auth.load_user
+    monkeypatch.setattr(flask_auth, 'load_user', lambda: calls.append(1) or load_user())
+    # Decorator, response cache và profiler đều đọc danh tính
+    response = client.get('/api/dashboard/learning-path/SV001?profile=1', headers=auth_header('user', 'SV001'))
+    assert response.headers['X-Profile-Status'] == 'forbidden'
+    assert len(calls) == 1
+    client.get('/api/dashboard/students', headers=auth_header())
+    assert len(calls) == 2
+
+@pytest.fixture
+def jwt_keys(app, monkeypatch):
+    """Bật xác thực JWT với cặp khóa RSA sinh tạm; trả về hàm ký token"""
+    jwt = pytest.importorskip('jwt')
+    rsa = pytest.importorskip('cryptography.hazmat.primitives.asymmetric.rsa')
+    from cryptography.hazmat.primitives import serialization
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo).decode()
+    monkeypatch.setitem(app.extensions, 'auth', flask_auth.TokenVerifier(public_pem, 'RS256'))
+
+    def sign(claims, key=private_key):
+        return {'Authorization': f"Bearer {jwt.encode(claims, key, algorithm='RS256')}"}
+
+    return sign, rsa
+
+def test_jwt_verification(client, jwt_keys):
+    sign, rsa = jwt_keys
+    claims = {'role': 'user', 'studentId': 'SV001', 'exp': int(time.time()) + 60}
+    assert client.get('/api/dashboard/progress/SV001', headers=sign(claims)).status_code == 200
+    # Khi bật JWT, header x-user không còn được tin
+    assert client.get('/api/dashboard/progress/SV001', headers=auth_header('user', 'SV001')).status_code == 401
+    expired = dict(claims, exp=int(time.time()) - 60)
+    assert client.get('/api/dashboard/progress/SV001', headers=sign(expired)).status_code == 401
+    other_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    assert client.get('/api/dashboard/progress/SV001', headers=sign(claims, other_key)).status_code == 401
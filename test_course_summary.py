@@ -0,0 +1,89 @@
+"""
+Bảng coursesummary được cộng dồn khi flush phải khớp với tính lại đầy đủ từ dữ liệu gốc
+
+Chạy: python -m pytest -q test_course_summary.py
+"""
+from datetime import date
+import pytest
+from sqlalchemy import delete, select
+from app import db
+from app.models import Course, CourseSummary, Progress, Student
+from app.services.course_service import CourseService
+from app.services.course_summary_service import COUNTER_COLUMNS
+
+COURSES = (11, 12)
+
+@pytest.fixture
+def courses(app):
+    """Hai khóa học và bốn sinh viên riêng cho test, xóa khi xong"""
+    for courseid in COURSES:
+        db.session.add(Course(courseid=courseid, coursename=f'Khóa học {courseid}', credits=3, semester='HK2',
+                              status='ACTIVE', difficulty='BASIC', category='CNTT'))
+    for i in range(4):
+        db.session.add(Student(studentid=f'CS{i}', name=f'Sinh viên CS{i}', grade='A', major='CNTT',
+                               academicyear='2024', totalcredits=10, totalgpa=2.0 + i * 0.5,
+                               currentsemester='HK2', class_='K2'))
+    db.session.commit()
+    yield COURSES
+    db.session.rollback()
+    db.session.execute(delete(Progress).where(Progress.courseid.in_(COURSES)))
+    db.session.execute(delete(CourseSummary).where(CourseSummary.courseid.in_(COURSES)))
+    db.session.execute(delete(Course).where(Course.courseid.in_(COURSES)))
+    db.session.execute(delete(Student).where(Student.studentid.like('CS%')))
+    db.session.commit()
+
+def add_progress(studentid, courseid, completionrate):
+    progress = Progress(studentid=studentid, courseid=courseid, progressrate=50, completedcredits=3,
+                        completionrate=completionrate, lastupdated=date(2024, 5, 1))
+    db.session.add(progress)
+    return progress
+
+def assert_matches_recompute():
+    for courseid in COURSES:
+        summary = db.session.get(CourseSummary, courseid, populate_existing=True)
+        assert summary is not None, f"Thiếu dòng tổng hợp của khóa học {courseid}"
+        expected = CourseService.get_class_aggregates(courseid)
+        actual = {column: getattr(summary, column) for column in COUNTER_COLUMNS}
+        assert actual == pytest.approx({
+            'totalstudents': expected['total_students'],
+            'gpasum': expected['gpa_sum'],
+            'completionsum': expected['completion_sum'],
+            'completedcount': expected['completed_count'],
+            'activecount': expected['active_count']
+        }), f"coursesummary của khóa học {courseid} lệch"
+
+def test_summary_created_with_course(courses):
+    assert_matches_recompute()
+
+def test_summary_matches_recompute(courses):
+    first = add_progress('CS0', 11, 100)
+    add_progress('CS1', 11, 85)
+    second = add_progress('CS1', 11, 40)  # Sinh viên có hai dòng tiến độ trong cùng khóa học
+    add_progress('CS2', 12, 60)
+    db.session.commit()
+    assert_matches_recompute()
+
+    first.completionrate = 70  # Sửa sau commit: thuộc tính đã expire
+    db.session.commit()
+    assert_matches_recompute()
+
+    second.courseid = 12  # Chuyển khóa học
+    db.session.commit()
+    assert_matches_recompute()
+
+    student = db.session.get(Student, 'CS1')
+    student.totalgpa = 3.9  # Sửa GPA của sinh viên học cả hai khóa
+    db.session.commit()
+    assert_matches_recompute()
+
+    db.session.delete(first)
+    add_progress('CS3', 12, 100)
+    db.session.get(Student, 'CS2').totalgpa = 1.0
+    db.session.commit()
+    assert_matches_recompute()
+
+    # Xóa dòng tiến độ cuối cùng của sinh viên trong khóa học
+    for progress in db.session.scalars(select(Progress).where(Progress.studentid == 'CS1')):
+        db.session.delete(progress)
+    db.session.commit()
+    assert_matches_recompute()
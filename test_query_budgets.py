@@ -0,0 +1,62 @@
+"""
+Ngân sách truy vấn theo endpoint: số truy vấn không được tăng theo số sinh viên (N+1)
+
+Chạy: python -m pytest -q test_query_budgets.py
+"""
+import pytest
+from sqlalchemy import select
+from app import db
+from app.models import Progress
+from app.utils.query_inspector import normalize_statement, record_queries
+from conftest import N_STUDENTS, auth_header
+
+# Số truy vấn tối đa khi cache nguội, với database seed N_STUDENTS sinh viên. Endpoint đọc dữ liệu
+# tham chiếu có thêm một truy vấn phiên bản danh mục (khóa của cache dữ liệu tham chiếu)
+QUERY_BUDGETS = {
+    '/api/dashboard/students': 1,
+    '/api/dashboard/students/excellent': 1,
+    '/api/dashboard/students/needs-support': 1,
+    '/api/dashboard/courses': 2,
+    '/api/dashboard/progress': 1,
+    '/api/dashboard/progress/SV001': 1,
+    '/api/dashboard/assignment-status/1': 2,
+    '/api/dashboard/assignments': 1,
+    '/api/dashboard/warnings': 2,
+    '/api/dashboard/chapters': 2,
+    '/api/dashboard/common-errors': 2,
+    '/api/dashboard/common/courses/1': 2,
+    '/api/dashboard/activity-rate/1': 1,
+    '/api/dashboard/class-progress/1': 4,
+    '/api/dashboard/chapter-details/SV001/1': 3,
+    '/api/dashboard/student-report/SV001': 2,
+    '/api/dashboard/student-errors/SV001': 4,
+    '/api/dashboard/learning-path/SV001': 5,
+    '/api/dashboard/search?q=Sinh': 3,
+    '/api/dashboard/student-notifications/SV001': 1,
+    '/api/dashboard/notifications/unread-count/SV001': 2,
+    '/api/dashboard/notifications/stats/SV001': 2
+}
+
+@pytest.mark.parametrize('url', list(QUERY_BUDGETS))
+def test_endpoint_query_budget(client, query_budget, url):
+    with query_budget(QUERY_BUDGETS[url]):
+        response = client.get(url, headers=auth_header())
+    assert response.status_code == 200
+
+def test_query_count_header(client):
+    response = client.get('/api/dashboard/students', headers=auth_header())
+    assert response.headers['X-Query-Count'] == '1'
+
+def test_normalize_statement_ignores_parameters():
+    assert normalize_statement("SELECT * FROM student WHERE studentid = 'SV001' AND totalgpa > 2.5") == \
+        normalize_statement("SELECT *\n  FROM student WHERE studentid = 'SV002' AND totalgpa > 3")
+    assert normalize_statement("SELECT * FROM progress WHERE courseid IN (?, ?, ?)") == \
+        normalize_statement("SELECT * FROM progress WHERE courseid IN (%(courseid_1_1)s)")
+
+def test_detects_n_plus_one(app):
+    with record_queries() as recorder:
+        for i in range(N_STUDENTS):
+            db.session.execute(select(Progress).where(Progress.studentid == f'SV{i:03d}')).all()
+    assert recorder.count == N_STUDENTS
+    [(shape, count)] = recorder.repeated(5)
+    assert count == N_STUDENTS and 'FROM progress' in shape
@@ -0,0 +1,68 @@
+"""
+Rate limit token bucket: ngân sách theo vai trò, bucket riêng từng người dùng, 429 + Retry-After
+
+Chạy: python -m pytest -q test_rate_limit.py
+"""
+import pytest
+from app.utils import rate_limit
+from app.utils.rate_limit import MemoryBackend, RateLimit
+from conftest import auth_header
+
+def test_parse_limit():
+    assert RateLimit.parse('5/minute') == RateLimit(5, 60)
+    assert RateLimit.parse('100 / hours') == RateLimit(100, 3600)
+    assert RateLimit.parse('10/30second') == RateLimit(10, 30)
+    for value in ('5', '0/minute', '5/week'):
+        with pytest.raises(ValueError):
+            RateLimit.parse(value)
+
+def test_token_bucket_refills(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, 'monotonic', lambda: now[0])
+    backend, limit = MemoryBackend(), RateLimit(2, 60)
+    assert backend.take('k', limit)[0] and backend.take('k', limit)[0]
+    allowed, _, retry_after = backend.take('k', limit)
+    assert not allowed and retry_after == pytest.approx(30)
+    now[0] += 30
+    assert backend.take('k', limit)[0]
+    assert not backend.take('k', limit)[0]
+
+@pytest.fixture
+def limited_courses(app, monkeypatch):
+    """Giới hạn /courses: sinh viên 2 lượt/phút, admin 5 lượt/phút"""
+    limiter = app.extensions['rate_limiter']
+    monkeypatch.setitem(limiter.limits, 'dashboard.get_courses',
+                        {'admin': RateLimit(5, 60), 'user': RateLimit(2, 60)})
+    limiter.clear()
+    yield
+    limiter.clear()
+
+def test_rate_limited_per_user_and_role(client, limited_courses):
+    student = auth_header('user', 'SV001')
+    first = client.get('/api/dashboard/courses', headers=student)
+    assert first.status_code == 200
+    assert first.headers['X-RateLimit-Limit'] == '2' and first.headers['X-RateLimit-Remaining'] == '1'
+    assert client.get('/api/dashboard/courses', headers=student).status_code == 200
+
+    limited = client.get('/api/dashboard/courses', headers=student)
+    assert limited.status_code == 429
+    assert limited.headers['Retry-After'] == '30'
+
+    # Sinh viên khác và admin có bucket riêng
+    assert client.get('/api/dashboard/courses', headers=auth_header('user', 'SV002')).status_code == 200
+    admin = client.get('/api/dashboard/courses', headers=auth_header())
+    assert admin.status_code == 200 and admin.headers['X-RateLimit-Limit'] == '5'
+
+def test_unlimited_endpoint_has_no_headers(client):
+    response = client.get('/api/dashboard/chapters', headers=auth_header('user', 'SV001'))
+    assert response.status_code == 200 and 'X-RateLimit-Limit' not in response.headers
+
+def test_rejected_requests_are_not_counted(client, limited_courses, app, monkeypatch):
+    limiter = app.extensions['rate_limiter']
+    monkeypatch.setitem(limiter.limits, 'dashboard.get_progress', {'user': RateLimit(1, 60)})
+    student = auth_header('user', 'SV001')
+    # Xem dữ liệu sinh viên khác bị route trả 403 và không tốn lượt
+    for _ in range(3):
+        assert client.get('/api/dashboard/progress/SV002', headers=student).status_code == 403
+    response = client.get('/api/dashboard/progress/SV001', headers=student)
+    assert response.status_code == 200 and response.headers['X-RateLimit-Remaining'] == '0'
@@ -0,0 +1,15 @@
+"""
+WSGI entry point cho production: gunicorn -c gunicorn.conf.py
+
+Với preload_app (mặc định trong gunicorn.conf.py) module này được import một lần
+trong master, nên mô hình và cache dữ liệu tham chiếu được dùng chung giữa các
+worker theo cơ chế copy-on-write.
+"""
+import os
+from app import create_app
+from app.utils.prefork import warm_up
+
+app = create_app(os.getenv('FLASK_ENV', 'production'))
+
+# Nạp mô hình, module nặng và cache dữ liệu tham chiếu trước khi fork
+warm_up(app)